@@ -62,6 +62,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'hostel_management.context_processors.notices',
             ],
         },
     },
@@ -93,6 +94,25 @@ DATABASES = {
 #     }
 # }
 
+# The notice board and dashboard numbers are cached and invalidated on
+# change, so every worker process must share the cache: the default
+# per-process LocMemCache would leave the other workers serving stale
+# copies. Create the table with `python manage.py createcachetable`.
+CACHES = {
+    'default': {
+        'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+        'LOCATION': 'hostel_cache',
+    }
+}
+
+# Uncomment below to use Redis (pip install redis) instead
+# CACHES = {
+#     'default': {
+#         'BACKEND': 'django.core.cache.backends.redis.RedisCache',
+#         'LOCATION': 'redis://127.0.0.1:6379',
+#     }
+# }
+
 
 # Password validation
 # https://docs.djangoproject.com/en/5.2/ref/settings/#auth-password-validators
@@ -146,6 +166,34 @@ DEFAULT_AUTO_FIELD = 'django.db.models.BigAutoField'
 # Custom User Model
 AUTH_USER_MODEL = 'hostel_management.CustomUser'
 
+# Room application priority scoring (see hostel_management/scoring.py)
+HOSTEL_PRIORITY_POLICY = {
+    'CLASS': 'hostel_management.scoring.LevelAndYearPolicy',
+    'OPTIONS': {
+        'base': 50,
+        'level_bonus': {'PhD': 30, 'Postgraduate': 20, 'Graduate': 10},
+        'year_origin': 2020,
+        'year_cap': 20,
+    },
+}
+
+# Live room availability events (see hostel_management/live.py). Use
+# hostel_management.live.FileBroker with OPTIONS {'path': ...} to share
+# events between several worker processes on one host.
+HOSTEL_EVENT_BROKER = {
+    'CLASS': 'hostel_management.live.LocalBroker',
+    'OPTIONS': {},
+}
+
+# Hours staff have to act on a complaint, by priority, set the deadline the
+# staff complaint queue is ordered by. The defaults are in
+# hostel_management/models.py; override some with e.g.
+# HOSTEL_COMPLAINT_SLA_HOURS = {'urgent': 2}
+
+# How alike (estimated Jaccard similarity of the text, 0-1) an open
+# complaint must be to be offered as a duplicate of a new one
+HOSTEL_DUPLICATE_COMPLAINT_SIMILARITY = 0.5
+
 # Login/Logout URLs
 LOGIN_URL = '/login/'
 LOGIN_REDIRECT_URL = '/'
@@ -1,10 +1,216 @@
-from django.contrib import admin
+import json
+import re
+from collections import defaultdict
+
+from django import forms
+from django.apps import apps
+from django.contrib import admin, messages
+from django.contrib.admin.models import CHANGE, LogEntry
+from django.contrib.admin.views.main import ORDER_VAR, ChangeList
+from django.db import transaction
+from django.db.models import Case, Count, F, OuterRef, Q, Subquery, Value, When
+from django.db.models.functions import Coalesce
 from django.contrib.auth.admin import UserAdmin
-from django.utils.html import format_html
-from .models import CustomUser, StudentProfile, Room, RoomApplication, RoomAllocation, Notice, Complaint
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.http import HttpResponseRedirect
+from django.urls import reverse
+from django.utils.html import format_html, format_html_join
+from django.utils import timezone
+from . import allocation, auto_allocation, duplicates, scoring, search
+from .live import publish_room_changes
+from .pagination import EstimatedCountPaginator
+from .stats import invalidate_dashboard_stats
+from .models import AllocationError, ComplaintRoute, CustomUser, HostelStats, StudentProfile, Room, RoomApplication, RoomAllocation, Notice, Complaint
 
 # Register your models here.
 
+STAFF_USER_TYPES = ('staff', 'provost', 'admin')
+# (model, field) pickers that should only offer staff users
+STAFF_USER_FIELDS = {
+    ('roomapplication', 'reviewed_by'),
+    ('roomallocation', 'allocated_by'),
+    ('complaint', 'assigned_to'),
+}
+
+
+def autocomplete_source(request):
+    """The field an admin autocomplete request is filling in, or None for other requests."""
+    match = request.resolver_match
+    if match is None or match.url_name != 'autocomplete':
+        return None
+    try:
+        model = apps.get_model(request.GET['app_label'], request.GET['model_name'])
+        return model._meta.get_field(request.GET['field_name'])
+    except (KeyError, LookupError, FieldDoesNotExist):
+        return None
+
+
+class PreloadedChoiceField(forms.ModelChoiceField):
+    """
+    ModelChoiceField over rows loaded once, shared by every form of a
+    changelist formset: rendering and cleaning a row run no queries.
+    """
+    
+    def __init__(self, queryset, objects=None, **kwargs):
+        super().__init__(queryset, **kwargs)
+        self.objects = objects if objects is not None else {obj.pk: obj for obj in queryset}
+        self.choices = [('', self.empty_label)] + [(pk, str(obj)) for pk, obj in self.objects.items()]
+    
+    def to_python(self, value):
+        if value in self.empty_values:
+            return None
+        try:
+            return self.objects[int(value)]
+        except (KeyError, TypeError, ValueError):
+            raise ValidationError(self.error_messages['invalid_choice'], code='invalid_choice')
+
+
+class BulkEditForm(forms.ModelForm):
+    """Changelist row form that leaves unchanged rows unvalidated."""
+    
+    def _post_clean(self):
+        if self.has_changed():
+            super()._post_clean()
+    
+    def _get_validation_exclusions(self):
+        # PreloadedChoiceField already checked these against its rows
+        exclude = super()._get_validation_exclusions()
+        exclude.update(name for name, field in self.fields.items() if isinstance(field, PreloadedChoiceField))
+        return exclude
+
+
+class BulkEditFormSet(forms.BaseModelFormSet):
+    """Changelist formset that finds each posted row among the rows it loaded."""
+    
+    def add_fields(self, form, index):
+        super().add_fields(form, index)
+        # The stock pk field looks every row up again with its own query
+        pk_name = self.model._meta.pk.name
+        if not hasattr(self, '_rows'):
+            self._rows = {obj.pk: obj for obj in self.get_queryset()}
+        field = form.fields[pk_name]
+        form.fields[pk_name] = PreloadedChoiceField(
+            field.queryset, objects=self._rows, initial=field.initial, required=False, widget=field.widget
+        )
+
+
+class BulkEditMixin:
+    """
+    list_editable without per-row work.
+    
+    Foreign keys listed in ``bulk_edit_choices`` (field -> queryset) offer
+    rows loaded once per page instead of a query per row. The page posts
+    only the rows that were edited (see the changelist template), and the
+    changed rows are handed to save_bulk_edits() together, which subclasses
+    implement as grouped bulk updates. Invalid rows are reported and
+    nothing is saved.
+    """
+    change_list_template = 'admin/hostel_management/bulk_edit_change_list.html'
+    bulk_edit_choices = {}
+    
+    def get_changelist_form(self, request, **kwargs):
+        return super().get_changelist_form(request, form=BulkEditForm, **kwargs)
+    
+    def get_changelist_formset(self, request, **kwargs):
+        choices = {name: queryset.all() for name, queryset in self.bulk_edit_choices.items()}
+        
+        def formfield(db_field, **field_kwargs):
+            if db_field.name in choices:
+                return PreloadedChoiceField(
+                    choices[db_field.name], required=not db_field.blank, label=db_field.verbose_name
+                )
+            return self.formfield_for_dbfield(db_field, request=request, **field_kwargs)
+        
+        return super().get_changelist_formset(
+            request, formset=BulkEditFormSet, formfield_callback=formfield, **kwargs
+        )
+    
+    def changelist_view(self, request, extra_context=None):
+        if (
+            request.method == 'POST' and self.list_editable and '_save' in request.POST
+            and self.has_change_permission(request)
+        ):
+            return self.save_changelist_edits(request)
+        return super().changelist_view(request, extra_context)
+    
+    def get_bulk_edit_queryset(self, request, prefix):
+        """The rows named by the posted forms' hidden pk fields."""
+        pk_field = self.opts.pk
+        posted = re.compile(rf'{re.escape(prefix)}-\d+-{re.escape(pk_field.name)}$')
+        pks = []
+        for key, value in request.POST.items():
+            if posted.match(key):
+                try:
+                    pks.append(pk_field.to_python(value))
+                except ValidationError:
+                    continue
+        return self.get_queryset(request).filter(pk__in=pks)
+    
+    def save_changelist_edits(self, request):
+        FormSet = self.get_changelist_formset(request)
+        queryset = self.get_bulk_edit_queryset(request, FormSet.get_default_prefix())
+        if self.list_select_related and self.list_select_related is not True:
+            queryset = queryset.select_related(*self.list_select_related)
+        formset = FormSet(request.POST, request.FILES, queryset=queryset)
+        if not formset.is_valid():
+            for form in formset.forms:
+                for field, errors in form.errors.items():
+                    self.message_user(request, f"{form.instance}: {field}: {' '.join(errors)}", messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+        changed = [form for form in formset.forms if form.has_changed()]
+        if changed:
+            with transaction.atomic():
+                saved = self.save_bulk_edits(request, changed)
+            self.log_bulk_edits(request, [form for form in changed if form.instance.pk in saved])
+            self.message_user(request, f"{len(saved)} {self.opts.verbose_name_plural} changed.")
+            if len(saved) < len(changed):
+                self.message_user(
+                    request,
+                    f"{len(changed) - len(saved)} {self.opts.verbose_name_plural} were not changed.",
+                    messages.WARNING,
+                )
+        return HttpResponseRedirect(request.get_full_path())
+    
+    def save_bulk_edits(self, request, forms):
+        """Save the changed row ``forms``; return the pks that were saved."""
+        for form in forms:
+            obj = self.save_form(request, form, change=True)
+            self.save_model(request, obj, form, change=True)
+        return {form.instance.pk for form in forms}
+    
+    def log_bulk_edits(self, request, forms):
+        # One INSERT per distinct change message
+        by_message = defaultdict(list)
+        for form in forms:
+            by_message[json.dumps(self.construct_change_message(request, form, None))].append(form.instance)
+        for message, objs in by_message.items():
+            LogEntry.objects.log_actions(request.user.pk, objs, CHANGE, message)
+
+
+
+class AllocationErrorMixin:
+    """
+    Lets AllocationError from save_model() abort the save. The models'
+    clean() already puts a full room on the form; what is left is a change
+    made by someone else between validation and save. The view's
+    transaction is rolled back and the page reloaded with the error, so no
+    success message follows a change that wasn't made.
+    """
+    
+    def changeform_view(self, request, *args, **kwargs):
+        try:
+            return super().changeform_view(request, *args, **kwargs)
+        except AllocationError as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+    
+    def changelist_view(self, request, *args, **kwargs):
+        try:
+            return super().changelist_view(request, *args, **kwargs)
+        except AllocationError as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return HttpResponseRedirect(request.get_full_path())
+
 
 class CustomUserAdmin(UserAdmin):
     """Admin configuration for CustomUser model"""
@@ -21,16 +227,53 @@ class CustomUserAdmin(UserAdmin):
     add_fieldsets = UserAdmin.add_fieldsets + (
         ('Additional Info', {'fields': ('user_type', 'phone')}),
     )
+    
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    
+    def get_search_results(self, request, queryset, search_term):
+        # Autocomplete pickers use the indexed prefix search (see search.py)
+        # and staff pickers list staff only; the changelist keeps UserAdmin's
+        # search
+        source = autocomplete_source(request)
+        if source is None:
+            return super().get_search_results(request, queryset, search_term)
+        if (source.model._meta.model_name, source.name) in STAFF_USER_FIELDS:
+            queryset = queryset.filter(user_type__in=STAFF_USER_TYPES)
+        return search.search_users(queryset, search_term), False
 
 
 class StudentProfileAdmin(admin.ModelAdmin):
     """Admin configuration for StudentProfile model"""
 
     list_display = ('student_id', 'user', 'department',
-                    'faculty', 'academic_year', 'is_allocated')
+                    'faculty', 'academic_year', 'is_allocated', 'current_room')
     list_filter = ('department', 'faculty', 'academic_year', 'is_allocated')
     search_fields = ('student_id', 'user__username',
                      'user__first_name', 'user__last_name')
+    list_select_related = ('user',)
+    ordering = ('student_id',)
+    autocomplete_fields = ('user',)
+    # Large tables: no full COUNT(*) per page, see pagination.py
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    
+    def get_queryset(self, request):
+        queryset = super().get_queryset(request)
+        if autocomplete_source(request) is not None:
+            # Labels are "<student_id> - <full name>"
+            return queryset.select_related('user')
+        room = RoomAllocation.objects.filter(student=OuterRef('pk'), is_active=True).values('room__room_number')
+        return queryset.annotate(current_room=Subquery(room[:1]))
+    
+    def get_search_results(self, request, queryset, search_term):
+        if autocomplete_source(request) is None:
+            return super().get_search_results(request, queryset, search_term)
+        return search.search_students(queryset, search_term), False
+    
+    @admin.display(description='Room', ordering='current_room')
+    def current_room(self, obj):
+        return obj.current_room or '-'
 
     # Make the admin form more organized
     fieldsets = (
@@ -58,6 +301,13 @@ class RoomAdmin(admin.ModelAdmin):
                    'has_attached_bathroom', 'has_ac')
     search_fields = ('room_number', 'block')
     
+    def get_search_results(self, request, queryset, search_term):
+        if autocomplete_source(request) is None:
+            return super().get_search_results(request, queryset, search_term)
+        # Only rooms a student can still be put in
+        queryset = search.search_rooms(queryset, search_term)
+        return queryset.filter(is_available=True, current_occupancy__lt=F('capacity')), False
+    
     def availability_badge(self, obj):
         if obj.is_available and obj.available_beds > 0:
             return format_html('<span class="status-badge status-approved">Available</span>')
@@ -88,31 +338,50 @@ class RoomAdmin(admin.ModelAdmin):
 
     def make_available(self, request, queryset):
         """Action to mark rooms as available"""
-        queryset.update(is_available=True)
+        self._set_availability(queryset, True)
         self.message_user(
             request, f"{queryset.count()} rooms marked as available.")
     make_available.short_description = "Mark selected rooms as available"
 
     def make_unavailable(self, request, queryset):
         """Action to mark rooms as unavailable"""
-        queryset.update(is_available=False)
+        self._set_availability(queryset, False)
         self.message_user(
             request, f"{queryset.count()} rooms marked as unavailable.")
     make_unavailable.short_description = "Mark selected rooms as unavailable"
 
+    def _set_availability(self, queryset, available):
+        with transaction.atomic():
+            rooms = list(
+                queryset.exclude(is_available=available).select_for_update()
+                .values_list('pk', *Room.COUNTER_FIELDS)
+            )
+            Room.objects.filter(pk__in=[pk for pk, *_ in rooms]).update(
+                is_available=available, updated_at=timezone.now()
+            )
+            HostelStats.objects.apply_room_changes(
+                (tuple(state), tuple(state[:-1]) + (available,)) for _, *state in rooms
+            )
+            publish_room_changes(pk for pk, *_ in rooms)
+        invalidate_dashboard_stats()
+
     # Display method for available_beds (since it's a property)
     def available_beds(self, obj):
         return obj.available_beds
     available_beds.short_description = 'Available Beds'
 
 
-class RoomApplicationAdmin(admin.ModelAdmin):
+class RoomApplicationAdmin(AllocationErrorMixin, BulkEditMixin, admin.ModelAdmin):
     """Admin configuration for RoomApplication model"""
     
     list_display = ('student', 'room', 'status', 'status_badge', 'priority_score', 'application_date', 'reviewed_by')
     list_filter = ('status', 'room__block', 'room__room_type', 'application_date')
     search_fields = ('student__student_id', 'student__user__username', 'room__room_number')
     list_editable = ('status', 'priority_score')
+    list_select_related = ('student__user', 'room', 'reviewed_by')
+    autocomplete_fields = ('student', 'room', 'reviewed_by')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     def status_badge(self, obj):
         colors = {
@@ -142,28 +411,45 @@ class RoomApplicationAdmin(admin.ModelAdmin):
     
     readonly_fields = ('application_date', 'created_at', 'updated_at')
     
-    actions = ['approve_applications', 'reject_applications', 'set_reviewed_by_me']
+    actions = ['approve_applications', 'reject_applications', 'auto_allocate', 'recalculate_scores', 'set_reviewed_by_me']
     
     def approve_applications(self, request, queryset):
-        from django.utils import timezone
-        updated = queryset.filter(status='pending').update(
-            status='approved', 
-            reviewed_by=request.user,
-            reviewed_date=timezone.now()
-        )
-        self.message_user(request, f"{updated} applications approved and students allocated.")
+        try:
+            result = allocation.approve_applications(queryset.filter(status='pending'), reviewer=request.user)
+        except AllocationError as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return
+        level = messages.WARNING if result.skipped else messages.SUCCESS
+        self.message_user(request, result.summary('approved and students allocated'), level)
     approve_applications.short_description = "Approve selected pending applications"
     
     def reject_applications(self, request, queryset):
-        from django.utils import timezone
-        updated = queryset.filter(status='pending').update(
-            status='rejected', 
-            reviewed_by=request.user,
-            reviewed_date=timezone.now()
-        )
-        self.message_user(request, f"{updated} applications rejected.")
+        try:
+            result = allocation.reject_applications(queryset.filter(status='pending'), reviewer=request.user)
+        except AllocationError as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return
+        self.message_user(request, result.summary('rejected'))
     reject_applications.short_description = "Reject selected pending applications"
     
+    def auto_allocate(self, request, queryset):
+        try:
+            plan = auto_allocation.auto_allocate(queryset, strategy='matching', reviewer=request.user)
+        except AllocationError as e:
+            self.message_user(request, str(e), messages.ERROR)
+            return
+        self.message_user(
+            request,
+            f"{plan.placed} of {plan.students} students allocated automatically. "
+            f"{plan.students - plan.placed} left pending."
+        )
+    auto_allocate.short_description = "Auto-allocate selected pending applications"
+    
+    def recalculate_scores(self, request, queryset):
+        updated = scoring.rescore_applications(queryset)
+        self.message_user(request, f"Priority score recalculated; {updated} applications changed.")
+    recalculate_scores.short_description = "Recalculate priority scores"
+    
     def set_reviewed_by_me(self, request, queryset):
         from django.utils import timezone
         updated = queryset.update(
@@ -173,7 +459,68 @@ class RoomApplicationAdmin(admin.ModelAdmin):
         self.message_user(request, f"{updated} applications marked as reviewed by you.")
     set_reviewed_by_me.short_description = "Mark as reviewed by me"
     
+    def save_bulk_edits(self, request, forms):
+        # Scores first, in one statement per batch, so approvals see them
+        scores = {
+            form.instance.pk: form.cleaned_data['priority_score']
+            for form in forms if 'priority_score' in form.changed_data
+        }
+        for chunk in allocation.batched(list(scores)):
+            RoomApplication.objects.filter(pk__in=chunk).update(
+                priority_score=Case(*(When(pk=pk, then=Value(scores[pk])) for pk in chunk)),
+                updated_at=timezone.now(),
+            )
+        saved = set(scores)
+        
+        # Decisions go through the bulk engine, one call per new status
+        decisions = defaultdict(list)
+        for form in forms:
+            status = form.cleaned_data['status']
+            if 'status' not in form.changed_data:
+                continue
+            if status in ('rejected', 'withdrawn') or (status == 'approved' and form.initial['status'] == 'pending'):
+                decisions[status].append(form.instance.pk)
+            else:
+                # Anything else (back to pending, say) is a plain save
+                form.instance.status = status
+                self.save_model(request, form.instance, form, change=True)
+                saved.add(form.instance.pk)
+        for status, pks in decisions.items():
+            try:
+                result = allocation.decide_applications(
+                    RoomApplication.objects.filter(pk__in=pks), status, reviewer=request.user
+                )
+            except AllocationError as e:
+                self.message_user(request, str(e), messages.ERROR)
+                continue
+            saved.update(result.updated)
+            if result.skipped:
+                self.message_user(request, result.summary(status), messages.WARNING)
+        return saved
+    
     def save_model(self, request, obj, form, change):
+        if change and 'status' in form.changed_data and (
+            obj.status in ('rejected', 'withdrawn')
+            or (obj.status == 'approved' and form.initial['status'] == 'pending')
+        ):
+            # Status decisions go through the bulk engine so the change form,
+            # list_editable and the admin actions share the same invariants
+            new_status = obj.status
+            obj.status = form.initial['status']
+            other_fields = [name for name in form.changed_data if name != 'status']
+            if other_fields:
+                obj.save(update_fields=other_fields + ['updated_at'])
+            result = allocation.decide_applications(
+                RoomApplication.objects.filter(pk=obj.pk), new_status, reviewer=request.user
+            )
+            if result.room_full:
+                raise AllocationError('Room is already full.')
+            if result.already_allocated:
+                raise AllocationError('The student is already allocated to a room.')
+            if not result.updated:
+                raise AllocationError('This application was changed by someone else. Please reload it.')
+            obj.status = obj._loaded_status = new_status
+            return
         if change and 'status' in form.changed_data:
             from django.utils import timezone
             obj.reviewed_by = request.user
@@ -181,13 +528,17 @@ class RoomApplicationAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
-class RoomAllocationAdmin(admin.ModelAdmin):
+class RoomAllocationAdmin(AllocationErrorMixin, admin.ModelAdmin):
     """Admin configuration for RoomAllocation model"""
     
     list_display = ('student', 'room', 'is_active', 'status_badge', 'allocated_date', 'allocated_by', 'checkout_date')
     list_filter = ('is_active', 'room__block', 'room__room_type', 'allocated_date')
     search_fields = ('student__student_id', 'student__user__username', 'room__room_number')
     list_editable = ('is_active',)
+    list_select_related = ('student__user', 'room', 'allocated_by')
+    autocomplete_fields = ('student', 'room', 'allocated_by')
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
     
     def status_badge(self, obj):
         if obj.is_active:
@@ -219,37 +570,83 @@ class RoomAllocationAdmin(admin.ModelAdmin):
     actions = ['activate_allocations', 'deactivate_allocations', 'checkout_students']
     
     def activate_allocations(self, request, queryset):
-        updated = queryset.filter(is_active=False).update(is_active=True)
+        updated = self._set_active(request, queryset, True)
         self.message_user(request, f"{updated} allocations activated.")
     activate_allocations.short_description = "Activate selected allocations"
     
     def deactivate_allocations(self, request, queryset):
-        updated = queryset.filter(is_active=True).update(is_active=False)
+        updated = self._set_active(request, queryset, False)
         self.message_user(request, f"{updated} allocations deactivated.")
     deactivate_allocations.short_description = "Deactivate selected allocations"
     
     def checkout_students(self, request, queryset):
         from django.utils import timezone
-        updated = queryset.filter(is_active=True).update(
-            is_active=False, 
+        updated = self._set_active(
+            request, queryset, False,
             checkout_date=timezone.now(),
             checkout_reason="Admin checkout"
         )
         self.message_user(request, f"{updated} students checked out.")
     checkout_students.short_description = "Checkout selected students"
     
+    def _set_active(self, request, queryset, active, **changes):
+        # Save each allocation so room occupancy and is_allocated follow
+        updated = 0
+        for obj in queryset.filter(is_active=not active).select_related('student', 'room'):
+            obj.is_active = active
+            for name, value in changes.items():
+                setattr(obj, name, value)
+            try:
+                obj.save()
+                updated += 1
+            except AllocationError as e:
+                self.message_user(request, f"{obj}: {e}", messages.ERROR)
+        return updated
+    
     def save_model(self, request, obj, form, change):
         if not change:  # New allocation
             obj.allocated_by = request.user
         super().save_model(request, obj, form, change)
 
 
-class NoticeAdmin(admin.ModelAdmin):
+class RankedChangeList(ChangeList):
+    """Lists search results best match first, unless a column is picked"""
+    
+    def get_ordering(self, request, queryset):
+        if self.query.strip() and not self.params.get(ORDER_VAR) and 'search_rank' in queryset.query.annotations:
+            return ['-search_rank', '-pk']
+        return super().get_ordering(request, queryset)
+
+
+class FullTextSearchMixin:
+    """
+    Admin search through the full-text index (see search.py) instead of
+    LIKE scans over long text columns. ``exact_search_fields`` are also
+    matched against the whole search term.
+    """
+    exact_search_fields = ()
+    
+    def get_changelist(self, request, **kwargs):
+        return RankedChangeList
+    
+    def get_search_results(self, request, queryset, search_term):
+        search_term = search_term.strip()
+        if not search_term:
+            return queryset, False
+        condition, rank = search.full_text_match(self.model, search_term)
+        for field in self.exact_search_fields:
+            condition |= Q(**{f'{field}__iexact': search_term})
+        return queryset.filter(condition).annotate(search_rank=rank), False
+
+
+class NoticeAdmin(FullTextSearchMixin, admin.ModelAdmin):
     """Admin configuration for Notice model"""
     
     list_display = ('title', 'category', 'priority', 'is_published', 'created_by', 'created_at', 'expires_at')
-    list_filter = ('category', 'priority', 'is_published', 'is_active', 'created_at')
+    list_filter = ('category', 'priority', 'is_published', 'is_active', 'target_all_students', 'created_at')
     search_fields = ('title', 'content')
+    list_select_related = ('created_by',)
+    search_help_text = 'Finds notices containing every word, best match first.'
     list_editable = ('is_published', 'priority')
     
     fieldsets = (
@@ -257,7 +654,12 @@ class NoticeAdmin(admin.ModelAdmin):
             'fields': ('title', 'content', 'category', 'priority')
         }),
         ('Publishing', {
-            'fields': ('is_active', 'is_published', 'expires_at', 'target_all_students')
+            'fields': ('is_active', 'is_published', 'published_at', 'expires_at')
+        }),
+        ('Audience', {
+            'fields': ('target_all_students', 'target_block', 'target_floor', 'target_faculty',
+                       'target_department', 'target_academic_year', 'target_allocation'),
+            'description': 'Untick "target all students" to send the notice only to students matching every rule set here.'
         }),
     )
     
@@ -269,12 +671,61 @@ class NoticeAdmin(admin.ModelAdmin):
         super().save_model(request, obj, form, change)
 
 
-class ComplaintAdmin(admin.ModelAdmin):
+class DuplicateFilter(admin.SimpleListFilter):
+    """Separate originals, grouped complaints and duplicates"""
+    title = 'duplicates'
+    parameter_name = 'duplicates'
+    
+    def lookups(self, request, model_admin):
+        return (
+            ('original', 'Originals only'),
+            ('grouped', 'With duplicates'),
+            ('duplicate', 'Duplicates only'),
+        )
+    
+    def queryset(self, request, queryset):
+        if self.value() == 'original':
+            return queryset.filter(duplicate_of__isnull=True)
+        if self.value() == 'grouped':
+            return queryset.filter(duplicate_count__gt=0)
+        if self.value() == 'duplicate':
+            return queryset.filter(duplicate_of__isnull=False)
+        return queryset
+
+
+class DuplicateInline(admin.TabularInline):
+    """Complaints joined to or merged into this one"""
+    model = Complaint
+    fk_name = 'duplicate_of'
+    verbose_name = 'Duplicate'
+    verbose_name_plural = 'Duplicates'
+    fields = ('subject', 'submitted_by', 'location', 'created_at')
+    readonly_fields = fields
+    extra = 0
+    can_delete = False
+    show_change_link = True
+    
+    def has_add_permission(self, request, obj=None):
+        return False
+
+
+class ComplaintAdmin(BulkEditMixin, FullTextSearchMixin, admin.ModelAdmin):
     """Admin configuration for Complaint model"""
     
-    list_display = ('subject', 'submitted_by', 'category', 'priority', 'status', 'assigned_to', 'created_at')
-    list_filter = ('category', 'priority', 'status', 'created_at')
-    search_fields = ('subject', 'description', 'submitted_by__username', 'location')
+    list_display = ('subject', 'submitted_by', 'category', 'priority', 'status', 'assigned_to', 'duplicate_count', 'created_at', 'sla_due_at')
+    list_filter = (DuplicateFilter, 'category', 'priority', 'status', 'created_at')
+    search_fields = ('subject', 'description', 'location')
+    exact_search_fields = ('submitted_by__username',)
+    list_select_related = ('submitted_by', 'assigned_to')
+    autocomplete_fields = ('assigned_to',)
+    bulk_edit_choices = {
+        'assigned_to': CustomUser.objects.filter(
+            Q(user_type__in=STAFF_USER_TYPES) | Q(is_staff=True)
+        ).order_by('username'),
+    }
+    show_full_result_count = False
+    paginator = EstimatedCountPaginator
+    search_help_text = 'Finds complaints containing every word (or filed by that username), best match first.'
     list_editable = ('status', 'assigned_to')
     
     fieldsets = (
@@ -282,29 +733,152 @@ class ComplaintAdmin(admin.ModelAdmin):
             'fields': ('submitted_by', 'category', 'priority', 'subject', 'description', 'location')
         }),
         ('Status & Assignment', {
-            'fields': ('status', 'assigned_to', 'assigned_date', 'resolution_notes', 'resolved_date')
+            'fields': ('status', 'assigned_to', 'assigned_date', 'sla_due_at', 'resolution_notes', 'resolved_date')
+        }),
+        ('Duplicates', {
+            'fields': ('duplicate_of', 'similar_complaints')
         }),
     )
     
-    readonly_fields = ('submitted_by', 'created_at', 'updated_at')
+    readonly_fields = ('submitted_by', 'created_at', 'updated_at', 'sla_due_at', 'duplicate_of', 'similar_complaints')
+    inlines = [DuplicateInline]
+    
+    actions = ['assign_to_me', 'mark_in_progress', 'mark_resolved', 'merge_duplicates']
+    
+    def get_queryset(self, request):
+        # Correlated count on the duplicate_of index; no GROUP BY over the search rank
+        counts = (
+            Complaint.objects.filter(duplicate_of=OuterRef('pk')).order_by()
+            .values('duplicate_of').annotate(count=Count('pk')).values('count')
+        )
+        return super().get_queryset(request).annotate(duplicate_count=Coalesce(Subquery(counts), 0))
+    
+    @admin.display(description='Duplicates', ordering='duplicate_count')
+    def duplicate_count(self, obj):
+        return obj.duplicate_count
+    
+    @admin.display(description='Similar open complaints')
+    def similar_complaints(self, obj):
+        if obj.pk is None or obj.duplicate_of_id is not None:
+            return '-'
+        matches = duplicates.find_duplicates(obj)
+        if not matches:
+            return '-'
+        return format_html_join(
+            format_html('<br>'), '<a href="{}">{}</a> ({}% similar)',
+            (
+                (reverse('admin:hostel_management_complaint_change', args=[match.pk]), match.subject,
+                 round(match.similarity * 100))
+                for match in matches
+            ),
+        )
     
-    actions = ['assign_to_me', 'mark_in_progress', 'mark_resolved']
+    @admin.action(description='Merge selected into the earliest one')
+    def merge_duplicates(self, request, queryset):
+        originals = queryset.filter(duplicate_of__isnull=True).order_by('created_at', 'pk')
+        original = originals.first() or queryset.order_by('created_at', 'pk').first().duplicate_of
+        merged = duplicates.merge_complaints(original, queryset)
+        invalidate_dashboard_stats()
+        self.message_user(request, f'{merged} complaints merged into "{original.subject}".')
     
     def assign_to_me(self, request, queryset):
-        queryset.update(assigned_to=request.user, status='in_progress')
+        self._update_complaints(queryset, assigned_to=request.user, status='in_progress')
         self.message_user(request, f"{queryset.count()} complaints assigned to you.")
     assign_to_me.short_description = "Assign selected complaints to me"
     
     def mark_in_progress(self, request, queryset):
-        queryset.update(status='in_progress')
+        self._update_complaints(queryset, status='in_progress')
         self.message_user(request, f"{queryset.count()} complaints marked as in progress.")
     mark_in_progress.short_description = "Mark as in progress"
     
     def mark_resolved(self, request, queryset):
         from django.utils import timezone
-        queryset.update(status='resolved', resolved_date=timezone.now())
+        self._update_complaints(queryset, status='resolved', resolved_date=timezone.now())
         self.message_user(request, f"{queryset.count()} complaints marked as resolved.")
     mark_resolved.short_description = "Mark as resolved"
+    
+    def save_bulk_edits(self, request, forms):
+        # One UPDATE per (status, assignee) before/after pair. The rows are
+        # locked and matched on the values the counters are moved from, so a
+        # change committed while this request runs can't skew them; like the
+        # stock list_editable, an edit still overwrites whatever was changed
+        # after the page was rendered
+        groups = defaultdict(list)
+        for form in forms:
+            before = (form.initial['status'], form.initial['assigned_to'])
+            assignee = form.cleaned_data['assigned_to']
+            groups[(before, (form.cleaned_data['status'], assignee.pk if assignee else None))].append(form.instance.pk)
+        now = timezone.now()
+        saved = set()
+        for ((status, assignee_id), (new_status, new_assignee_id)), pks in groups.items():
+            changes = {'status': new_status, 'assigned_to_id': new_assignee_id, 'updated_at': now}
+            if new_assignee_id not in (None, assignee_id):
+                changes['assigned_date'] = now
+            if new_status in Complaint.OPEN_STATUSES:
+                changes['resolved_date'] = None
+            elif status in Complaint.OPEN_STATUSES:
+                changes['resolved_date'] = now
+            for chunk in allocation.batched(pks):
+                rows = Complaint.objects.select_for_update().filter(pk__in=chunk, status=status, assigned_to=assignee_id)
+                updated = list(rows.values_list('pk', flat=True))
+                Complaint.objects.filter(pk__in=updated).update(**changes)
+                saved.update(updated)
+                HostelStats.objects.apply_complaint_change(
+                    (status, assignee_id), (new_status, new_assignee_id), len(updated)
+                )
+        Complaint.objects.sync_duplicates(saved)
+        invalidate_dashboard_stats()
+        return saved
+    
+    def _update_complaints(self, queryset, **changes):
+        # Update one (status, assignee) group at a time so the open-complaint
+        # counters (global and per staff member) get the exact number of
+        # rows that changed
+        with transaction.atomic():
+            pks = list(queryset.values_list('pk', flat=True))
+            groups = set(queryset.order_by().values_list('status', 'assigned_to').distinct())
+            for status, assignee_id in groups:
+                count = queryset.filter(status=status, assigned_to=assignee_id).update(**changes)
+                after = (
+                    changes.get('status', status),
+                    changes['assigned_to'].pk if 'assigned_to' in changes else assignee_id,
+                )
+                HostelStats.objects.apply_complaint_change((status, assignee_id), after, count)
+            if 'status' in changes:
+                Complaint.objects.sync_duplicates(pks)
+        invalidate_dashboard_stats()
+
+
+class ComplaintRouteAdmin(admin.ModelAdmin):
+    """Which staff members new complaints may be assigned to"""
+    
+    list_display = ('staff', 'category', 'block')
+    list_filter = ('category', 'block')
+    search_fields = ('staff__username', 'staff__first_name', 'staff__last_name', 'block')
+    autocomplete_fields = ('staff',)
+
+
+class HostelStatsAdmin(admin.ModelAdmin):
+    """Read-only view of the hostel counters"""
+    
+    list_display = ('__str__', 'total_rooms', 'available_rooms', 'total_capacity',
+                    'total_occupied', 'pending_applications', 'total_students',
+                    'allocated_students', 'open_complaints', 'updated_at')
+    list_filter = ('scope',)
+    
+    actions = ['recompute_stats']
+    
+    def has_add_permission(self, request):
+        return False
+    
+    def has_change_permission(self, request, obj=None):
+        return False
+    
+    def recompute_stats(self, request, queryset):
+        rows = HostelStats.objects.recompute()
+        invalidate_dashboard_stats()
+        self.message_user(request, f"Hostel statistics rebuilt ({rows} rows).")
+    recompute_stats.short_description = "Rebuild all statistics from scratch"
 
 
 # Register all models
@@ -315,6 +889,8 @@ admin.site.register(RoomApplication, RoomApplicationAdmin)
 admin.site.register(RoomAllocation, RoomAllocationAdmin)
 admin.site.register(Notice, NoticeAdmin)
 admin.site.register(Complaint, ComplaintAdmin)
+admin.site.register(ComplaintRoute, ComplaintRouteAdmin)
+admin.site.register(HostelStats, HostelStatsAdmin)
 
 # Customize admin site header and title
 admin.site.site_header = "BAU Hostel Management System"
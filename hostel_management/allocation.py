@@ -0,0 +1,250 @@
+"""
+Bulk decisions on room applications.
+
+These helpers approve or reject many RoomApplication rows in a fixed
+number of SQL statements (per batch of BATCH_SIZE rows) while keeping the
+same invariants as RoomApplication.save(): room occupancy never exceeds
+capacity and StudentProfile.is_allocated follows the approved applications.
+"""
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+from itertools import islice
+
+from django.db import IntegrityError, transaction
+from django.db.models import Count, Exists, F, OuterRef
+from django.db.models.functions import Greatest
+from django.utils import timezone
+
+from .models import AllocationError, HostelStats, NoticeRecipient, Room, RoomApplication, StudentProfile
+from .live import publish_room_changes
+from .stats import invalidate_dashboard_stats
+
+# Keep IN (...) lists well below SQLite's bound-parameter limit
+BATCH_SIZE = 500
+
+
+@dataclass
+class DecisionResult:
+    """Outcome of a bulk approve/reject call."""
+    updated: list = field(default_factory=list)
+    room_full: list = field(default_factory=list)
+    already_allocated: list = field(default_factory=list)
+
+    @property
+    def skipped(self):
+        return len(self.room_full) + len(self.already_allocated)
+
+    def summary(self, verb):
+        message = f"{len(self.updated)} applications {verb}."
+        if self.room_full:
+            message += f" {len(self.room_full)} skipped because the room is full."
+        if self.already_allocated:
+            message += f" {len(self.already_allocated)} skipped because the student is already allocated."
+        return message
+
+
+def batched(values, size=BATCH_SIZE):
+    iterator = iter(values)
+    while chunk := list(islice(iterator, size)):
+        yield chunk
+
+
+def _update_in(queryset, pks, **values):
+    updated = 0
+    for chunk in batched(pks):
+        updated += queryset.filter(pk__in=chunk).update(**values)
+    return updated
+
+
+def _adjust_occupancy(room_deltas, totals):
+    """
+    Apply per-room occupancy deltas, one UPDATE per distinct delta, and
+    collect the matching HostelStats changes into ``totals``.
+
+    Returns each room's Room.counter_state() from before the change.
+    """
+    states = {}
+    for chunk in batched(room_deltas):
+        for room_id, *state in (
+            Room.objects.select_for_update().filter(pk__in=chunk).order_by('pk')
+            .values_list('pk', *Room.COUNTER_FIELDS)
+        ):
+            states[room_id] = tuple(state)
+
+    by_delta = defaultdict(list)
+    for room_id, delta in room_deltas.items():
+        if delta and room_id in states:
+            by_delta[delta].append(room_id)
+            block, room_type, capacity, occupancy, is_available = states[room_id]
+            after = (block, room_type, capacity, max(0, occupancy + delta), is_available)
+            HostelStats.objects.collect_room_change(totals, states[room_id], after)
+    now = timezone.now()
+    for delta, room_ids in by_delta.items():
+        if delta > 0:
+            occupancy = F('current_occupancy') + delta
+        else:
+            occupancy = Greatest(F('current_occupancy') + delta, 0)
+        _update_in(Room.objects.all(), room_ids, current_occupancy=occupancy, updated_at=now)
+    publish_room_changes(room_id for room_ids in by_delta.values() for room_id in room_ids)
+    return states
+
+
+def _refresh_is_allocated(student_ids):
+    """Clear is_allocated for students left without an approved application."""
+    still_approved = RoomApplication.objects.filter(student=OuterRef('pk'), status='approved')
+    cleared = _update_in(
+        StudentProfile.objects.filter(is_allocated=True).exclude(Exists(still_approved)),
+        student_ids,
+        is_allocated=False,
+    )
+    HostelStats.objects.bump_global(allocated_students=-cleared)
+    NoticeRecipient.objects.refresh_students(student_ids)
+
+
+@transaction.atomic
+def approve_applications(applications, reviewer=None):
+    """
+    Approve the given pending applications, highest priority first.
+
+    Applications whose room has no free bed left, or whose student is already
+    allocated (or gets a bed earlier in the same batch), are skipped.
+    """
+    candidates = list(
+        applications.filter(status='pending')
+        .select_for_update()
+        .order_by('-priority_score', 'application_date', 'pk')
+        .values_list('pk', 'room_id', 'student_id')
+    )
+    result = DecisionResult()
+    if not candidates:
+        return result
+
+    room_ids = {room_id for _, room_id, _ in candidates}
+    student_ids = {student_id for _, _, student_id in candidates}
+    free_beds = {}
+    allocated = set()
+    for chunk in batched(sorted(room_ids)):
+        free_beds.update(
+            Room.objects.select_for_update().filter(pk__in=chunk).order_by('pk')
+            .annotate(free=F('capacity') - F('current_occupancy'))
+            .values_list('pk', 'free')
+        )
+    for chunk in batched(student_ids):
+        allocated.update(
+            StudentProfile.objects.filter(pk__in=chunk, is_allocated=True).values_list('pk', flat=True)
+        )
+
+    room_deltas = Counter()
+    for pk, room_id, student_id in candidates:
+        if student_id in allocated:
+            result.already_allocated.append(pk)
+        elif free_beds.get(room_id, 0) - room_deltas[room_id] <= 0:
+            result.room_full.append(pk)
+        else:
+            result.updated.append(pk)
+            room_deltas[room_id] += 1
+            allocated.add(student_id)
+
+    if not result.updated:
+        return result
+
+    approved = set(result.updated)
+    commit_approvals(
+        result.updated,
+        room_deltas,
+        {student_id for pk, _, student_id in candidates if pk in approved},
+        reviewer,
+    )
+    return result
+
+
+def commit_approvals(application_pks, room_deltas, student_ids, reviewer=None):
+    """
+    Write an already computed set of approvals of pending applications.
+
+    ``room_deltas`` maps room id to the number of beds taken. Must be called
+    inside a transaction; raises AllocationError (rolling the transaction
+    back) if an application is no longer pending or a room would overflow.
+    """
+    now = timezone.now()
+    changed = _update_in(
+        RoomApplication.objects.filter(status='pending'), application_pks,
+        status='approved', reviewed_by=reviewer, reviewed_date=now, updated_at=now,
+    )
+    if changed != len(application_pks):
+        raise AllocationError('Some applications were changed by someone else. Please try again.')
+    totals = defaultdict(Counter)
+    try:
+        # The room_occupancy_within_capacity constraint rejects overflows
+        with transaction.atomic():
+            states = _adjust_occupancy(room_deltas, totals)
+    except IntegrityError:
+        raise AllocationError('Some rooms filled up in the meantime. Please try again.')
+    for room_id, taken in room_deltas.items():
+        block, room_type = states[room_id][:2]
+        HostelStats.objects.collect(totals, block, room_type, pending_applications=-taken)
+    HostelStats.objects.apply(totals)
+    for chunk in batched(student_ids):
+        StudentProfile.objects.set_allocated(chunk)
+    NoticeRecipient.objects.refresh_students(student_ids)
+    invalidate_dashboard_stats()
+
+
+@transaction.atomic
+def reject_applications(applications, reviewer=None, status='rejected'):
+    """
+    Reject (or withdraw) the given applications.
+
+    Beds held by previously approved applications are released, and students
+    left without an approved application are marked as not allocated.
+    """
+    if status not in ('rejected', 'withdrawn'):
+        raise ValueError(f"Cannot reject applications with status {status!r}")
+
+    rows = list(
+        applications.exclude(status=status)
+        .select_for_update()
+        .values_list('pk', 'student_id', 'status', 'room__block', 'room__room_type')
+    )
+    result = DecisionResult()
+    if not rows:
+        return result
+
+    result.updated = [row[0] for row in rows]
+    approved_pks = [row[0] for row in rows if row[2] == 'approved']
+
+    # Beds to hand back, per room
+    room_deltas = Counter()
+    for chunk in batched(approved_pks):
+        for row in (
+            RoomApplication.objects.filter(pk__in=chunk)
+            .values('room_id').annotate(released=Count('pk')).order_by()
+        ):
+            room_deltas[row['room_id']] -= row['released']
+
+    now = timezone.now()
+    changed = _update_in(
+        RoomApplication.objects.exclude(status=status), result.updated,
+        status=status, reviewed_by=reviewer, reviewed_date=now, updated_at=now,
+    )
+    if changed != len(result.updated):
+        raise AllocationError('Some applications were changed by someone else. Please try again.')
+    totals = defaultdict(Counter)
+    for _, _, old_status, block, room_type in rows:
+        if old_status == 'pending':
+            HostelStats.objects.collect(totals, block, room_type, pending_applications=-1)
+    if approved_pks:
+        _adjust_occupancy(room_deltas, totals)
+        _refresh_is_allocated({row[1] for row in rows if row[2] == 'approved'})
+    HostelStats.objects.apply(totals)
+    invalidate_dashboard_stats()
+    return result
+
+
+def decide_applications(applications, status, reviewer=None):
+    """Apply ``status`` to the given applications through the bulk engine."""
+    if status == 'approved':
+        return approve_applications(applications, reviewer)
+    if status in ('rejected', 'withdrawn'):
+        return reject_applications(applications, reviewer, status)
+    raise AllocationError(f"Applications cannot be moved back to {status!r} in bulk.")
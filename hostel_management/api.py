@@ -0,0 +1,109 @@
+"""
+Read-only JSON API for room availability (v1).
+
+Responses carry an ETag built from a version key for the whole room table,
+``(count, max(updated_at))``, which the database answers from indexes
+without reading room rows. Every write that changes a room bumps
+updated_at, including the conditional UPDATEs in RoomManager and the bulk
+allocation engine, so the key moves whenever any room does. A matching
+If-None-Match gets a 304 before any room is loaded.
+
+Like the room pages, the API is for logged-in users only; responses may
+be cached by the browser (not shared proxies) for MAX_AGE seconds before
+revalidating.
+"""
+import hashlib
+from functools import wraps
+
+from django.db.models import Count, Max
+from django.http import JsonResponse
+from django.views.decorators.cache import cache_control
+from django.views.decorators.http import condition, require_safe
+
+from .facets import parse_filters
+from .models import Room
+from .pagination import InvalidCursor, KeysetPaginator
+from .search import search_rooms
+
+MAX_AGE = 10
+PAGE_SIZE = 100
+
+
+def room_version():
+    """Cheap version key that changes whenever any room changes."""
+    version = Room.objects.aggregate(rooms=Count('pk'), updated=Max('updated_at'))
+    updated = version['updated'].timestamp() if version['updated'] else 0
+    return f"{version['rooms']}-{updated:.6f}"
+
+
+def room_etag(request, *args, **kwargs):
+    return hashlib.md5(f'{room_version()} {request.get_full_path()}'.encode()).hexdigest()
+
+
+def login_required_json(view):
+    """login_required for the API: a 401 instead of a redirect to the login page."""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not request.user.is_authenticated:
+            return JsonResponse({'detail': 'Authentication required.'}, status=401)
+        return view(request, *args, **kwargs)
+    return wrapper
+
+
+def serialize_room(room):
+    return {
+        'id': room.pk,
+        'room_number': room.room_number,
+        'block': room.block,
+        'floor': room.floor,
+        'room_type': room.room_type,
+        'capacity': room.capacity,
+        'current_occupancy': room.current_occupancy,
+        'available_beds': room.available_beds,
+        'has_ac': room.has_ac,
+        'has_attached_bathroom': room.has_attached_bathroom,
+        'is_available': room.is_available,
+        'updated_at': room.updated_at,
+    }
+
+
+@require_safe
+@login_required_json
+@cache_control(private=True, max_age=MAX_AGE)
+@condition(etag_func=room_etag)
+def room_list(request):
+    """
+    Available rooms, in room list order, 100 per page. Accepts the room
+    list's ``search`` and facet filters, and ``cursor`` from ``next``.
+    """
+    rooms = Room.objects.filter(is_available=True, **parse_filters(request.GET))
+    search = request.GET.get('search')
+    if search:
+        rooms = search_rooms(rooms, search)
+
+    paginator = KeysetPaginator(rooms, PAGE_SIZE, ('block', 'floor', 'room_number'))
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor as e:
+        return JsonResponse({'detail': str(e)}, status=400)
+
+    next_url = None
+    if page.has_next():
+        params = request.GET.copy()
+        params['cursor'] = page.next_cursor
+        next_url = request.build_absolute_uri(f'{request.path}?{params.urlencode()}')
+    return JsonResponse({
+        'results': [serialize_room(room) for room in page],
+        'next': next_url,
+    })
+
+
+@require_safe
+@login_required_json
+@cache_control(private=True, max_age=MAX_AGE)
+@condition(etag_func=room_etag)
+def room_detail(request, pk):
+    room = Room.objects.filter(pk=pk).first()
+    if room is None:
+        return JsonResponse({'detail': 'Room not found.'}, status=404)
+    return JsonResponse(serialize_room(room))
@@ -0,0 +1,151 @@
+"""
+Automatic complaint assignment.
+
+Complaints are routed to the eligible staff member with the fewest open
+complaints. Eligibility comes from ComplaintRoute rows matching the
+complaint's category and the block the submitter lives in; while no routes
+are set up at all, every active hostel staff user is eligible.
+
+Loads are the per-staff HostelStats counters, which every complaint write
+keeps up to date in its own transaction. ``assign_complaint`` locks the
+candidates' counter rows while it picks, so concurrent submissions spread
+out instead of all landing on the same person.
+"""
+from collections import Counter, defaultdict
+from dataclasses import dataclass, field
+
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+
+from .allocation import batched
+from .models import Complaint, ComplaintRoute, CustomUser, HostelStats, RoomAllocation, RoomApplication
+
+
+def submitter_blocks(user_ids):
+    """Block each of ``user_ids`` lives in (active allocation first, then approved application)."""
+    blocks = {}
+    for chunk in batched(set(user_ids)):
+        for held in (
+            RoomApplication.objects.filter(student__user__in=chunk, status='approved'),
+            RoomAllocation.objects.filter(student__user__in=chunk, is_active=True),
+        ):
+            blocks.update(held.values_list('student__user_id', 'room__block'))
+    return blocks
+
+
+class Router:
+    """Eligible staff per (category, block), from the routes loaded once."""
+
+    def __init__(self):
+        self.routes = list(
+            ComplaintRoute.objects.filter(staff__is_active=True).only('staff_id', 'category', 'block')
+        )
+        self.fallback = [] if self.routes else list(
+            CustomUser.objects.filter(user_type='staff', is_active=True)
+            .order_by('pk').values_list('pk', flat=True)
+        )
+
+    def eligible(self, category, block):
+        if not self.routes:
+            return self.fallback
+        return sorted({route.staff_id for route in self.routes if route.matches(category, block)})
+
+
+def least_loaded(loads, staff_ids):
+    return min(staff_ids, key=lambda pk: (loads[pk], pk))
+
+
+def assign_complaint(complaint):
+    """
+    Set ``assigned_to`` on an unsaved complaint to the least-loaded eligible
+    staff member and return their id (None if nobody is eligible). Call inside
+    the transaction that saves the complaint; the save bumps their load.
+    """
+    staff_ids = Router().eligible(
+        complaint.category, submitter_blocks([complaint.submitted_by_id]).get(complaint.submitted_by_id)
+    )
+    if not staff_ids:
+        return None
+    keys = [str(pk) for pk in staff_ids]
+    HostelStats.objects.bulk_create(
+        [HostelStats(scope='staff', key=key) for key in keys], ignore_conflicts=True
+    )
+    # Lock the candidates' counters so concurrent submissions see each other
+    loads = {
+        int(key): load for key, load in
+        HostelStats.objects.select_for_update().filter(scope='staff', key__in=keys)
+        .order_by('key').values_list('key', 'open_complaints')
+    }
+    complaint.assigned_to_id = least_loaded(loads, staff_ids)
+    complaint.assigned_date = timezone.now()
+    return complaint.assigned_to_id
+
+
+@dataclass
+class RebalancePlan:
+    """Outcome of a backlog rebalance."""
+    moves: list = field(default_factory=list)  # (complaint pk, status, old assignee, new assignee)
+    unroutable: list = field(default_factory=list)
+    loads: dict = field(default_factory=dict)
+
+    def report_lines(self):
+        usernames = dict(CustomUser.objects.filter(pk__in=self.loads).values_list('pk', 'username'))
+        lines = [f"{len(self.moves)} complaints assigned."]
+        if self.unroutable:
+            lines.append(f"{len(self.unroutable)} complaints have no eligible staff member.")
+        for pk, load in sorted(self.loads.items(), key=lambda item: -item[1]):
+            lines.append(f"  {usernames.get(pk, pk)}: {load} open")
+        return lines
+
+
+@transaction.atomic
+def rebalance_complaints(reassign_unstarted=False, dry_run=False):
+    """
+    Assign every unassigned open complaint, earliest SLA deadline first, to
+    the least-loaded eligible staff member. With ``reassign_unstarted``,
+    complaints that are assigned but still 'submitted' are dealt out again
+    too. Writes one UPDATE per (old, new) assignee pair.
+    """
+    backlog = Complaint.objects.filter(status__in=Complaint.OPEN_STATUSES, assigned_to__isnull=True)
+    if reassign_unstarted:
+        backlog = backlog | Complaint.objects.filter(status='submitted', assigned_to__isnull=False)
+    backlog = list(
+        backlog.select_for_update().order_by('sla_due_at', 'pk')
+        .values_list('pk', 'status', 'category', 'submitted_by', 'assigned_to')
+    )
+    plan = RebalancePlan()
+    router = Router()
+    loads = Counter(dict(
+        Complaint.objects.filter(status__in=Complaint.OPEN_STATUSES, assigned_to__isnull=False)
+        .order_by().values_list('assigned_to').annotate(Count('pk'))
+    ))
+    for _, _, _, _, assignee_id in backlog:
+        if assignee_id is not None:
+            loads[assignee_id] -= 1
+    blocks = submitter_blocks(row[3] for row in backlog)
+
+    for pk, status, category, submitted_by, assignee_id in backlog:
+        staff_ids = router.eligible(category, blocks.get(submitted_by))
+        if not staff_ids:
+            plan.unroutable.append(pk)
+            if assignee_id is not None:
+                loads[assignee_id] += 1
+            continue
+        staff_id = least_loaded(loads, staff_ids)
+        loads[staff_id] += 1
+        if staff_id != assignee_id:
+            plan.moves.append((pk, status, assignee_id, staff_id))
+    plan.loads = {pk: load for pk, load in loads.items() if load}
+    if dry_run or not plan.moves:
+        return plan
+
+    groups = defaultdict(list)
+    for pk, status, old, new in plan.moves:
+        groups[(status, old, new)].append(pk)
+    now = timezone.now()
+    for (status, old, new), pks in groups.items():
+        for chunk in batched(pks):
+            Complaint.objects.filter(pk__in=chunk).update(assigned_to=new, assigned_date=now, updated_at=now)
+        HostelStats.objects.apply_complaint_change((status, old), (status, new), len(pks))
+    return plan
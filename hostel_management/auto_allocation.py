@@ -0,0 +1,248 @@
+"""
+Automatic room allocation for pending applications.
+
+All open applications and room capacities are loaded once into compact
+integer arrays, the assignment is solved in memory, and the result is
+written back through allocation.commit_approvals() in one transaction.
+
+Two strategies are available:
+
+``greedy``
+    Students are served in priority order and get the first room (in the
+    order they applied) that still has a free bed.
+
+``matching``
+    Same order, but when all of a student's rooms are full we look for an
+    augmenting path: a chain of already placed students who can move to
+    another room they applied for, freeing a bed. Placed students are never
+    dropped, so the set of housed students is the highest-priority set that
+    fits, and usually larger than with ``greedy``.
+"""
+import time
+from array import array
+from collections import Counter, deque
+from dataclasses import dataclass, field
+
+from django.db import transaction
+
+from .allocation import commit_approvals
+from .models import Room, RoomApplication
+
+STRATEGIES = ('greedy', 'matching')
+
+
+@dataclass
+class AllocationProblem:
+    """Pending applications and free beds as dense integer arrays."""
+    application_pks: array       # application index -> RoomApplication.pk
+    room_ids: array              # room index -> Room.pk
+    student_ids: array           # student index -> StudentProfile.pk
+    free_beds: array             # room index -> free beds
+    choice_start: array          # student index -> offset into choices
+    choices: array               # room indexes, grouped by student, in preference order
+    choice_applications: array   # application index for each entry of choices
+
+    @property
+    def student_count(self):
+        return len(self.student_ids)
+
+    def student_choices(self, student):
+        return range(self.choice_start[student], self.choice_start[student + 1])
+
+
+@dataclass
+class AllocationPlan:
+    """Result of a solver run."""
+    strategy: str
+    students: int = 0
+    beds: int = 0
+    application_pks: list = field(default_factory=list)
+    room_deltas: Counter = field(default_factory=Counter)
+    student_ids: list = field(default_factory=list)
+    choice_ranks: Counter = field(default_factory=Counter)
+    load_seconds: float = 0.0
+    solve_seconds: float = 0.0
+    committed: bool = False
+
+    @property
+    def placed(self):
+        return len(self.application_pks)
+
+    def report_lines(self):
+        lines = [
+            f"Strategy: {self.strategy}",
+            f"Students with pending applications: {self.students}",
+            f"Free beds in requested rooms: {self.beds}",
+            f"Students placed: {self.placed}",
+            f"Students left pending: {self.students - self.placed}",
+        ]
+        for rank in sorted(self.choice_ranks):
+            lines.append(f"  choice #{rank + 1}: {self.choice_ranks[rank]}")
+        lines.append(f"Load: {self.load_seconds:.2f}s, solve: {self.solve_seconds:.2f}s")
+        return lines
+
+
+def load_problem(applications=None):
+    """
+    Build an AllocationProblem from pending applications.
+
+    Applications of already allocated students and applications for
+    unavailable rooms are ignored.
+    """
+    if applications is None:
+        applications = RoomApplication.objects.all()
+    rows = (
+        applications.filter(status='pending', student__is_allocated=False, room__is_available=True)
+        .order_by('-priority_score', 'application_date', 'pk')
+        .values_list('pk', 'student_id', 'room_id')
+    )
+
+    application_pks = array('q')
+    room_index = {}
+    per_student = {}
+    for pk, student_id, room_id in rows.iterator(chunk_size=5000):
+        room = room_index.setdefault(room_id, len(room_index))
+        # dicts keep insertion order, so students come out in priority order
+        per_student.setdefault(student_id, []).append((room, len(application_pks)))
+        application_pks.append(pk)
+
+    room_ids = array('q', room_index)
+    free_beds = array('l', [0]) * len(room_ids)
+    beds = (
+        Room.objects.filter(is_available=True)
+        .values_list('pk', 'capacity', 'current_occupancy')
+        .iterator(chunk_size=5000)
+    )
+    for room_id, capacity, occupancy in beds:
+        if room_id in room_index:
+            free_beds[room_index[room_id]] = max(0, capacity - occupancy)
+
+    student_ids = array('q', per_student)
+    choice_start = array('l', [0])
+    choices = array('l')
+    choice_applications = array('l')
+    for entries in per_student.values():
+        for room, application in entries:
+            choices.append(room)
+            choice_applications.append(application)
+        choice_start.append(len(choices))
+
+    return AllocationProblem(
+        application_pks=application_pks,
+        room_ids=room_ids,
+        student_ids=student_ids,
+        free_beds=free_beds,
+        choice_start=choice_start,
+        choices=choices,
+        choice_applications=choice_applications,
+    )
+
+
+def solve(problem, strategy='greedy'):
+    """
+    Assign students to rooms. Returns an array mapping each student index to
+    the chosen offset into ``problem.choices``, or -1 if left unplaced.
+    """
+    if strategy not in STRATEGIES:
+        raise ValueError(f"Unknown strategy {strategy!r}; expected one of {STRATEGIES}")
+
+    free = array('l', problem.free_beds)
+    assigned = array('l', [-1]) * problem.student_count
+    occupants = [[] for _ in range(len(problem.room_ids))]
+    choices = problem.choices
+    # Rooms from which no free bed can be reached; they stay that way, since
+    # beds are only ever taken (see module docstring)
+    dead = bytearray(len(problem.room_ids))
+
+    for student in range(problem.student_count):
+        for offset in problem.student_choices(student):
+            room = choices[offset]
+            if free[room] > 0:
+                free[room] -= 1
+                assigned[student] = offset
+                occupants[room].append(student)
+                break
+        else:
+            if strategy == 'matching':
+                _augment(problem, student, free, assigned, occupants, dead)
+    return assigned
+
+
+def _augment(problem, student, free, assigned, occupants, dead):
+    """Breadth-first search for a chain of moves that frees a bed for ``student``."""
+    choices = problem.choices
+    # room -> (student that would move in, choice offset used)
+    reached = {}
+    queue = deque()
+    for offset in problem.student_choices(student):
+        room = choices[offset]
+        if not dead[room] and room not in reached:
+            reached[room] = (student, offset)
+            queue.append(room)
+
+    while queue:
+        room = queue.popleft()
+        for mover in occupants[room]:
+            for offset in problem.student_choices(mover):
+                target = choices[offset]
+                if dead[target] or target in reached:
+                    continue
+                reached[target] = (mover, offset)
+                if free[target] > 0:
+                    _apply_path(problem, target, reached, free, assigned, occupants)
+                    return True
+                queue.append(target)
+
+    for room in reached:
+        dead[room] = 1
+    return False
+
+
+def _apply_path(problem, room, reached, free, assigned, occupants):
+    free[room] -= 1
+    while True:
+        mover, offset = reached[room]
+        previous = assigned[mover]
+        assigned[mover] = offset
+        occupants[room].append(mover)
+        if previous == -1:
+            return
+        room = problem.choices[previous]
+        occupants[room].remove(mover)
+
+
+def build_plan(problem, assigned, strategy):
+    plan = AllocationPlan(
+        strategy=strategy,
+        students=problem.student_count,
+        beds=sum(problem.free_beds),
+    )
+    for student, offset in enumerate(assigned):
+        if offset == -1:
+            continue
+        plan.application_pks.append(problem.application_pks[problem.choice_applications[offset]])
+        plan.room_deltas[problem.room_ids[problem.choices[offset]]] += 1
+        plan.student_ids.append(problem.student_ids[student])
+        plan.choice_ranks[offset - problem.choice_start[student]] += 1
+    return plan
+
+
+def auto_allocate(applications=None, strategy='greedy', reviewer=None, dry_run=False):
+    """
+    Solve the allocation for pending applications and, unless ``dry_run``,
+    approve the chosen ones in a single transaction.
+    """
+    started = time.perf_counter()
+    problem = load_problem(applications)
+    loaded = time.perf_counter()
+    assigned = solve(problem, strategy)
+    solved = time.perf_counter()
+
+    plan = build_plan(problem, assigned, strategy)
+    plan.load_seconds = loaded - started
+    plan.solve_seconds = solved - loaded
+    if not dry_run and plan.application_pks:
+        with transaction.atomic():
+            commit_approvals(plan.application_pks, plan.room_deltas, plan.student_ids, reviewer)
+        plan.committed = True
+    return plan
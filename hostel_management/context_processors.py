@@ -0,0 +1,11 @@
+from django.utils.functional import SimpleLazyObject
+
+from .notices import unread_count
+
+
+def notices(request):
+    """``unread_notice_count`` for the navbar badge, computed on first use."""
+    user = getattr(request, 'user', None)
+    if user is None:
+        return {}
+    return {'unread_notice_count': SimpleLazyObject(lambda: unread_count(user))}
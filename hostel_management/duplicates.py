@@ -0,0 +1,181 @@
+"""
+Near-duplicate complaint detection.
+
+Every complaint stores a MinHash signature of the words of its heading
+(subject and location) and, separately, of its description
+(``Complaint.text_signature``: HALF values for each). Students describe the
+same problem in very different words, so two complaints are as similar as
+the closer of the two parts.
+
+Each half is cut into BANDS bands of ROWS values, and each band is hashed
+into a ComplaintTextBucket row. Two parts whose word sets have Jaccard
+similarity s share at least one bucket with probability
+1 - (1 - s**ROWS)**BANDS: about 0.99 at s = 0.5, under 0.15 at s = 0.1.
+
+So the candidates for a new complaint are the open complaints in any of its
+buckets, found with one indexed lookup however many complaints are open,
+and only those are compared signature to signature. Duplicates are
+recorded with ``Complaint.duplicate_of`` (joined at submission or merged in
+the admin) and follow their original's status.
+
+Signatures are recomputed by Complaint.save() when the text changes; text
+changed with update() is not re-indexed.
+"""
+import random
+import re
+import zlib
+from collections import defaultdict
+from hashlib import blake2b
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+
+from .allocation import batched
+from .models import Complaint, ComplaintTextBucket, HostelStats
+
+BANDS = 15
+ROWS = 2
+HALF = BANDS * ROWS
+# Least estimated Jaccard similarity offered as a duplicate
+DEFAULT_SIMILARITY = 0.5
+MAX_CANDIDATES = 200
+MAX_MATCHES = 5
+# Never offered to other students to join at submission
+PRIVATE_CATEGORIES = frozenset({'security'})
+STOP_WORDS = frozenset(
+    'a an and are at be been for from has have in is it its my of on or our so the this to was we with'.split()
+)
+
+_PRIME = (1 << 61) - 1
+# Fixed seed: signatures must agree across processes and releases
+_rng = random.Random(0xC0FFEE)
+_PERMUTATIONS = [(_rng.randrange(1, _PRIME), _rng.randrange(_PRIME)) for _ in range(HALF)]
+
+
+def similarity_threshold():
+    return getattr(settings, 'HOSTEL_DUPLICATE_COMPLAINT_SIMILARITY', DEFAULT_SIMILARITY)
+
+
+def shingles(text):
+    """Hashes of the words of ``text``, lower-cased, without stop words or a plural 's'."""
+    words = set()
+    for word in re.findall(r'\w+', text.lower()):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        words.add(zlib.crc32(word.encode()))
+    return words
+
+
+def minhash(text):
+    """HALF MinHash values of ``text``, or HALF Nones if it has no words."""
+    hashes = shingles(text)
+    if not hashes:
+        return [None] * HALF
+    return [min((a * h + b) % _PRIME for h in hashes) for a, b in _PERMUTATIONS]
+
+
+def text_signature(complaint):
+    """Signature of ``complaint``'s heading followed by that of its description."""
+    return minhash(f'{complaint.subject} {complaint.location}') + minhash(complaint.description)
+
+
+def band_keys(signature):
+    """One signed 64-bit bucket key per band of ``signature`` with words in it."""
+    keys = []
+    for band in range(2 * BANDS):
+        values = signature[band * ROWS:(band + 1) * ROWS]
+        if values and None not in values:
+            digest = blake2b(repr((band, values)).encode(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def similarity(a, b):
+    """Estimated Jaccard similarity of the closer part (heading or description) of two signatures."""
+    best = 0.0
+    for start in (0, HALF):
+        pairs = list(zip(a[start:start + HALF], b[start:start + HALF]))
+        if pairs and None not in pairs[0]:
+            best = max(best, sum(x == y for x, y in pairs) / len(pairs))
+    return best
+
+
+def find_duplicates(complaint, limit=MAX_MATCHES):
+    """
+    Open complaints (not themselves duplicates) in ``complaint``'s category
+    whose text is close to its own, most similar first, each with a
+    ``similarity`` attribute. Fills in ``complaint.text_signature`` if it is
+    unsaved.
+    """
+    if complaint.pk is None:
+        complaint.text_signature = text_signature(complaint)
+    keys = band_keys(complaint.text_signature)
+    if not keys:
+        return []
+    candidates = (
+        Complaint.objects.filter(
+            pk__in=ComplaintTextBucket.objects.filter(key__in=keys).values('complaint'),
+            category=complaint.category,
+            status__in=Complaint.OPEN_STATUSES,
+            duplicate_of__isnull=True,
+        )
+        .exclude(pk=complaint.pk)
+        .select_related('submitted_by')
+        .order_by('-created_at')[:MAX_CANDIDATES]
+    )
+    threshold = similarity_threshold()
+    matches = []
+    for candidate in candidates:
+        candidate.similarity = similarity(complaint.text_signature, candidate.text_signature)
+        if candidate.similarity >= threshold:
+            matches.append(candidate)
+    matches.sort(key=lambda match: -match.similarity)
+    return matches[:limit]
+
+
+def joinable_duplicates(complaint):
+    """The find_duplicates() a student may be offered to join ``complaint`` to."""
+    if complaint.category in PRIVATE_CATEGORIES:
+        return []
+    return find_duplicates(complaint)
+
+
+def join_complaint(complaint, original):
+    """
+    Make unsaved ``complaint`` a duplicate of ``original``: it takes the
+    original's status and is not assigned to anyone, so it adds nothing to
+    the staff queue or workloads.
+    """
+    complaint.duplicate_of = original
+    complaint.status = original.status
+    complaint.assigned_to = None
+    complaint.assigned_date = None
+
+
+@transaction.atomic
+def merge_complaints(original, complaints):
+    """
+    Mark ``complaints`` (a queryset) as duplicates of ``original``, along
+    with anything already merged into them. Returns how many were merged.
+    """
+    pks = list(complaints.values_list('pk', flat=True))
+    rows = list(
+        Complaint.objects.select_for_update()
+        .filter(Q(pk__in=pks) | Q(duplicate_of__in=pks)).exclude(pk=original.pk)
+        .values_list('pk', 'status', 'assigned_to')
+    )
+    groups = defaultdict(list)
+    for pk, status, assignee_id in rows:
+        groups[(status, assignee_id)].append(pk)
+    for (status, assignee_id), group in groups.items():
+        for chunk in batched(group):
+            Complaint.objects.filter(pk__in=chunk).update(
+                duplicate_of=original, status=original.status, assigned_to=None, assigned_date=None,
+                resolved_date=original.resolved_date, updated_at=timezone.now(),
+            )
+        HostelStats.objects.apply_complaint_change((status, assignee_id), (original.status, None), len(group))
+    return len(rows)
@@ -0,0 +1,100 @@
+"""
+Faceted availability counts for the room browser.
+
+One grouped query counts rooms with free beds per combination of the facet
+fields; the per-facet numbers are then summed up in Python. Each facet is
+counted with every *other* selected filter applied but not its own, so the
+counts next to a filter say how many rooms picking that value would leave.
+
+The grouped rows only depend on the search text, so they are cached
+briefly per search and shared by every filter combination.
+"""
+import hashlib
+
+from django.core.cache import cache
+from django.core.exceptions import ValidationError
+from django.db.models import Count, F
+
+from .models import Room
+from .search import search_rooms
+
+FACET_LABELS = {
+    'block': 'Block',
+    'floor': 'Floor',
+    'room_type': 'Room Type',
+    'has_ac': 'Air Conditioned',
+    'has_attached_bathroom': 'Attached Bathroom',
+}
+FACET_FIELDS = tuple(FACET_LABELS)
+CACHE_TIMEOUT = 30
+
+
+def parse_filters(params):
+    """Valid facet filters from request GET parameters, as Python values."""
+    filters = {}
+    for name in FACET_FIELDS:
+        value = params.get(name)
+        if value in (None, ''):
+            continue
+        try:
+            filters[name] = Room._meta.get_field(name).to_python(value)
+        except ValidationError:
+            continue
+    return filters
+
+
+def facet_rows(search=''):
+    """``[(block, floor, room_type, has_ac, has_attached_bathroom, rooms), ...]``"""
+    search = search.strip()
+    key = 'hostel_facets:rooms:' + hashlib.md5(search.lower().encode()).hexdigest()
+    rows = cache.get(key)
+    if rows is None:
+        rooms = Room.objects.filter(is_available=True, current_occupancy__lt=F('capacity'))
+        rows = list(
+            search_rooms(rooms, search)
+            .order_by()
+            .values_list(*FACET_FIELDS)
+            .annotate(rooms=Count('pk'))
+        )
+        cache.set(key, rows, CACHE_TIMEOUT)
+    return rows
+
+
+def facet_counts(search='', filters=None):
+    """
+    Counts of rooms with free beds for each facet value, given the current
+    search and filters. Returns a list of facets, each a dict with ``name``,
+    ``label`` and ``options`` (dicts of value, label, count, selected).
+    """
+    filters = filters or {}
+    rows = facet_rows(search)
+    facets = []
+    for index, name in enumerate(FACET_FIELDS):
+        others = [
+            (FACET_FIELDS.index(other), value)
+            for other, value in filters.items() if other != name
+        ]
+        counts = {}
+        for row in rows:
+            if all(row[i] == value for i, value in others):
+                counts[row[index]] = counts.get(row[index], 0) + row[-1]
+        if name in filters:
+            counts.setdefault(filters[name], 0)
+
+        field = Room._meta.get_field(name)
+        labels = dict(field.flatchoices)
+        facets.append({
+            'name': name,
+            'label': FACET_LABELS[name],
+            'boolean': field.get_internal_type() == 'BooleanField',
+            'options': [
+                {
+                    'value': value,
+                    'label': labels.get(value, value),
+                    'count': counts[value],
+                    'selected': name in filters and filters[name] == value,
+                }
+                for value in sorted(counts)
+            ],
+        })
+    return facets
@@ -0,0 +1,27 @@
+"""
+Password hashing in worker processes, see provisioning.py.
+
+Workers are spawned rather than forked: a forked worker would share the
+parent's database connection, and close it when it exits. A spawned worker
+unpickles the functions it runs by importing this module, so it must not
+import models (the app registry isn't ready until init_worker has run).
+"""
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+
+import django
+from django.contrib.auth.hashers import make_password
+
+
+def init_worker():
+    django.setup()
+
+
+def hash_chunk(passwords):
+    return [make_password(password) for password in passwords]
+
+
+def hashing_pool(workers):
+    return ProcessPoolExecutor(
+        workers, mp_context=multiprocessing.get_context('spawn'), initializer=init_worker
+    )
@@ -0,0 +1,286 @@
+"""
+Live room availability events.
+
+Whenever a room's occupancy or availability changes, the new numbers are
+published (after the transaction commits) to the per-process Hub, which
+fans them out to every connected Server-Sent Events client of
+``views.room_events``. The SSE view is async, so serve the project with an
+ASGI server (``bau_hostel_management.asgi``) to use it; under WSGI the room
+list doesn't open the stream and the view answers 204.
+
+Publishing goes through a broker, configured with HOSTEL_EVENT_BROKER::
+
+    HOSTEL_EVENT_BROKER = {
+        'CLASS': 'hostel_management.live.LocalBroker',
+        'OPTIONS': {},
+    }
+
+``LocalBroker`` delivers within one process. ``FileBroker`` appends events
+to a file that every process tails, a local stand-in for a real message
+broker when several worker processes serve the site. Other brokers
+subclass ``Broker`` and implement ``publish()``, ``listen()`` and
+``active``.
+"""
+import asyncio
+import json
+import os
+import threading
+import time
+from abc import ABC, abstractmethod
+from contextlib import asynccontextmanager
+
+from django.conf import settings
+from django.core.handlers.asgi import ASGIRequest
+from django.db import transaction
+from django.db.models import F
+from django.utils.module_loading import import_string
+
+DEFAULT_BROKER = {
+    'CLASS': 'hostel_management.live.LocalBroker',
+    'OPTIONS': {},
+}
+# Events a slow client may fall behind before it is told to resync
+QUEUE_SIZE = 100
+
+
+async def in_thread(func, *args, discard=None):
+    """
+    ``func(*args)`` in a worker thread. If the caller is cancelled meanwhile,
+    the thread is still waited for (so nothing it uses is closed under it)
+    and its result handed to ``discard``.
+    """
+    call = asyncio.ensure_future(asyncio.to_thread(func, *args))
+    try:
+        return await asyncio.shield(call)
+    except asyncio.CancelledError:
+        await asyncio.wait([call])
+        if discard is not None and not call.cancelled() and call.exception() is None:
+            discard(call.result())
+        raise
+
+
+class Broker(ABC):
+    """Carries events from publishers to every process's Hub."""
+
+    @property
+    @abstractmethod
+    def active(self):
+        """False if nobody can be listening, so publishers can skip the work."""
+
+    @abstractmethod
+    def publish(self, event):
+        """Send ``event`` (a JSON-serializable dict). Callable from any thread."""
+
+    @abstractmethod
+    def listen(self):
+        """Async iterator over published events, used by the Hub."""
+
+
+class LocalBroker(Broker):
+    """In-process delivery to listeners on any event loop."""
+
+    def __init__(self):
+        self._listeners = set()
+        self._lock = threading.Lock()
+
+    @property
+    def active(self):
+        return bool(self._listeners)
+
+    def publish(self, event):
+        with self._lock:
+            listeners = list(self._listeners)
+        for loop, queue in listeners:
+            loop.call_soon_threadsafe(queue.put_nowait, event)
+
+    async def listen(self):
+        listener = (asyncio.get_running_loop(), asyncio.Queue())
+        with self._lock:
+            self._listeners.add(listener)
+        try:
+            while True:
+                yield await listener[1].get()
+        finally:
+            with self._lock:
+                self._listeners.discard(listener)
+
+
+class FileBroker(Broker):
+    """
+    Cross-process delivery through an append-only JSON-lines file.
+
+    Once the spool passes ``max_bytes`` the publisher that noticed moves it
+    to ``<path>.1`` (replacing the previous one) and the next event starts a
+    new file; listeners finish the old file and follow. Listeners touch
+    ``<path>.listening`` while they run, and the broker is active while
+    that file is fresher than ``listener_timeout`` seconds.
+    """
+
+    def __init__(self, path, poll_interval=0.5, max_bytes=1024 * 1024, listener_timeout=None):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.max_bytes = max_bytes
+        self.listener_timeout = listener_timeout or max(5.0, 4 * poll_interval)
+        self.heartbeat_path = f'{path}.listening'
+
+    @property
+    def active(self):
+        try:
+            return time.time() - os.stat(self.heartbeat_path).st_mtime < self.listener_timeout
+        except FileNotFoundError:
+            return False
+
+    def publish(self, event):
+        # Single small O_APPEND writes don't interleave between processes
+        line = (json.dumps(event) + '\n').encode()
+        fd = os.open(self.path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(fd, line)
+            size = os.fstat(fd).st_size
+        finally:
+            os.close(fd)
+        if size > self.max_bytes:
+            try:
+                os.replace(self.path, f'{self.path}.1')
+            except FileNotFoundError:
+                pass  # another publisher rotated it first
+
+    def _heartbeat(self):
+        with open(self.heartbeat_path, 'a'):
+            pass
+        os.utime(self.heartbeat_path)
+
+    def _open(self, at_end=False):
+        open(self.path, 'a').close()
+        spool = open(self.path, 'rb')
+        if at_end:
+            spool.seek(0, os.SEEK_END)
+        return spool
+
+    def _read(self, spool):
+        """
+        ``(spool, events)``: the complete events appended to ``spool`` since
+        the last call, following the spool to a new file when it was
+        rotated. Blocking file I/O, run in a worker thread.
+        """
+        self._heartbeat()
+        events = []
+        while True:
+            line = spool.readline()
+            if line.endswith(b'\n'):
+                events.append(json.loads(line))
+                continue
+            try:
+                stat = os.stat(self.path)
+            except FileNotFoundError:
+                stat = None  # rotated, and nothing published since
+            if stat is None or stat.st_ino != os.fstat(spool.fileno()).st_ino:
+                # The old file has been read to the end; follow the new one
+                spool.close()
+                spool = self._open()
+                continue
+            if stat.st_size < spool.tell():
+                spool.seek(0)  # truncated
+                continue
+            if line:
+                spool.seek(spool.tell() - len(line))  # partial write
+            return spool, events
+
+    async def listen(self):
+        spool = await in_thread(self._open, True, discard=lambda spool: spool.close())
+        try:
+            while True:
+                spool, events = await in_thread(self._read, spool, discard=lambda result: result[0].close())
+                for event in events:
+                    yield event
+                if not events:
+                    await asyncio.sleep(self.poll_interval)
+        finally:
+            spool.close()
+
+
+class Hub:
+    """Fans events from the broker out to this process's subscribers."""
+
+    def __init__(self, broker):
+        self.broker = broker
+        self.subscribers = set()
+        self._pump = None
+
+    def publish(self, event):
+        self.broker.publish(event)
+
+    @asynccontextmanager
+    async def subscribe(self):
+        """Yield an asyncio.Queue receiving every event until the block exits."""
+        self._ensure_pump()
+        queue = asyncio.Queue(QUEUE_SIZE)
+        self.subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self.subscribers.discard(queue)
+            if not self.subscribers and self._pump:
+                pump, self._pump = self._pump, None
+                pump.cancel()
+                await asyncio.wait([pump])
+
+    def _ensure_pump(self):
+        loop = asyncio.get_running_loop()
+        if self._pump is None or self._pump.done() or self._pump.get_loop() is not loop:
+            self._pump = loop.create_task(self._run())
+
+    async def _run(self):
+        async for event in self.broker.listen():
+            for queue in list(self.subscribers):
+                if queue.full():
+                    # Too far behind: drop the backlog, the client reloads
+                    while not queue.empty():
+                        queue.get_nowait()
+                    queue.put_nowait({'type': 'resync'})
+                else:
+                    queue.put_nowait(event)
+
+
+_hub = None
+
+
+def get_hub():
+    """This process's Hub, using the broker from settings."""
+    global _hub
+    if _hub is None:
+        config = getattr(settings, 'HOSTEL_EVENT_BROKER', DEFAULT_BROKER)
+        broker_class = import_string(config.get('CLASS', DEFAULT_BROKER['CLASS']))
+        _hub = Hub(broker_class(**config.get('OPTIONS', {})))
+    return _hub
+
+
+def live_events_enabled(request):
+    """
+    Whether ``request`` can be answered with an event stream. Only under
+    ASGI: a WSGI server would hold a thread for as long as the page is open.
+    """
+    return isinstance(request, ASGIRequest)
+
+
+def publish_room_changes(room_ids):
+    """
+    Publish the current occupancy of ``room_ids`` once the transaction
+    commits. Does nothing (not even the read-back query) without listeners.
+    """
+    hub = get_hub()
+    room_ids = list(room_ids)
+    if not room_ids or not hub.broker.active:
+        return
+
+    def publish():
+        from .allocation import batched
+        from .models import Room
+        for chunk in batched(room_ids):
+            rooms = Room.objects.filter(pk__in=chunk).annotate(
+                available_beds=F('capacity') - F('current_occupancy')
+            ).values('id', 'current_occupancy', 'capacity', 'available_beds', 'is_available')
+            for room in rooms:
+                hub.publish({'type': 'room', **room})
+
+    transaction.on_commit(publish)
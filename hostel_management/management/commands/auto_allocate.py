@@ -0,0 +1,60 @@
+from django.core.management.base import BaseCommand, CommandError
+from hostel_management.auto_allocation import STRATEGIES, auto_allocate
+from hostel_management.models import AllocationError, CustomUser, RoomApplication
+
+
+class Command(BaseCommand):
+    help = 'Automatically allocate rooms to pending applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--strategy',
+            choices=STRATEGIES,
+            default='greedy',
+            help='greedy: first free room by priority; matching: also move placed students to fit more'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be allocated'
+        )
+        parser.add_argument(
+            '--block',
+            type=str,
+            help='Only allocate rooms in this block'
+        )
+        parser.add_argument(
+            '--reviewer',
+            type=str,
+            help='Username recorded as the reviewer'
+        )
+
+    def handle(self, *args, **options):
+        applications = RoomApplication.objects.all()
+        if options['block']:
+            applications = applications.filter(room__block=options['block'])
+
+        reviewer = None
+        if options['reviewer']:
+            try:
+                reviewer = CustomUser.objects.get(username=options['reviewer'])
+            except CustomUser.DoesNotExist:
+                raise CommandError(f"User {options['reviewer']} not found")
+
+        try:
+            plan = auto_allocate(
+                applications,
+                strategy=options['strategy'],
+                reviewer=reviewer,
+                dry_run=options['dry_run'],
+            )
+        except AllocationError as e:
+            raise CommandError(str(e))
+
+        for line in plan.report_lines():
+            self.stdout.write(line)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing was saved.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Approved {plan.placed} applications.'))
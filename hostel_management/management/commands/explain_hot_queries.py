@@ -0,0 +1,106 @@
+import re
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import RequestFactory
+from hostel_management import views
+from hostel_management.notices import visible_notices
+from hostel_management.search import search_students, search_text
+from hostel_management.models import Complaint, ComplaintTextBucket, CustomUser, Notice, NoticeReadState, NoticeRecipient, RoomAllocation, RoomApplication, StudentProfile
+
+# Plan lines that mean a whole table is read (an FTS5 table scanned with a
+# MATCH constraint shows up as "VIRTUAL TABLE INDEX 0:M...")
+FULL_SCAN_PATTERNS = {
+    'sqlite': re.compile(r'\bSCAN (?!.*(\bUSING\b|VIRTUAL TABLE INDEX \d+:\S))'),
+    'postgresql': re.compile(r'\bSeq Scan\b'),
+}
+
+
+def sample_users():
+    """A student (with profile) and a staff user to run the views as."""
+    student = (
+        CustomUser.objects.filter(user_type='student', student_profile__isnull=False)
+        .select_related('student_profile').first()
+    )
+    if student is None:
+        # Plans don't depend on the row existing
+        student = CustomUser(pk=0, user_type='student')
+        student.student_profile = StudentProfile(pk=0)
+    staff = CustomUser.objects.filter(user_type__in=['staff', 'provost', 'admin']).first()
+    return student, staff or CustomUser(pk=0, user_type='staff')
+
+
+def view_queryset(view_class, user, path='/', **kwargs):
+    request = RequestFactory().get(path)
+    request.user = user
+    view = view_class()
+    view.setup(request, **kwargs)
+    return view.get_queryset()
+
+
+def hot_queries():
+    """(label, queryset) for every view's queryset and the bulk review paths."""
+    student, staff = sample_users()
+    profile = student.student_profile
+    return [
+        ('Room list', view_queryset(views.RoomListView, student)),
+        ('Room list, filtered', view_queryset(views.RoomListView, student, '/?block=A&room_type=double')),
+        ('Room search', view_queryset(views.RoomListView, student, '/?search=A-1')),
+        ('Room detail', view_queryset(views.RoomDetailView, student).filter(pk=1)),
+        ('My applications', view_queryset(views.MyApplicationsView, student)),
+        ('Notice board', visible_notices().order_by('-priority', '-created_at')),
+        ('Notice audience', NoticeRecipient.objects.filter(user=student, notice__in=[1, 2]).values_list('notice_id')),
+        ('Notice read state', NoticeReadState.objects.filter(pk=student.pk)),
+        ('Notice detail', view_queryset(views.NoticeDetailView, student).filter(pk=1)),
+        ('Complaint list', view_queryset(views.ComplaintListView, student)),
+        ('Complaint search', view_queryset(views.ComplaintListView, student, '/?search=leaking+tap')),
+        ('Notice search', search_text(Notice.objects.filter(pk__in=[1, 2]), 'exam schedule')),
+        ('Complaint detail', view_queryset(views.ComplaintDetailView, student).filter(pk=1)),
+        ('Dashboard: current allocation', RoomAllocation.objects.filter(student=profile, is_active=True)),
+        ('Dashboard: pending applications', RoomApplication.objects.filter(student=profile, status='pending')),
+        ('Dashboard: open complaints', Complaint.objects.filter(submitted_by=student, status__in=Complaint.OPEN_STATUSES)),
+        ('Admin student picker', search_students(StudentProfile.objects.order_by('student_id'), 'rahman')[:20]),
+        ('Admin staff picker', CustomUser.objects.filter(user_type__in=['staff', 'provost', 'admin']).order_by('username')[:20]),
+        ('Review queue', RoomApplication.objects.filter(status='pending').order_by('-priority_score', 'application_date')),
+        ('Duplicate candidates', Complaint.objects.filter(
+            pk__in=ComplaintTextBucket.objects.filter(key__in=[1, 2]).values('complaint'),
+            status__in=Complaint.OPEN_STATUSES, duplicate_of__isnull=True,
+        )),
+        ('Complaint queue', view_queryset(views.ComplaintQueueView, staff)),
+        ('Open complaints', Complaint.objects.filter(status__in=Complaint.OPEN_STATUSES).order_by('-created_at')),
+        ('Assigned complaints', Complaint.objects.filter(assigned_to=staff)),
+    ]
+
+
+class Command(BaseCommand):
+    help = 'Print the query plan of every hot view queryset and flag full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--fail-on-scan',
+            action='store_true',
+            help='Exit with an error if any plan contains a full table scan'
+        )
+
+    def handle(self, *args, **options):
+        scan = FULL_SCAN_PATTERNS.get(connection.vendor)
+        scans = []
+        for label, queryset in hot_queries():
+            plan = queryset.explain()
+            flagged = bool(scan and scan.search(plan))
+            if flagged:
+                scans.append(label)
+            style = self.style.WARNING if flagged else self.style.MIGRATE_HEADING
+            self.stdout.write(style(label + (' (full scan)' if flagged else '')))
+            self.stdout.write(plan)
+            self.stdout.write('')
+
+        if scan is None:
+            self.stdout.write(f'Full-scan detection is not supported on {connection.vendor}.')
+        elif scans:
+            message = f'{len(scans)} queries read a whole table: {", ".join(scans)}'
+            if options['fail_on_scan']:
+                raise CommandError(message)
+            self.stdout.write(self.style.WARNING(message))
+        else:
+            self.stdout.write(self.style.SUCCESS('No full table scans.'))
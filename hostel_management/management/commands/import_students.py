@@ -0,0 +1,49 @@
+import csv
+
+from django.core.management.base import BaseCommand, CommandError
+from hostel_management.provisioning import CHUNK_SIZE, PROFILE_FIELDS, USER_FIELDS, provision_students
+
+
+class Command(BaseCommand):
+    help = 'Create student accounts and profiles for a new intake from a CSV file'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            'csv_file',
+            help=f"CSV with a header row: password, {', '.join(USER_FIELDS + PROFILE_FIELDS)}"
+        )
+        parser.add_argument(
+            '--password',
+            type=str,
+            help='Initial password for rows without one'
+        )
+        parser.add_argument(
+            '--workers',
+            type=int,
+            help='Password hashing processes (default: one per CPU)'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=CHUNK_SIZE,
+            help='Students hashed and inserted per batch'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            with open(options['csv_file'], newline='', encoding='utf-8-sig') as f:
+                rows = list(csv.DictReader(f))
+        except OSError as e:
+            raise CommandError(str(e))
+        if options['password']:
+            for row in rows:
+                row['password'] = row.get('password') or options['password']
+
+        self.stdout.write(f'Importing {len(rows)} students...')
+        result = provision_students(rows, workers=options['workers'], chunk_size=options['chunk_size'])
+        lines = result.report_lines()
+        self.stdout.write(self.style.SUCCESS(lines[0]))
+        if result.skipped:
+            self.stdout.write(self.style.WARNING(f'{len(result.skipped)} rows skipped:'))
+            for line in lines[1:]:
+                self.stdout.write(line)
@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from hostel_management.assignment import rebalance_complaints
+
+
+class Command(BaseCommand):
+    help = 'Assign the open complaint backlog to the least-loaded eligible staff members'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reassign-unstarted',
+            action='store_true',
+            help='Also deal out again complaints that are assigned but not started yet'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report what would be assigned'
+        )
+
+    def handle(self, *args, **options):
+        plan = rebalance_complaints(
+            reassign_unstarted=options['reassign_unstarted'],
+            dry_run=options['dry_run'],
+        )
+        for line in plan.report_lines():
+            self.stdout.write(line)
+
+        if options['dry_run']:
+            self.stdout.write(self.style.WARNING('Dry run: nothing was saved.'))
+        else:
+            self.stdout.write(self.style.SUCCESS(f'Assigned {len(plan.moves)} complaints.'))
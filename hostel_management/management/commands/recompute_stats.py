@@ -0,0 +1,15 @@
+from django.core.management.base import BaseCommand
+from hostel_management.models import HostelStats
+from hostel_management.stats import invalidate_dashboard_stats
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the hostel statistics counters from scratch'
+
+    def handle(self, *args, **options):
+        self.stdout.write('Recomputing hostel statistics...')
+        rows = HostelStats.objects.recompute()
+        invalidate_dashboard_stats()
+        self.stdout.write(
+            self.style.SUCCESS(f'Rebuilt {rows} statistics rows.')
+        )
@@ -0,0 +1,22 @@
+from django.core.management.base import BaseCommand
+from hostel_management.scoring import get_policy, rescore_applications
+
+
+class Command(BaseCommand):
+    help = 'Recalculate priority scores of pending room applications'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Number of applications scored and written per batch'
+        )
+
+    def handle(self, *args, **options):
+        policy = get_policy()
+        self.stdout.write(f'Scoring pending applications with {policy.__class__.__name__}...')
+        updated = rescore_applications(policy=policy, batch_size=options['batch_size'])
+        self.stdout.write(
+            self.style.SUCCESS(f'Updated priority score of {updated} applications.')
+        )
@@ -0,0 +1,68 @@
+from django.core.management.base import BaseCommand, CommandError
+from hostel_management.allocation import decide_applications
+from hostel_management.models import AllocationError, CustomUser, RoomApplication
+
+
+class Command(BaseCommand):
+    help = 'Approve or reject room applications in bulk'
+
+    def add_arguments(self, parser):
+        action = parser.add_mutually_exclusive_group(required=True)
+        action.add_argument(
+            '--approve',
+            action='store_true',
+            help='Approve matching applications (highest priority first, within room capacity)'
+        )
+        action.add_argument(
+            '--reject',
+            action='store_true',
+            help='Reject matching applications'
+        )
+        parser.add_argument(
+            '--ids',
+            type=str,
+            help='Comma-separated application IDs (default: all pending applications)'
+        )
+        parser.add_argument(
+            '--block',
+            type=str,
+            help='Only applications for rooms in this block'
+        )
+        parser.add_argument(
+            '--min-score',
+            type=int,
+            help='Only applications with at least this priority score'
+        )
+        parser.add_argument(
+            '--reviewer',
+            type=str,
+            help='Username recorded as the reviewer'
+        )
+
+    def handle(self, *args, **options):
+        applications = RoomApplication.objects.filter(status='pending')
+        if options['ids']:
+            try:
+                ids = [int(pk) for pk in options['ids'].split(',') if pk.strip()]
+            except ValueError:
+                raise CommandError('--ids must be a comma-separated list of integers')
+            applications = applications.filter(pk__in=ids)
+        if options['block']:
+            applications = applications.filter(room__block=options['block'])
+        if options['min_score'] is not None:
+            applications = applications.filter(priority_score__gte=options['min_score'])
+
+        reviewer = None
+        if options['reviewer']:
+            try:
+                reviewer = CustomUser.objects.get(username=options['reviewer'])
+            except CustomUser.DoesNotExist:
+                raise CommandError(f"User {options['reviewer']} not found")
+
+        status = 'approved' if options['approve'] else 'rejected'
+        try:
+            result = decide_applications(applications, status, reviewer=reviewer)
+        except AllocationError as e:
+            raise CommandError(str(e))
+
+        self.stdout.write(self.style.SUCCESS(result.summary(status)))
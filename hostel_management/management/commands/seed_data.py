@@ -1,11 +1,36 @@
-from django.core.management.base import BaseCommand
+from django.apps import apps
+from django.core.management.base import BaseCommand, CommandError
 from django.contrib.auth.hashers import make_password
+from django.db import transaction
 from django.utils import timezone
 from datetime import datetime, date
 from hostel_management.models import (
     CustomUser, StudentProfile, Room, RoomApplication, 
-    RoomAllocation, Notice, Complaint
+    RoomAllocation, Notice, Complaint, HostelStats
 )
+from hostel_management import search, synthetic
+from hostel_management.notices import invalidate_notice_board
+from hostel_management.stats import invalidate_dashboard_stats
+
+SCALE_OPTIONS = ('students', 'rooms', 'applications', 'complaints', 'notices')
+
+
+def cleared_models():
+    """The app's tables (but the counters) and every table pointing at them, like the admin log."""
+    models = {
+        model for model in apps.get_app_config('hostel_management').get_models(include_auto_created=True)
+        if model is not HostelStats
+    }
+    while True:
+        referencing = {
+            model for model in apps.get_models(include_auto_created=True)
+            if model not in models and any(
+                field.is_relation and field.related_model in models for field in model._meta.concrete_fields
+            )
+        }
+        if not referencing:
+            return models
+        models |= referencing
 
 
 class Command(BaseCommand):
@@ -22,11 +47,26 @@ class Command(BaseCommand):
             action='store_true',
             help='Only create users and profiles'
         )
+        scale = parser.add_argument_group(
+            'scale mode', 'Generate this many rows of random but reproducible data instead of the samples'
+        )
+        for name in SCALE_OPTIONS:
+            scale.add_argument(f'--{name}', type=int, default=0, metavar='N')
+        scale.add_argument(
+            '--seed',
+            type=int,
+            default=synthetic.DEFAULT_SEED,
+            help='Random seed for scale mode'
+        )
 
     def handle(self, *args, **options):
         if options['clear']:
             self.clear_data()
         
+        if any(options[name] for name in SCALE_OPTIONS):
+            self.populate(options)
+            return
+
         if options['users_only']:
             self.create_users()
             self.create_student_profiles()
@@ -43,17 +83,34 @@ class Command(BaseCommand):
             self.style.SUCCESS('Successfully seeded database with sample data!')
         )
 
+    def populate(self, options):
+        """Bulk-load generated data, see hostel_management/synthetic.py"""
+        if CustomUser.objects.filter(username__startswith=synthetic.USERNAME_PREFIX).exists():
+            raise CommandError('Generated data is already loaded; run with --clear to start over.')
+        
+        self.stdout.write(f"Generating data with seed {options['seed']}...")
+        generator = synthetic.SyntheticHostel(options['seed'])
+        report = generator.populate(**{name: options[name] for name in SCALE_OPTIONS})
+        for label, rows, seconds in report:
+            rate = f' ({rows / seconds:,.0f}/s)' if rows and seconds else ''
+            self.stdout.write(f'  ✓ {label}: {rows:,} rows in {seconds:.1f}s{rate}')
+        self.stdout.write(
+            self.style.SUCCESS(f'Generated data in {sum(row[2] for row in report):.1f}s.')
+        )
+
     def clear_data(self):
         """Clear all existing data"""
         self.stdout.write('Clearing existing data...')
         
-        Complaint.objects.all().delete()
-        Notice.objects.all().delete()
-        RoomApplication.objects.all().delete()
-        RoomAllocation.objects.all().delete()
-        Room.objects.all().delete()
-        StudentProfile.objects.all().delete()
-        CustomUser.objects.all().delete()
+        # One DELETE per table: no rows are collected and no per-row delete
+        # signals or search triggers fire, so the counters and the search
+        # indexes are rebuilt once afterwards
+        with transaction.atomic(), search.reindexing():
+            for model in cleared_models():
+                model._base_manager.all()._raw_delete(model._base_manager.db)
+            HostelStats.objects.recompute()
+            invalidate_dashboard_stats()
+            invalidate_notice_board()
         
         self.stdout.write(self.style.WARNING('All data cleared!'))
 
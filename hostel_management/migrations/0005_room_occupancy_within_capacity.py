@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 05:52
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0004_roomallocation'),
+    ]
+
+    operations = [
+        migrations.AddConstraint(
+            model_name='room',
+            constraint=models.CheckConstraint(condition=models.Q(('current_occupancy__lte', models.F('capacity'))), name='room_occupancy_within_capacity'),
+        ),
+    ]
@@ -0,0 +1,17 @@
+# Generated by Django 5.2.4 on 2026-10-17 05:56
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0005_room_occupancy_within_capacity'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='roomapplication',
+            index=models.Index(fields=['-priority_score', '-application_date'], name='roomapp_priority_idx'),
+        ),
+    ]
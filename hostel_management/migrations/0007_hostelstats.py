@@ -0,0 +1,36 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0006_roomapplication_priority_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='HostelStats',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('scope', models.CharField(choices=[('global', 'Whole hostel'), ('block', 'Block'), ('room_type', 'Room type')], max_length=10)),
+                ('key', models.CharField(blank=True, max_length=50)),
+                ('total_rooms', models.IntegerField(default=0)),
+                ('available_rooms', models.IntegerField(default=0)),
+                ('total_capacity', models.IntegerField(default=0)),
+                ('total_occupied', models.IntegerField(default=0)),
+                ('pending_applications', models.IntegerField(default=0)),
+                ('total_students', models.IntegerField(default=0)),
+                ('allocated_students', models.IntegerField(default=0)),
+                ('open_complaints', models.IntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Hostel Statistics',
+                'verbose_name_plural': 'Hostel Statistics',
+                'ordering': ['scope', 'key'],
+                'unique_together': {('scope', 'key')},
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:05
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0007_hostelstats'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['submitted_by', 'status'], name='complaint_submitter_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['status', '-created_at'], name='complaint_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notice',
+            index=models.Index(condition=models.Q(('is_active', True), ('is_published', True)), fields=['expires_at'], name='notice_visible_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='room',
+            index=models.Index(condition=models.Q(('is_available', True)), fields=['block', 'room_type', 'floor'], name='room_available_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roomallocation',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['student'], name='roomalloc_active_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roomapplication',
+            index=models.Index(fields=['student', 'status'], name='roomapp_student_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='roomapplication',
+            index=models.Index(condition=models.Q(('status', 'pending')), fields=['-priority_score', 'application_date'], name='roomapp_pending_idx'),
+        ),
+    ]
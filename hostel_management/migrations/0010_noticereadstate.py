@@ -0,0 +1,27 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:14
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0009_room_updated_index'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='NoticeReadState',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='notice_read_state', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('read_through', models.DateTimeField(blank=True, null=True)),
+                ('read_ids', models.JSONField(blank=True, default=list)),
+            ],
+            options={
+                'verbose_name': 'Notice Read State',
+                'verbose_name_plural': 'Notice Read States',
+            },
+        ),
+    ]
@@ -0,0 +1,58 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:17
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0010_noticereadstate'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notice',
+            name='target_academic_year',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddField(
+            model_name='notice',
+            name='target_allocation',
+            field=models.CharField(blank=True, choices=[('allocated', 'Students with a room'), ('unallocated', 'Students without a room')], max_length=12),
+        ),
+        migrations.AddField(
+            model_name='notice',
+            name='target_block',
+            field=models.CharField(blank=True, help_text='Students living in this block', max_length=50),
+        ),
+        migrations.AddField(
+            model_name='notice',
+            name='target_department',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='notice',
+            name='target_faculty',
+            field=models.CharField(blank=True, max_length=100),
+        ),
+        migrations.AddField(
+            model_name='notice',
+            name='target_floor',
+            field=models.PositiveIntegerField(blank=True, help_text='Students living on this floor', null=True),
+        ),
+        migrations.CreateModel(
+            name='NoticeRecipient',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('notice', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='recipients', to='hostel_management.notice')),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='targeted_notices', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Notice Recipient',
+                'verbose_name_plural': 'Notice Recipients',
+                'constraints': [models.UniqueConstraint(fields=('user', 'notice'), name='notice_recipient_unique')],
+            },
+        ),
+    ]
@@ -0,0 +1,42 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import F
+
+# The SLA table as of this migration
+SLA_HOURS = {'urgent': 4, 'high': 24, 'medium': 72, 'low': 168}
+
+
+def fill_sla_due_at(apps, schema_editor):
+    Complaint = apps.get_model('hostel_management', 'Complaint')
+    sla_hours = {**SLA_HOURS, **getattr(settings, 'HOSTEL_COMPLAINT_SLA_HOURS', {})}
+    for priority, hours in sla_hours.items():
+        Complaint.objects.filter(priority=priority).update(
+            sla_due_at=F('created_at') + timedelta(hours=hours)
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0011_notice_audiences'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='sla_due_at',
+            field=models.DateTimeField(editable=False, null=True),
+        ),
+        migrations.RunPython(fill_sla_due_at, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='complaint',
+            name='sla_due_at',
+            field=models.DateTimeField(editable=False),
+        ),
+        migrations.AddIndex(
+            model_name='complaint',
+            index=models.Index(fields=['status', 'sla_due_at'], name='complaint_queue_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:23
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+
+
+def count_staff_loads(apps, schema_editor):
+    Complaint = apps.get_model('hostel_management', 'Complaint')
+    HostelStats = apps.get_model('hostel_management', 'HostelStats')
+    loads = (
+        Complaint.objects.filter(status__in=['submitted', 'in_progress'], assigned_to__isnull=False)
+        .order_by().values_list('assigned_to').annotate(Count('pk'))
+    )
+    HostelStats.objects.bulk_create([
+        HostelStats(scope='staff', key=str(assignee_id), open_complaints=load)
+        for assignee_id, load in loads
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0012_complaint_sla'),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name='hostelstats',
+            name='scope',
+            field=models.CharField(choices=[('global', 'Whole hostel'), ('block', 'Block'), ('room_type', 'Room type'), ('staff', 'Staff member')], max_length=10),
+        ),
+        migrations.CreateModel(
+            name='ComplaintRoute',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('category', models.CharField(blank=True, choices=[('maintenance', 'Maintenance'), ('security', 'Security'), ('facilities', 'Facilities'), ('cleanliness', 'Cleanliness'), ('noise', 'Noise'), ('other', 'Other')], max_length=20)),
+                ('block', models.CharField(blank=True, max_length=50)),
+                ('staff', models.ForeignKey(limit_choices_to={'user_type__in': ['staff', 'provost', 'admin']}, on_delete=django.db.models.deletion.CASCADE, related_name='complaint_routes', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'verbose_name': 'Complaint Route',
+                'verbose_name_plural': 'Complaint Routes',
+                'unique_together': {('staff', 'category', 'block')},
+            },
+        ),
+        migrations.RunPython(count_staff_loads, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,92 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:29
+
+import random
+import re
+import zlib
+from hashlib import blake2b
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# The signature scheme of hostel_management/duplicates.py as of this
+# migration, so existing complaints are signed the same way whatever that
+# module later becomes
+BANDS = 15
+ROWS = 2
+HALF = BANDS * ROWS
+STOP_WORDS = frozenset(
+    'a an and are at be been for from has have in is it its my of on or our so the this to was we with'.split()
+)
+PRIME = (1 << 61) - 1
+_rng = random.Random(0xC0FFEE)
+PERMUTATIONS = [(_rng.randrange(1, PRIME), _rng.randrange(PRIME)) for _ in range(HALF)]
+
+
+def minhash(text):
+    hashes = set()
+    for word in re.findall(r'\w+', text.lower()):
+        if word in STOP_WORDS:
+            continue
+        if len(word) > 3 and word.endswith('s') and not word.endswith('ss'):
+            word = word[:-1]
+        hashes.add(zlib.crc32(word.encode()))
+    if not hashes:
+        return [None] * HALF
+    return [min((a * h + b) % PRIME for h in hashes) for a, b in PERMUTATIONS]
+
+
+def band_keys(signature):
+    keys = []
+    for band in range(2 * BANDS):
+        values = signature[band * ROWS:(band + 1) * ROWS]
+        if values and None not in values:
+            digest = blake2b(repr((band, values)).encode(), digest_size=8).digest()
+            keys.append(int.from_bytes(digest, 'big', signed=True))
+    return keys
+
+
+def sign_complaints(apps, schema_editor):
+    Complaint = apps.get_model('hostel_management', 'Complaint')
+    ComplaintTextBucket = apps.get_model('hostel_management', 'ComplaintTextBucket')
+    complaints = Complaint.objects.only('subject', 'location', 'description').order_by('pk')
+    for complaint in complaints.iterator(chunk_size=500):
+        complaint.text_signature = (
+            minhash(f'{complaint.subject} {complaint.location}') + minhash(complaint.description)
+        )
+        complaint.save(update_fields=['text_signature'])
+        ComplaintTextBucket.objects.bulk_create([
+            ComplaintTextBucket(complaint_id=complaint.pk, key=key)
+            for key in band_keys(complaint.text_signature)
+        ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0013_complaint_routing'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='complaint',
+            name='duplicate_of',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='duplicates', to='hostel_management.complaint'),
+        ),
+        migrations.AddField(
+            model_name='complaint',
+            name='text_signature',
+            field=models.JSONField(default=list, editable=False),
+        ),
+        migrations.CreateModel(
+            name='ComplaintTextBucket',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('key', models.BigIntegerField()),
+                ('complaint', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='text_buckets', to='hostel_management.complaint')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['key', 'complaint'], name='complaint_bucket_idx')],
+            },
+        ),
+        migrations.RunPython(sign_complaints, migrations.RunPython.noop),
+    ]
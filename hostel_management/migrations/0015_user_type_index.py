@@ -0,0 +1,18 @@
+# Generated by Django 5.2.4 on 2026-10-17 06:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0012_alter_user_first_name_max_length'),
+        ('hostel_management', '0014_complaint_duplicates'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='customuser',
+            index=models.Index(fields=['user_type', 'username'], name='user_type_idx'),
+        ),
+    ]
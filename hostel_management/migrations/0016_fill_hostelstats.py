@@ -0,0 +1,64 @@
+from django.db import migrations
+from django.db.models import Count, F, Q, Sum
+
+# As of this migration; later changes to the live models must not change it
+OPEN_COMPLAINT_STATUSES = ('submitted', 'in_progress')
+
+
+def fill_hostel_stats(apps, schema_editor):
+    """Rebuild the counters, which 0007 created empty, from the tables."""
+    HostelStats = apps.get_model('hostel_management', 'HostelStats')
+    Room = apps.get_model('hostel_management', 'Room')
+    RoomApplication = apps.get_model('hostel_management', 'RoomApplication')
+    StudentProfile = apps.get_model('hostel_management', 'StudentProfile')
+    Complaint = apps.get_model('hostel_management', 'Complaint')
+
+    rows = {('global', ''): HostelStats(scope='global', key='')}
+    room_counters = {
+        'total_rooms': Count('pk'),
+        'available_rooms': Count('pk', filter=Q(is_available=True, current_occupancy__lt=F('capacity'))),
+        'total_capacity': Sum('capacity', default=0),
+        'total_occupied': Sum('current_occupancy', default=0),
+    }
+    pending = RoomApplication.objects.filter(status='pending').order_by()
+
+    for name, value in Room.objects.aggregate(**room_counters).items():
+        setattr(rows[('global', '')], name, value)
+    for scope in ('block', 'room_type'):
+        for row in Room.objects.order_by().values(scope).annotate(**room_counters):
+            stats = rows.setdefault((scope, row[scope]), HostelStats(scope=scope, key=row[scope]))
+            for name in room_counters:
+                setattr(stats, name, row[name])
+        for row in pending.values(f'room__{scope}').annotate(total=Count('pk')):
+            key = row[f'room__{scope}']
+            stats = rows.setdefault((scope, key), HostelStats(scope=scope, key=key))
+            stats.pending_applications = row['total']
+
+    global_stats = rows[('global', '')]
+    global_stats.pending_applications = pending.count()
+    students = StudentProfile.objects.aggregate(
+        total=Count('pk'), allocated=Count('pk', filter=Q(is_allocated=True))
+    )
+    global_stats.total_students = students['total']
+    global_stats.allocated_students = students['allocated']
+    open_complaints = Complaint.objects.filter(status__in=OPEN_COMPLAINT_STATUSES).order_by()
+    global_stats.open_complaints = open_complaints.count()
+    for assignee_id, load in (
+        open_complaints.filter(assigned_to__isnull=False)
+        .values_list('assigned_to').annotate(Count('pk'))
+    ):
+        rows[('staff', str(assignee_id))] = HostelStats(scope='staff', key=str(assignee_id), open_complaints=load)
+
+    HostelStats.objects.all().delete()
+    HostelStats.objects.bulk_create(rows.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('hostel_management', '0015_user_type_index'),
+    ]
+
+    operations = [
+        migrations.RunPython(fill_hostel_stats, migrations.RunPython.noop),
+    ]
@@ -1,10 +1,101 @@
-from django.db import models
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import connections, models, transaction
+from django.db.models import Count, Exists, F, IntegerField, OuterRef, Q, Subquery, Sum
+from django.db.models.functions import Cast
 from django.contrib.auth.models import AbstractUser
+from django.core.exceptions import ValidationError
+from django.utils import timezone
+
+from .live import publish_room_changes
 
 # Create your models here.
 
 
-class CustomUser(AbstractUser):
+class AllocationError(Exception):
+    """
+    Raised when a bed cannot be claimed (the room is full) or when an
+    application/allocation was changed by someone else in the meantime.
+    """
+
+
+class ChangeTrackingMixin:
+    """
+    Model mixin that remembers the values a row was loaded with.
+
+    save() without ``update_fields`` then writes only the columns that
+    changed (plus auto_now timestamps), and nothing at all when no column
+    did, so saving an object that was loaded and left alone costs no query
+    and no post_save handlers run. Instances that were not loaded from the
+    database are saved in full.
+    """
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_values = instance._tracked_values()
+        return instance
+
+    def _tracked_values(self):
+        # Deferred fields are left out until they are loaded
+        return {
+            field.attname: self.__dict__[field.attname]
+            for field in self._meta.concrete_fields if field.attname in self.__dict__
+        }
+
+    def loaded_value(self, name, default=None):
+        """Value ``name`` (an attname) had when the row was last loaded or saved."""
+        return self.__dict__.get('_loaded_values', {}).get(name, default)
+
+    def changed_fields(self):
+        """Names of the fields changed since loading, or None if this instance wasn't loaded."""
+        loaded = self.__dict__.get('_loaded_values')
+        if loaded is None:
+            return None
+        return {
+            field.name for field in self._meta.concrete_fields
+            if field.attname in self.__dict__
+            and (field.attname not in loaded or loaded[field.attname] != self.__dict__[field.attname])
+        }
+
+    def refresh_from_db(self, using=None, fields=None, from_queryset=None):
+        super().refresh_from_db(using, fields, from_queryset)
+        self._loaded_values = {**self.__dict__.get('_loaded_values', {}), **self._tracked_values()}
+
+    def update_fields_after_swap(self, swapped, kwargs):
+        """
+        ``kwargs`` for the save() that follows a compare-and-swap UPDATE of
+        ``swapped``: only the other changed columns are written, so a
+        concurrent edit of the rest of the row isn't overwritten with the
+        values loaded here.
+        """
+        changed = self.changed_fields()
+        if changed is not None and kwargs.get('update_fields') is None:
+            kwargs['update_fields'] = (changed - {swapped}) | {
+                field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)
+            }
+        return kwargs
+
+    def save(self, *args, **kwargs):
+        if (
+            not self._state.adding and kwargs.get('update_fields') is None
+            and not args and not kwargs.get('force_insert')
+        ):
+            changed = self.changed_fields()
+            # A changed primary key means a new row: save it in full
+            if changed is not None and self._meta.pk.name not in changed:
+                if not changed:
+                    return
+                kwargs['update_fields'] = changed | {
+                    field.name for field in self._meta.concrete_fields if getattr(field, 'auto_now', False)
+                }
+        super().save(*args, **kwargs)
+        self._loaded_values = {**self.__dict__.get('_loaded_values', {}), **self._tracked_values()}
+
+
+class CustomUser(ChangeTrackingMixin, AbstractUser):
     """
     Custom User model that extends Django's built-in User model.
     This allows us to add custom fields for different user types.
@@ -26,8 +117,27 @@ class CustomUser(AbstractUser):
     def __str__(self):
         return f"{self.username} ({self.get_user_type_display()})"
 
+    class Meta(AbstractUser.Meta):
+        indexes = [
+            # Staff pickers in the admin: user_type IN (...) ORDER BY username
+            models.Index(fields=['user_type', 'username'], name='user_type_idx'),
+        ]
+
+
+class StudentProfileManager(models.Manager):
+    """Manager that keeps the allocated-students counter in step."""
 
-class StudentProfile(models.Model):
+    def set_allocated(self, student_ids, allocated=True):
+        """Set is_allocated for the given students; returns how many changed."""
+        changed = self.filter(
+            pk__in=student_ids, is_allocated=not allocated
+        ).update(is_allocated=allocated)
+        if changed:
+            HostelStats.objects.bump_global(allocated_students=changed if allocated else -changed)
+        return changed
+
+
+class StudentProfile(ChangeTrackingMixin, models.Model):
     """
     Student Profile model to store additional student-specific information.
     This is linked to CustomUser with a OneToOne relationship.
@@ -56,14 +166,87 @@ class StudentProfile(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = StudentProfileManager()
+
+    # Fields notice audiences are matched on
+    AUDIENCE_FIELDS = ('faculty', 'department', 'academic_year', 'is_allocated')
+
     def __str__(self):
         return f"{self.student_id} - {self.user.get_full_name()}"
 
+    def save(self, *args, **kwargs):
+        adding = self._state.adding
+        update_fields = kwargs.get('update_fields')
+        # Changed and actually written by this save
+        changed = self.changed_fields()
+        if changed == set() and update_fields is None:
+            return
+        changed = changed or set()
+        if update_fields is not None:
+            changed &= set(update_fields)
+        was_allocated = self.loaded_value('is_allocated')
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            # Keep the hostel-wide counters in step
+            if adding:
+                HostelStats.objects.bump_global(
+                    total_students=1, allocated_students=int(self.is_allocated)
+                )
+            elif 'is_allocated' in changed and was_allocated is not None:
+                HostelStats.objects.bump_global(allocated_students=1 if self.is_allocated else -1)
+            if adding or not changed.isdisjoint(self.AUDIENCE_FIELDS):
+                NoticeRecipient.objects.refresh_students([self.pk])
+
     class Meta:
         verbose_name = 'Student Profile'
         verbose_name_plural = 'Student Profiles'
 
 
+class RoomManager(models.Manager):
+    """
+    Manager with atomic occupancy helpers.
+
+    Occupancy is only ever changed with a single conditional UPDATE so that
+    concurrent approvals can never lose an update or overbook a room.
+    """
+
+    def claim_bed(self, room_id):
+        """Take one free bed in the room. Returns False if the room is full."""
+        claimed = self.filter(
+            pk=room_id, current_occupancy__lt=F('capacity')
+        ).update(current_occupancy=F('current_occupancy') + 1, updated_at=timezone.now()) == 1
+        if claimed:
+            publish_room_changes([room_id])
+            # The room stops being available if that was its last bed
+            became_full = self.filter(
+                pk=room_id, is_available=True, current_occupancy=F('capacity')
+            )
+            HostelStats.objects.bump(
+                HostelStats.objects.scopes_for_room(room_id),
+                total_occupied=1,
+                available_rooms=-Cast(Exists(became_full), IntegerField()),
+            )
+        return claimed
+
+    def release_bed(self, room_id):
+        """Give back one bed in the room (never goes below zero)."""
+        released = self.filter(
+            pk=room_id, current_occupancy__gt=0
+        ).update(current_occupancy=F('current_occupancy') - 1, updated_at=timezone.now()) == 1
+        if released:
+            publish_room_changes([room_id])
+            # A full room becomes available again
+            was_full = self.filter(
+                pk=room_id, is_available=True, current_occupancy=F('capacity') - 1
+            )
+            HostelStats.objects.bump(
+                HostelStats.objects.scopes_for_room(room_id),
+                total_occupied=-1,
+                available_rooms=Cast(Exists(was_full), IntegerField()),
+            )
+        return released
+
+
 class Room(models.Model):
     """
     Room model to store hostel room information
@@ -97,9 +280,40 @@ class Room(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    objects = RoomManager()
+
+    # Fields that feed the HostelStats counters
+    COUNTER_FIELDS = ('block', 'room_type', 'capacity', 'current_occupancy', 'is_available')
+
     def __str__(self):
         return f"Room {self.room_number} - {self.block}"
 
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_counter_state = instance.counter_state()
+        return instance
+
+    def counter_state(self):
+        """Current values of COUNTER_FIELDS, or None if any is deferred."""
+        if any(name not in self.__dict__ for name in self.COUNTER_FIELDS):
+            return None
+        return tuple(self.__dict__[name] for name in self.COUNTER_FIELDS)
+
+    def save(self, *args, **kwargs):
+        before = None
+        if not self._state.adding:
+            before = self.__dict__.get('_loaded_counter_state') or Room.objects.filter(
+                pk=self.pk
+            ).values_list(*self.COUNTER_FIELDS).first()
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            after = self.counter_state()
+            if before != after:
+                HostelStats.objects.apply_room_changes([(before, after)])
+                publish_room_changes([self.pk])
+        self._loaded_counter_state = self.counter_state()
+
     @property
     def available_beds(self):
         """Calculate available beds in the room"""
@@ -114,9 +328,26 @@ class Room(models.Model):
         ordering = ['block', 'floor', 'room_number']
         verbose_name = 'Room'
         verbose_name_plural = 'Rooms'
+        constraints = [
+            models.CheckConstraint(
+                condition=Q(current_occupancy__lte=F('capacity')),
+                name='room_occupancy_within_capacity',
+            ),
+        ]
+        # Boolean filters compile to a bare "WHERE is_available", which SQLite
+        # can only match against a partial index, not a leading index column
+        indexes = [
+            models.Index(
+                fields=['block', 'room_type', 'floor'],
+                condition=Q(is_available=True),
+                name='room_available_idx',
+            ),
+            # Version key for the availability API's ETags
+            models.Index(fields=['updated_at'], name='room_updated_idx'),
+        ]
 
 
-class RoomApplication(models.Model):
+class RoomApplication(ChangeTrackingMixin, models.Model):
     """
     Room application model for students to apply for rooms
     """
@@ -149,56 +380,119 @@ class RoomApplication(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored status so save() doesn't need to re-read the row
+        instance._loaded_status = instance.__dict__.get('status')
+        return instance
+
+    def _stored_status(self):
+        if self.__dict__.get('_loaded_status') is not None:
+            return self._loaded_status
+        return RoomApplication.objects.filter(pk=self.pk).values_list('status', flat=True).first()
+
+    def clean(self):
+        super().clean()
+        # Friendly form error; save() still enforces capacity atomically
+        if self.pk and self.status == 'approved' and self.room_id:
+            stored_status = self._stored_status()
+            if stored_status != 'approved' and self.room.is_full:
+                raise ValidationError(f'Room {self.room.room_number} is already full.')
+            if stored_status == 'pending' and self.student.is_allocated:
+                raise ValidationError('The student is already allocated to a room.')
+
     def save(self, *args, **kwargs):
-        # Auto-update room occupancy when application is approved
-        if self.pk:  # Existing application
-            old_status = RoomApplication.objects.filter(pk=self.pk).first()
-            if old_status and old_status.status != self.status:
-                if self.status == 'approved':
-                    # Approve application and allocate room
+        if self._state.adding:
+            with transaction.atomic():
+                super().save(*args, **kwargs)
+                if self.status == 'pending':
+                    HostelStats.objects.bump(
+                        HostelStats.objects.scopes_for_room(self.room_id), pending_applications=1
+                    )
+            self._loaded_status = self.status
+            return
+
+        # Auto-update room occupancy when application status changes
+        old_status = self._stored_status()
+        if old_status is None or old_status == self.status:
+            super().save(*args, **kwargs)
+            self._loaded_status = self.status
+            return
+
+        with transaction.atomic():
+            # Compare-and-swap on the status so two reviewers can't both
+            # apply the same transition
+            changed = RoomApplication.objects.filter(
+                pk=self.pk, status=old_status
+            ).update(status=self.status)
+            if not changed:
+                raise AllocationError('This application was changed by someone else. Please reload it.')
+
+            if self.status == 'approved':
+                # Approve application and allocate room
+                if not Room.objects.claim_bed(self.room_id):
+                    raise AllocationError('Room is already full.')
+                if RoomApplication.room.is_cached(self):
                     self.room.current_occupancy += 1
-                    self.room.save()
-                    # Mark student as allocated
+                # Mark student as allocated
+                StudentProfile.objects.set_allocated([self.student_id])
+                if RoomApplication.student.is_cached(self):
                     self.student.is_allocated = True
-                    self.student.save()
-                elif old_status.status == 'approved' and self.status in ['rejected', 'withdrawn']:
-                    # Remove allocation
-                    self.room.current_occupancy = max(0, self.room.current_occupancy - 1)
-                    self.room.save()
-                    # Check if student has other approved applications
-                    other_approved = RoomApplication.objects.filter(
-                        student=self.student, status='approved'
-                    ).exclude(pk=self.pk).exists()
-                    if not other_approved:
-                        self.student.is_allocated = False
-                        self.student.save()
-        super().save(*args, **kwargs)
-    
+                NoticeRecipient.objects.refresh_students([self.student_id])
+            elif old_status == 'approved' and self.status in ['rejected', 'withdrawn']:
+                # Remove allocation
+                self._release_allocation()
+            pending_delta = (self.status == 'pending') - (old_status == 'pending')
+            if pending_delta:
+                HostelStats.objects.bump(
+                    HostelStats.objects.scopes_for_room(self.room_id), pending_applications=pending_delta
+                )
+            super().save(*args, **self.update_fields_after_swap('status', kwargs))
+        self._loaded_status = self.status
+
     def delete(self, *args, **kwargs):
         # Update room occupancy if deleting approved application
-        if self.status == 'approved':
+        with transaction.atomic():
+            if self._stored_status() == 'approved':
+                self._release_allocation()
+            return super().delete(*args, **kwargs)
+
+    def _release_allocation(self):
+        Room.objects.release_bed(self.room_id)
+        if RoomApplication.room.is_cached(self):
             self.room.current_occupancy = max(0, self.room.current_occupancy - 1)
-            self.room.save()
-            # Check if student has other approved applications
-            other_approved = RoomApplication.objects.filter(
-                student=self.student, status='approved'
-            ).exclude(pk=self.pk).exists()
-            if not other_approved:
+        # Check if student has other approved applications
+        other_approved = RoomApplication.objects.filter(
+            student_id=self.student_id, status='approved'
+        ).exclude(pk=self.pk).exists()
+        if not other_approved:
+            StudentProfile.objects.set_allocated([self.student_id], allocated=False)
+            if RoomApplication.student.is_cached(self):
                 self.student.is_allocated = False
-                self.student.save()
-        super().delete(*args, **kwargs)
-    
+        NoticeRecipient.objects.refresh_students([self.student_id])
+
     def __str__(self):
         return f"{self.student.student_id} - Room {self.room.room_number} ({self.status})"
     
     class Meta:
         ordering = ['-priority_score', '-application_date']
         unique_together = ['student', 'room']  # Prevent duplicate applications
+        indexes = [
+            models.Index(fields=['-priority_score', '-application_date'], name='roomapp_priority_idx'),
+            models.Index(fields=['student', 'status'], name='roomapp_student_status_idx'),
+            # Review queue and auto-allocation only ever read pending rows
+            models.Index(
+                fields=['-priority_score', 'application_date'],
+                condition=Q(status='pending'),
+                name='roomapp_pending_idx',
+            ),
+        ]
         verbose_name = 'Room Application'
         verbose_name_plural = 'Room Applications'
 
 
-class RoomAllocation(models.Model):
+class RoomAllocation(ChangeTrackingMixin, models.Model):
     """
     Direct room allocation model for admin to assign students to rooms
     """
@@ -223,54 +517,94 @@ class RoomAllocation(models.Model):
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        # Remember the stored flag so save() doesn't need to re-read the row
+        instance._loaded_is_active = instance.__dict__.get('is_active')
+        return instance
+
+    def _stored_is_active(self):
+        if self.__dict__.get('_loaded_is_active') is not None:
+            return self._loaded_is_active
+        return RoomAllocation.objects.filter(pk=self.pk).values_list('is_active', flat=True).first()
+
+    def clean(self):
+        super().clean()
+        # Friendly form error; save() still enforces capacity atomically
+        if self.is_active and self.room_id:
+            was_active = self._stored_is_active() if self.pk else False
+            if not was_active and self.room.is_full:
+                raise ValidationError(f'Room {self.room.room_number} is already full.')
+
     def save(self, *args, **kwargs):
         # Update room occupancy and student status
         if not self.pk:  # New allocation
-            if self.is_active:
-                self.room.current_occupancy += 1
-                self.room.save()
-                self.student.is_allocated = True
-                self.student.save()
-        else:  # Existing allocation
-            old_allocation = RoomAllocation.objects.filter(pk=self.pk).first()
-            if old_allocation and old_allocation.is_active != self.is_active:
-                if not self.is_active:  # Deactivating
-                    self.room.current_occupancy = max(0, self.room.current_occupancy - 1)
-                    self.room.save()
-                    # Check if student has other active allocations
-                    other_active = RoomAllocation.objects.filter(
-                        student=self.student, is_active=True
-                    ).exclude(pk=self.pk).exists()
-                    if not other_active:
-                        self.student.is_allocated = False
-                        self.student.save()
-                elif self.is_active:  # Activating
-                    self.room.current_occupancy += 1
-                    self.room.save()
-                    self.student.is_allocated = True
-                    self.student.save()
-        super().save(*args, **kwargs)
-    
+            with transaction.atomic():
+                if self.is_active:
+                    self._claim_allocation()
+                super().save(*args, **kwargs)
+            self._loaded_is_active = self.is_active
+            return
+
+        was_active = self._stored_is_active()
+        if was_active is None or was_active == self.is_active:
+            super().save(*args, **kwargs)
+            self._loaded_is_active = self.is_active
+            return
+
+        with transaction.atomic():
+            # Compare-and-swap on the flag so a toggle is applied only once
+            changed = RoomAllocation.objects.filter(
+                pk=self.pk, is_active=was_active
+            ).update(is_active=self.is_active)
+            if not changed:
+                raise AllocationError('This allocation was changed by someone else. Please reload it.')
+            if self.is_active:  # Activating
+                self._claim_allocation()
+            else:  # Deactivating
+                self._release_allocation()
+            super().save(*args, **self.update_fields_after_swap('is_active', kwargs))
+        self._loaded_is_active = self.is_active
+
     def delete(self, *args, **kwargs):
         # Update room occupancy if deleting active allocation
-        if self.is_active:
+        with transaction.atomic():
+            if self._stored_is_active():
+                self._release_allocation()
+            return super().delete(*args, **kwargs)
+
+    def _claim_allocation(self):
+        if not Room.objects.claim_bed(self.room_id):
+            raise AllocationError('Room is already full.')
+        if RoomAllocation.room.is_cached(self):
+            self.room.current_occupancy += 1
+        StudentProfile.objects.set_allocated([self.student_id])
+        if RoomAllocation.student.is_cached(self):
+            self.student.is_allocated = True
+
+    def _release_allocation(self):
+        Room.objects.release_bed(self.room_id)
+        if RoomAllocation.room.is_cached(self):
             self.room.current_occupancy = max(0, self.room.current_occupancy - 1)
-            self.room.save()
-            # Check if student has other active allocations
-            other_active = RoomAllocation.objects.filter(
-                student=self.student, is_active=True
-            ).exclude(pk=self.pk).exists()
-            if not other_active:
+        # Check if student has other active allocations
+        other_active = RoomAllocation.objects.filter(
+            student_id=self.student_id, is_active=True
+        ).exclude(pk=self.pk).exists()
+        if not other_active:
+            StudentProfile.objects.set_allocated([self.student_id], allocated=False)
+            if RoomAllocation.student.is_cached(self):
                 self.student.is_allocated = False
-                self.student.save()
-        super().delete(*args, **kwargs)
-    
+
     def __str__(self):
         status = "Active" if self.is_active else "Inactive"
         return f"{self.student.student_id} - Room {self.room.room_number} ({status})"
     
     class Meta:
         ordering = ['-allocated_date']
+        indexes = [
+            models.Index(fields=['student'], condition=Q(is_active=True), name='roomalloc_active_idx'),
+        ]
         verbose_name = 'Room Allocation'
         verbose_name_plural = 'Room Allocations'
 
@@ -295,6 +629,13 @@ class Notice(models.Model):
         ('urgent', 'Urgent'),
     )
     
+    TARGET_ALLOCATION_CHOICES = (
+        ('allocated', 'Students with a room'),
+        ('unallocated', 'Students without a room'),
+    )
+    
+    AUDIENCE_RULES = ('block', 'floor', 'faculty', 'department', 'academic_year', 'allocation')
+    
     # Notice content
     title = models.CharField(max_length=200)
     content = models.TextField()
@@ -311,12 +652,62 @@ class Notice(models.Model):
     is_active = models.BooleanField(default=True)
     is_published = models.BooleanField(default=False)
     
-    # Target audience (can be extended later)
+    # Target audience: everyone, or the students matching every rule set
+    # below (materialized into NoticeRecipient rows)
     target_all_students = models.BooleanField(default=True)
+    target_block = models.CharField(max_length=50, blank=True, help_text='Students living in this block')
+    target_floor = models.PositiveIntegerField(null=True, blank=True, help_text='Students living on this floor')
+    target_faculty = models.CharField(max_length=100, blank=True)
+    target_department = models.CharField(max_length=100, blank=True)
+    target_academic_year = models.PositiveIntegerField(null=True, blank=True)
+    target_allocation = models.CharField(max_length=12, choices=TARGET_ALLOCATION_CHOICES, blank=True)
     
     def __str__(self):
         return f"{self.title} ({self.category})"
     
+    @property
+    def is_targeted(self):
+        return not self.target_all_students
+    
+    def audience_rules(self):
+        """The audience rules that are set, as {name: value}"""
+        return {
+            name: getattr(self, f'target_{name}') for name in self.AUDIENCE_RULES
+            if getattr(self, f'target_{name}') not in (None, '')
+        }
+    
+    def clean(self):
+        super().clean()
+        rules = self.audience_rules()
+        if self.target_all_students and rules:
+            raise ValidationError('Untick "target all students" to send the notice to a narrower audience.')
+        if not self.target_all_students and not rules:
+            raise ValidationError('Pick at least one audience rule, or target all students.')
+    
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_is_published = instance.__dict__.get('is_published')
+        return instance
+    
+    def save(self, *args, **kwargs):
+        # published_at is when the notice reached the board; read tracking
+        # (NoticeReadState) relies on it, so stamp it on publishing unless
+        # it is scheduled for later
+        if self.is_published and not self.__dict__.get('_loaded_is_published'):
+            now = timezone.now()
+            if self.published_at is None or self.published_at < now:
+                self.published_at = now
+                if kwargs.get('update_fields') is not None:
+                    kwargs['update_fields'] = {*kwargs['update_fields'], 'published_at'}
+        super().save(*args, **kwargs)
+        self._loaded_is_published = self.is_published
+    
+    @property
+    def visible_since(self):
+        """When the notice appeared on the board"""
+        return self.published_at or self.created_at
+    
     @property
     def is_expired(self):
         """Check if notice is expired"""
@@ -327,10 +718,248 @@ class Notice(models.Model):
     
     class Meta:
         ordering = ['-priority', '-created_at']
+        indexes = [
+            models.Index(
+                fields=['expires_at'],
+                condition=Q(is_published=True, is_active=True),
+                name='notice_visible_idx',
+            ),
+        ]
         verbose_name = 'Notice'
         verbose_name_plural = 'Notices'
 
 
+class NoticeRecipientManager(models.Manager):
+    """
+    Keeps the recipient rows of targeted notices in step with the students.
+
+    A student matches a notice when they match every audience rule it sets:
+    block and floor are those of a room they hold (active allocation or
+    approved application), text rules are compared case-insensitively.
+    """
+
+    def audience(self, notice):
+        """StudentProfile queryset of the notice's audience."""
+        rules = notice.audience_rules()
+        students = StudentProfile.objects.all()
+        if 'faculty' in rules:
+            students = students.filter(faculty__iexact=rules['faculty'])
+        if 'department' in rules:
+            students = students.filter(department__iexact=rules['department'])
+        if 'academic_year' in rules:
+            students = students.filter(academic_year=rules['academic_year'])
+        if 'allocation' in rules:
+            students = students.filter(is_allocated=rules['allocation'] == 'allocated')
+        if 'block' in rules or 'floor' in rules:
+            room = {}
+            if 'block' in rules:
+                room['room__block__iexact'] = rules['block']
+            if 'floor' in rules:
+                room['room__floor'] = rules['floor']
+            students = students.filter(
+                Exists(RoomAllocation.objects.filter(student=OuterRef('pk'), is_active=True, **room))
+                | Exists(RoomApplication.objects.filter(student=OuterRef('pk'), status='approved', **room))
+            )
+        return students
+
+    def materialize(self, notice):
+        """Rebuild the recipients of one notice; drafts and untargeted notices have none."""
+        if not (notice.is_published and notice.is_targeted):
+            self.filter(notice=notice).delete()
+            return
+        wanted = set(self.audience(notice).values_list('user_id', flat=True))
+        existing = set(self.filter(notice=notice).values_list('user_id', flat=True))
+        self._apply({(notice.pk, user_id) for user_id in wanted},
+                    {(notice.pk, user_id) for user_id in existing})
+
+    def refresh_students(self, student_ids):
+        """Re-evaluate every published targeted notice for the given students."""
+        from .allocation import batched
+        student_ids = set(student_ids)
+        notices = [
+            notice for notice in Notice.objects.filter(
+                is_published=True, is_active=True, target_all_students=False
+            ).filter(Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now()))
+            .order_by().only('pk', *(f'target_{name}' for name in Notice.AUDIENCE_RULES))
+        ] if student_ids else []
+        if not notices:
+            return
+
+        wanted, existing = set(), set()
+        for chunk in batched(sorted(student_ids)):
+            students = list(
+                StudentProfile.objects.filter(pk__in=chunk)
+                .values('pk', 'user_id', 'faculty', 'department', 'academic_year', 'is_allocated')
+            )
+            rooms = defaultdict(set)
+            for held in (
+                RoomAllocation.objects.filter(student__in=chunk, is_active=True),
+                RoomApplication.objects.filter(student__in=chunk, status='approved'),
+            ):
+                for student_id, block, floor in held.values_list('student_id', 'room__block', 'room__floor'):
+                    rooms[student_id].add((block.casefold(), floor))
+            for student in students:
+                for notice in notices:
+                    if self._matches(notice.audience_rules(), student, rooms[student['pk']]):
+                        wanted.add((notice.pk, student['user_id']))
+            existing.update(self.filter(
+                user__student_profile__in=chunk, notice__in=notices
+            ).values_list('notice_id', 'user_id'))
+        self._apply(wanted, existing)
+
+    def _matches(self, rules, student, rooms):
+        for name in ('faculty', 'department'):
+            if name in rules and student[name].casefold() != rules[name].casefold():
+                return False
+        if 'academic_year' in rules and student['academic_year'] != rules['academic_year']:
+            return False
+        if 'allocation' in rules and student['is_allocated'] != (rules['allocation'] == 'allocated'):
+            return False
+        if 'block' in rules or 'floor' in rules:
+            return any(
+                ('block' not in rules or block == rules['block'].casefold())
+                and ('floor' not in rules or floor == rules['floor'])
+                for block, floor in rooms
+            )
+        return True
+
+    def _apply(self, wanted, existing):
+        from .allocation import batched
+        removed = existing - wanted
+        for notice_id in {notice_id for notice_id, _ in removed}:
+            user_ids = [user_id for other, user_id in removed if other == notice_id]
+            for chunk in batched(user_ids):
+                self.filter(notice_id=notice_id, user_id__in=chunk).delete()
+        self.bulk_create(
+            [self.model(notice_id=notice_id, user_id=user_id) for notice_id, user_id in wanted - existing],
+            batch_size=500,
+            ignore_conflicts=True,
+        )
+
+
+class NoticeRecipient(models.Model):
+    """A student in the audience of a targeted notice."""
+    notice = models.ForeignKey(Notice, on_delete=models.CASCADE, related_name='recipients')
+    user = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='targeted_notices')
+
+    objects = NoticeRecipientManager()
+
+    def __str__(self):
+        return f"{self.notice} -> {self.user}"
+
+    class Meta:
+        constraints = [
+            # Also the index behind a student's notice lookup
+            models.UniqueConstraint(fields=['user', 'notice'], name='notice_recipient_unique'),
+        ]
+        verbose_name = 'Notice Recipient'
+        verbose_name_plural = 'Notice Recipients'
+
+
+class NoticeReadState(models.Model):
+    """
+    Which notices a user has read, in one row per user: everything that
+    appeared on the board up to ``read_through``, plus the notices in
+    ``read_ids`` that appeared after it and were opened one by one.
+    """
+    user = models.OneToOneField(
+        CustomUser, on_delete=models.CASCADE, primary_key=True, related_name='notice_read_state'
+    )
+    read_through = models.DateTimeField(null=True, blank=True)
+    read_ids = models.JSONField(default=list, blank=True)
+
+    def __str__(self):
+        return f"Notices read by {self.user}"
+
+    def is_read(self, notice):
+        return (
+            (self.read_through is not None and notice.visible_since <= self.read_through)
+            or notice.pk in self.read_ids
+        )
+
+    class Meta:
+        verbose_name = 'Notice Read State'
+        verbose_name_plural = 'Notice Read States'
+
+
+# Hours staff have to act on a complaint, by priority
+DEFAULT_COMPLAINT_SLA_HOURS = {'urgent': 4, 'high': 24, 'medium': 72, 'low': 168}
+
+
+def complaint_sla_hours():
+    return {**DEFAULT_COMPLAINT_SLA_HOURS, **getattr(settings, 'HOSTEL_COMPLAINT_SLA_HOURS', {})}
+
+
+class ComplaintManager(models.Manager):
+    """Staff work queue helpers."""
+
+    def queue(self, staff=None):
+        """
+        Complaints waiting to be started, earliest SLA deadline first: the
+        unclaimed ones plus, for ``staff``, those routed to them (see
+        assignment.py) that they haven't started yet.
+        """
+        waiting = Q(assigned_to__isnull=True)
+        if staff is not None:
+            waiting |= Q(assigned_to=staff)
+        return self.filter(
+            waiting, status='submitted', duplicate_of__isnull=True
+        ).order_by('sla_due_at', 'pk')
+
+    def claim_next(self, staff, batch=5):
+        """
+        Assign the complaint in ``staff``'s queue with the earliest deadline
+        to them and mark it in progress. Returns it, or None if the queue is
+        empty.
+
+        Candidates are read with SELECT ... FOR UPDATE SKIP LOCKED where the
+        database supports it, so concurrent claims pick different rows. The
+        claim itself is a conditional UPDATE, which also makes it safe on
+        SQLite (no row locks): a candidate someone else took in the
+        meantime is skipped.
+        """
+        skip_locked = connections[self.db].features.has_select_for_update_skip_locked
+        while True:
+            with transaction.atomic(using=self.db):
+                candidates = self.queue(staff)
+                if skip_locked:
+                    candidates = candidates.select_for_update(skip_locked=True)
+                rows = list(candidates.values_list('pk', 'assigned_to')[:batch])
+                if not rows:
+                    return None
+                now = timezone.now()
+                for pk, assignee_id in rows:
+                    if assignee_id is None:
+                        claimed = self.filter(pk=pk, status='submitted', assigned_to__isnull=True).update(
+                            status='in_progress', assigned_to=staff, assigned_date=now, updated_at=now
+                        )
+                    else:
+                        claimed = self.filter(pk=pk, status='submitted', assigned_to=staff).update(
+                            status='in_progress', updated_at=now
+                        )
+                    if claimed:
+                        HostelStats.objects.apply_complaint_change(
+                            ('submitted', assignee_id), ('in_progress', staff.pk)
+                        )
+                        return self.get(pk=pk)
+
+    def sync_duplicates(self, originals):
+        """
+        Give the duplicates of ``originals`` (pks or a queryset) the status
+        and resolution of the complaint they were merged into.
+        """
+        original = self.filter(pk=OuterRef('duplicate_of'))
+        behind = self.filter(duplicate_of__in=originals).exclude(status=F('duplicate_of__status'))
+        groups = behind.order_by().values_list('status', 'assigned_to', 'duplicate_of__status').distinct()
+        for status, assignee_id, new_status in list(groups):
+            count = behind.filter(status=status, assigned_to=assignee_id, duplicate_of__status=new_status).update(
+                status=new_status,
+                resolved_date=Subquery(original.values('resolved_date')),
+                updated_at=timezone.now(),
+            )
+            HostelStats.objects.apply_complaint_change((status, assignee_id), (new_status, assignee_id), count)
+
+
 class Complaint(models.Model):
     """
     Complaint model for students to submit complaints and track resolution
@@ -360,6 +989,9 @@ class Complaint(models.Model):
         ('rejected', 'Rejected'),
     )
     
+    # Statuses that still need staff attention
+    OPEN_STATUSES = ('submitted', 'in_progress')
+    
     # Complaint details
     submitted_by = models.ForeignKey(CustomUser, on_delete=models.CASCADE, related_name='submitted_complaints')
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
@@ -370,6 +1002,10 @@ class Complaint(models.Model):
     
     # Status tracking
     status = models.CharField(max_length=20, choices=STATUS_CHOICES, default='submitted')
+    # Set for complaints joined to or merged into another; they follow its status
+    duplicate_of = models.ForeignKey(
+        'self', on_delete=models.SET_NULL, null=True, blank=True, related_name='duplicates'
+    )
     
     # Assignment and resolution
     assigned_to = models.ForeignKey(CustomUser, on_delete=models.SET_NULL, null=True, blank=True, related_name='assigned_complaints')
@@ -380,10 +1016,81 @@ class Complaint(models.Model):
     # Timestamps
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
+    # created_at plus the priority's SLA window (HOSTEL_COMPLAINT_SLA_HOURS)
+    sla_due_at = models.DateTimeField(editable=False)
+    # MinHash of the subject and location, then the description, see duplicates.py
+    text_signature = models.JSONField(default=list, editable=False)
+    
+    TEXT_FIELDS = ('subject', 'location', 'description')
+    
+    objects = ComplaintManager()
     
     def __str__(self):
         return f"{self.subject} ({self.status})"
     
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._loaded_status = instance.__dict__.get('status')
+        instance._loaded_assigned_to = instance.__dict__.get('assigned_to_id')
+        instance._loaded_priority = instance.__dict__.get('priority')
+        if instance.has_text_loaded():
+            instance._loaded_text = instance.signature_text()
+        return instance
+    
+    def has_text_loaded(self):
+        return all(name in self.__dict__ for name in self.TEXT_FIELDS)
+    
+    def signature_text(self):
+        return ' '.join(getattr(self, name) for name in self.TEXT_FIELDS)
+    
+    @property
+    def is_open(self):
+        return self.status in self.OPEN_STATUSES
+    
+    @property
+    def is_overdue(self):
+        return self.is_open and self.sla_due_at is not None and timezone.now() > self.sla_due_at
+    
+    def compute_sla_due_at(self):
+        start = self.created_at or timezone.now()
+        return start + timedelta(hours=complaint_sla_hours()[self.priority])
+    
+    def save(self, *args, **kwargs):
+        if self.sla_due_at is None or self.priority != self.__dict__.get('_loaded_priority', self.priority):
+            self.sla_due_at = self.compute_sla_due_at()
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'sla_due_at'}
+        reindex = self.has_text_loaded() and (
+            self.signature_text() != self.__dict__.get('_loaded_text')
+        )
+        if reindex:
+            from .duplicates import text_signature
+            # find_duplicates() already signed a complaint being submitted
+            if not (self._state.adding and self.text_signature):
+                self.text_signature = text_signature(self)
+            if kwargs.get('update_fields') is not None:
+                kwargs['update_fields'] = {*kwargs['update_fields'], 'text_signature'}
+        if self._state.adding:
+            before = None
+        elif self.__dict__.get('_loaded_status') is not None:
+            before = (self._loaded_status, self.__dict__.get('_loaded_assigned_to'))
+        else:
+            before = Complaint.objects.filter(pk=self.pk).values_list('status', 'assigned_to').first()
+        after = (self.status, self.assigned_to_id)
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+            if before != after:
+                HostelStats.objects.apply_complaint_change(before, after)
+            if before is not None and before[0] != self.status:
+                Complaint.objects.sync_duplicates([self.pk])
+            if reindex:
+                ComplaintTextBucket.objects.index(self)
+                self._loaded_text = self.signature_text()
+        self._loaded_status = self.status
+        self._loaded_assigned_to = self.assigned_to_id
+        self._loaded_priority = self.priority
+    
     @property
     def days_since_submission(self):
         """Calculate days since complaint was submitted"""
@@ -392,5 +1099,286 @@ class Complaint(models.Model):
     
     class Meta:
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['submitted_by', 'status'], name='complaint_submitter_idx'),
+            # Not partial on OPEN_STATUSES: SQLite can't prove that a bound
+            # "status IN (?, ?)" matches an index condition
+            models.Index(fields=['status', '-created_at'], name='complaint_status_idx'),
+            # Staff work queue: status, then the deadline (which already
+            # folds in priority and age)
+            models.Index(fields=['status', 'sla_due_at'], name='complaint_queue_idx'),
+        ]
         verbose_name = 'Complaint'
         verbose_name_plural = 'Complaints'
+
+
+class ComplaintTextBucketManager(models.Manager):
+
+    def index(self, complaint):
+        """Replace ``complaint``'s buckets with those of its current signature."""
+        from .duplicates import band_keys
+
+        self.filter(complaint=complaint).delete()
+        self.bulk_create([
+            self.model(complaint=complaint, key=key) for key in band_keys(complaint.text_signature)
+        ])
+
+
+class ComplaintTextBucket(models.Model):
+    """One LSH band of a complaint's text signature, see duplicates.py."""
+    complaint = models.ForeignKey(Complaint, on_delete=models.CASCADE, related_name='text_buckets')
+    key = models.BigIntegerField()
+
+    objects = ComplaintTextBucketManager()
+
+    class Meta:
+        indexes = [
+            # Covers the candidate lookup (key IN (...) -> complaint_id)
+            models.Index(fields=['key', 'complaint'], name='complaint_bucket_idx'),
+        ]
+
+
+
+class ComplaintRoute(models.Model):
+    """
+    Makes a staff member eligible for automatically assigned complaints of
+    a category and/or from students living in a block (blank means any).
+    """
+    staff = models.ForeignKey(
+        CustomUser, on_delete=models.CASCADE, related_name='complaint_routes',
+        limit_choices_to={'user_type__in': ['staff', 'provost', 'admin']}
+    )
+    category = models.CharField(max_length=20, choices=Complaint.CATEGORY_CHOICES, blank=True)
+    block = models.CharField(max_length=50, blank=True)
+
+    def __str__(self):
+        return f"{self.staff}: {self.get_category_display() or 'any category'}, {self.block or 'any block'}"
+
+    def matches(self, category, block):
+        return (
+            (not self.category or self.category == category)
+            and (not self.block or self.block.casefold() == (block or '').casefold())
+        )
+
+    class Meta:
+        unique_together = ['staff', 'category', 'block']
+        verbose_name = 'Complaint Route'
+        verbose_name_plural = 'Complaint Routes'
+
+
+class HostelStatsManager(models.Manager):
+    """
+    Helpers to keep HostelStats rows in step with the tables they summarise.
+
+    Counters are only changed with ``F()`` increments inside the transaction
+    that changes the underlying rows, so concurrent writers never lose
+    updates. ``recompute()`` rebuilds everything from scratch.
+    """
+
+    def scopes(self, block, room_type):
+        return Q(scope='global') | Q(scope='block', key=block) | Q(scope='room_type', key=room_type)
+
+    def scopes_for_room(self, room_id):
+        """Scopes of a room looked up inside the UPDATE itself (no extra query)."""
+        room = Room.objects.filter(pk=room_id)
+        return (
+            Q(scope='global')
+            | Q(scope='block', key=Subquery(room.values('block')))
+            | Q(scope='room_type', key=Subquery(room.values('room_type')))
+        )
+
+    def bump(self, scopes, **deltas):
+        """
+        Add ``deltas`` (ints or expressions) to the counters of the matching
+        rows. Call after writing the change they count: if the counters
+        haven't been built yet, they are rebuilt from the tables instead.
+        """
+        changes = {
+            name: F(name) + delta for name, delta in deltas.items()
+            if not (isinstance(delta, int) and delta == 0)
+        }
+        if changes and not self.filter(scopes).update(updated_at=timezone.now(), **changes):
+            self.ensure_built()
+
+    def ensure_built(self):
+        """Rebuild the counters if there are none; returns whether it did."""
+        if self.filter(scope='global').exists():
+            return False
+        self.recompute()
+        return True
+
+    def bump_global(self, **deltas):
+        self.bump(Q(scope='global'), **deltas)
+
+    def collect(self, totals, block, room_type, **deltas):
+        """Add per-room ``deltas`` to the global, block and room type scopes in ``totals``."""
+        for key in (('global', ''), ('block', block), ('room_type', room_type)):
+            totals[key].update(deltas)
+
+    def collect_room_change(self, totals, before, after):
+        """Collect the counter change of a room going from ``before`` to ``after`` (Room.counter_state())."""
+        for sign, state in ((-1, before), (1, after)):
+            if state is None:
+                continue
+            block, room_type, capacity, occupancy, is_available = state
+            self.collect(
+                totals, block, room_type,
+                total_rooms=sign,
+                available_rooms=sign * int(is_available and occupancy < capacity),
+                total_capacity=sign * capacity,
+                total_occupied=sign * occupancy,
+            )
+
+    def apply(self, totals):
+        """
+        Write collected ``{(scope, key): Counter}`` deltas, one UPDATE per
+        distinct set of deltas.
+        """
+        totals = {key: counter for key, counter in totals.items() if any(counter.values())}
+        if not totals:
+            return
+        # New blocks, room types and staff start from zero. A missing global
+        # row means the counters were never built: that is checked below
+        self.bulk_create(
+            [HostelStats(scope=scope, key=key) for scope, key in totals if scope != 'global'],
+            ignore_conflicts=True,
+        )
+        rows_by_deltas = defaultdict(list)
+        for (scope, key), counter in totals.items():
+            deltas = frozenset((name, delta) for name, delta in counter.items() if delta)
+            rows_by_deltas[deltas].append(Q(scope=scope, key=key))
+        now = timezone.now()
+        for deltas, rows in rows_by_deltas.items():
+            scopes = Q()
+            for row in rows:
+                scopes |= row
+            changes = {name: F(name) + delta for name, delta in deltas}
+            if self.filter(scopes).update(updated_at=now, **changes) < len(rows) and self.ensure_built():
+                return
+
+    def collect_complaint(self, totals, status, assignee_id, delta=1):
+        """Collect ``delta`` complaints with ``status`` and ``assignee_id`` into ``totals``."""
+        if status in Complaint.OPEN_STATUSES:
+            totals[('global', '')]['open_complaints'] += delta
+            if assignee_id is not None:
+                totals[('staff', str(assignee_id))]['open_complaints'] += delta
+
+    def apply_complaint_change(self, before, after, count=1):
+        """Write ``count`` complaints going from ``before`` to ``after`` ((status, assigned_to_id) or None)."""
+        totals = defaultdict(Counter)
+        for sign, state in ((-1, before), (1, after)):
+            if state is not None:
+                self.collect_complaint(totals, *state, delta=sign * count)
+        self.apply(totals)
+
+    def apply_room_changes(self, changes):
+        totals = defaultdict(Counter)
+        for before, after in changes:
+            self.collect_room_change(totals, before, after)
+        self.apply(totals)
+
+    def get_global(self):
+        stats = self.filter(scope='global').first()
+        if stats is None:
+            self.recompute()
+            stats = self.get(scope='global')
+        return stats
+
+    @transaction.atomic
+    def recompute(self):
+        """Rebuild every counter row from the underlying tables."""
+        rows = {('global', ''): HostelStats(scope='global', key='')}
+        room_counters = {
+            'total_rooms': Count('pk'),
+            'available_rooms': Count('pk', filter=Q(is_available=True, current_occupancy__lt=F('capacity'))),
+            'total_capacity': Sum('capacity', default=0),
+            'total_occupied': Sum('current_occupancy', default=0),
+        }
+        pending = RoomApplication.objects.filter(status='pending').order_by()
+
+        for name, value in Room.objects.aggregate(**room_counters).items():
+            setattr(rows[('global', '')], name, value)
+        for scope in ('block', 'room_type'):
+            for row in Room.objects.order_by().values(scope).annotate(**room_counters):
+                stats = rows.setdefault((scope, row[scope]), HostelStats(scope=scope, key=row[scope]))
+                for name in room_counters:
+                    setattr(stats, name, row[name])
+            for row in pending.values(f'room__{scope}').annotate(total=Count('pk')):
+                key = row[f'room__{scope}']
+                stats = rows.setdefault((scope, key), HostelStats(scope=scope, key=key))
+                stats.pending_applications = row['total']
+
+        global_stats = rows[('global', '')]
+        global_stats.pending_applications = pending.count()
+        students = StudentProfile.objects.aggregate(
+            total=Count('pk'), allocated=Count('pk', filter=Q(is_allocated=True))
+        )
+        global_stats.total_students = students['total']
+        global_stats.allocated_students = students['allocated']
+        open_complaints = Complaint.objects.filter(status__in=Complaint.OPEN_STATUSES).order_by()
+        global_stats.open_complaints = open_complaints.count()
+        for assignee_id, load in (
+            open_complaints.filter(assigned_to__isnull=False)
+            .values_list('assigned_to').annotate(Count('pk'))
+        ):
+            rows[('staff', str(assignee_id))] = HostelStats(
+                scope='staff', key=str(assignee_id), open_complaints=load
+            )
+
+        self.all().delete()
+        self.bulk_create(rows.values())
+        return len(rows)
+
+
+class HostelStats(models.Model):
+    """
+    Denormalized occupancy counters, one row for the whole hostel plus one
+    per block and per room type.
+
+    Student and complaint counters are only tracked on the global row, except
+    that each staff member has a row (keyed by user id) counting the open
+    complaints assigned to them.
+    """
+
+    SCOPE_CHOICES = (
+        ('global', 'Whole hostel'),
+        ('block', 'Block'),
+        ('room_type', 'Room type'),
+        ('staff', 'Staff member'),
+    )
+
+    scope = models.CharField(max_length=10, choices=SCOPE_CHOICES)
+    key = models.CharField(max_length=50, blank=True)
+
+    # Room counters
+    total_rooms = models.IntegerField(default=0)
+    available_rooms = models.IntegerField(default=0)
+    total_capacity = models.IntegerField(default=0)
+    total_occupied = models.IntegerField(default=0)
+    pending_applications = models.IntegerField(default=0)
+
+    # Global-only counters
+    total_students = models.IntegerField(default=0)
+    allocated_students = models.IntegerField(default=0)
+    open_complaints = models.IntegerField(default=0)
+
+    updated_at = models.DateTimeField(auto_now=True)
+
+    objects = HostelStatsManager()
+
+    def __str__(self):
+        if self.scope == 'global':
+            return 'Whole hostel'
+        return f"{self.get_scope_display()} {self.key}"
+
+    @property
+    def occupancy_rate(self):
+        return round(
+            (self.total_occupied / self.total_capacity * 100) if self.total_capacity > 0 else 0, 1
+        )
+
+    class Meta:
+        ordering = ['scope', 'key']
+        unique_together = ['scope', 'key']
+        verbose_name = 'Hostel Statistics'
+        verbose_name_plural = 'Hostel Statistics'
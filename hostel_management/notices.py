@@ -0,0 +1,179 @@
+"""
+Cached notice board.
+
+The set of visible notices (published, active, past their published_at
+and not yet expired) only changes when a notice is saved or deleted, or
+when a time boundary passes: a notice's expires_at, or a published_at set
+in the future. The board is cached until the earliest upcoming boundary
+and dropped on any Notice save or delete, so a hit costs one cache read.
+The cache must be shared by every worker process (see CACHES in
+settings.py), or a change would only reach the worker that made it.
+
+Invalidation replaces a version token instead of deleting the board, so a
+request that read the database before a change committed can't store a
+stale board over the fresh one: its copy is tagged with the old version
+and ignored.
+
+Read tracking keeps one NoticeReadState row per user: a high-water mark
+(every notice that reached the board before it is read) plus the few
+notices after it that were opened individually. Unread counts come from
+the cached board and that one row, fetched by primary key, and "mark all
+read" is a single upsert that moves the mark and clears the exceptions.
+
+Targeted notices (``target_all_students`` off) are shown to students only
+if they have a NoticeRecipient row, kept up to date as students and
+allocations change, so a student's board is the cached board filtered by
+one indexed lookup (skipped when no targeted notice is on the board).
+Staff see every notice.
+"""
+import math
+import uuid
+
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Exists, Min, OuterRef, Q
+from django.utils import timezone
+
+from .models import Notice, NoticeReadState, NoticeRecipient
+
+BOARD_KEY = 'notice_board:visible'
+VERSION_KEY = 'notice_board:version'
+# Rebuild at least this often, even with no boundary ahead
+MAX_TIMEOUT = 3600
+ORDERING = ('-priority', '-created_at', '-pk')
+
+
+def visible_notices(now=None):
+    """Notices that should be on the board at ``now``."""
+    now = now or timezone.now()
+    return Notice.objects.filter(
+        is_published=True,
+        is_active=True,
+    ).filter(
+        Q(published_at__isnull=True) | Q(published_at__lte=now)
+    ).filter(
+        Q(expires_at__isnull=True) | Q(expires_at__gt=now)
+    )
+
+
+def next_boundary(now):
+    """The earliest future expires_at or published_at of a published notice."""
+    boundaries = Notice.objects.filter(is_published=True, is_active=True).aggregate(
+        expires=Min('expires_at', filter=Q(expires_at__gt=now)),
+        publishes=Min('published_at', filter=Q(published_at__gt=now)),
+    )
+    upcoming = [value for value in boundaries.values() if value is not None]
+    return min(upcoming) if upcoming else None
+
+
+def get_notice_board():
+    """Visible notices in board order (with created_by loaded), cached."""
+    cached = cache.get_many([VERSION_KEY, BOARD_KEY])
+    version = cached.get(VERSION_KEY)
+    if version is None:
+        cache.add(VERSION_KEY, uuid.uuid4().hex, None)
+        version = cache.get(VERSION_KEY)
+    board = cached.get(BOARD_KEY)
+    if board is not None and board[0] == version:
+        return board[1]
+
+    now = timezone.now()
+    notices = list(visible_notices(now).select_related('created_by').order_by(*ORDERING))
+    timeout = MAX_TIMEOUT
+    boundary = next_boundary(now)
+    if boundary is not None:
+        timeout = min(timeout, max(1, math.ceil((boundary - now).total_seconds())))
+    cache.set(BOARD_KEY, (version, notices), timeout)
+    return notices
+
+
+def invalidate_notice_board():
+    """Retire the cached board once the current transaction commits."""
+    transaction.on_commit(lambda: cache.set(VERSION_KEY, uuid.uuid4().hex, None))
+
+
+def user_notice_board(user):
+    """The cached board, less targeted notices not addressed to ``user``."""
+    board = get_notice_board()
+    if user.user_type != 'student':
+        return board
+    targeted = [notice.pk for notice in board if notice.is_targeted]
+    if not targeted:
+        return board
+    addressed = getattr(user, '_addressed_notices_cache', None)
+    if addressed is None or not addressed[0].issuperset(targeted):
+        addressed = (set(targeted), set(
+            NoticeRecipient.objects.filter(user=user, notice__in=targeted)
+            .values_list('notice_id', flat=True)
+        ))
+        user._addressed_notices_cache = addressed
+    return [notice for notice in board if not notice.is_targeted or notice.pk in addressed[1]]
+
+
+def user_visible_notices(user):
+    """Queryset counterpart of user_notice_board(): visible notices addressed to ``user``."""
+    notices = visible_notices()
+    if user.user_type != 'student':
+        return notices
+    return notices.filter(
+        Q(target_all_students=True)
+        | Exists(NoticeRecipient.objects.filter(notice=OuterRef('pk'), user=user))
+    )
+
+
+def get_read_state(user):
+    """The user's NoticeReadState (unsaved and empty if they never read any)."""
+    state = getattr(user, '_notice_read_state_cache', None)
+    if state is None:
+        state = (
+            NoticeReadState.objects.filter(pk=user.pk).first()
+            or NoticeReadState(user_id=user.pk)
+        )
+        user._notice_read_state_cache = state
+    return state
+
+
+def unread_notices(user):
+    """Board notices the user hasn't read, in board order."""
+    state = get_read_state(user)
+    return [notice for notice in user_notice_board(user) if not state.is_read(notice)]
+
+
+def unread_count(user):
+    if not user.is_authenticated:
+        return 0
+    return len(unread_notices(user))
+
+
+def _save_read_state(state):
+    # INSERT ... ON CONFLICT UPDATE: one statement whether or not the row exists
+    NoticeReadState.objects.bulk_create(
+        [state],
+        update_conflicts=True,
+        unique_fields=['user'],
+        update_fields=['read_through', 'read_ids'],
+    )
+
+
+def mark_all_read(user):
+    state = NoticeReadState(user_id=user.pk, read_through=timezone.now(), read_ids=[])
+    _save_read_state(state)
+    user._notice_read_state_cache = state
+
+
+def mark_read(user, notice):
+    """Record that the user opened ``notice``. Writes nothing if already read."""
+    state = get_read_state(user)
+    board = user_notice_board(user)
+    if state.is_read(notice) or notice.pk not in {other.pk for other in board}:
+        return
+    if all(state.is_read(other) for other in board if other.pk != notice.pk):
+        # Nothing else left: fold the exceptions into the mark
+        state.read_through = timezone.now()
+        state.read_ids = []
+    else:
+        # Drop exceptions for notices that have left the board
+        state.read_ids = [
+            other.pk for other in board if other.pk in state.read_ids or other.pk == notice.pk
+        ]
+    _save_read_state(state)
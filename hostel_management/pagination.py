@@ -0,0 +1,290 @@
+"""
+Keyset (cursor) pagination for list views.
+
+Django's Paginator runs a COUNT(*) and an OFFSET query that gets slower the
+deeper a user pages. Here each page continues after the last row of the
+previous one on the list's sort keys (``WHERE (block, floor, ...) > ...``),
+so page N costs the same as page 1, and nothing is counted unless an
+approximate total is asked for.
+
+Cursors are signed with django.core.signing, so clients only ever see an
+opaque token and cannot forge positions.
+"""
+from itertools import islice
+
+from django.core import signing
+from django.core.paginator import EmptyPage, Paginator
+from django.db import connections
+from django.db.models import Q
+from django.utils.functional import cached_property
+from django.http import Http404
+
+CURSOR_SALT = 'hostel_management.pagination.cursor'
+NEXT, PREVIOUS = 'n', 'p'
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def estimate_count(queryset, cap=1000):
+    """
+    Count ``queryset`` but stop at ``cap`` rows. Returns ``(count, exact)``;
+    ``exact`` is False when there are more than ``cap`` rows.
+    """
+    count = queryset.order_by()[:cap + 1].count()
+    return min(count, cap), count <= cap
+
+
+def table_row_estimate(model, using):
+    """The planner's row count for ``model``'s table (PostgreSQL), else None."""
+    connection = connections[using]
+    if connection.vendor != 'postgresql':
+        return None
+    with connection.cursor() as cursor:
+        cursor.execute('SELECT reltuples FROM pg_class WHERE oid = %s::regclass', [model._meta.db_table])
+        row = cursor.fetchone()
+    # -1 until the table is first analyzed
+    return int(row[0]) if row and row[0] >= 0 else None
+
+
+class KeysetPage:
+    """One page of a KeysetPaginator, usable where templates expect page_obj."""
+
+    def __init__(self, object_list, paginator, has_next, has_previous):
+        self.object_list = object_list
+        self.paginator = paginator
+        self._has_next = has_next
+        self._has_previous = has_previous
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def has_next(self):
+        return self._has_next
+
+    def has_previous(self):
+        return self._has_previous
+
+    def has_other_pages(self):
+        return self._has_next or self._has_previous
+
+    @property
+    def next_cursor(self):
+        if self._has_next:
+            return self.paginator.encode_cursor(NEXT, self.object_list[-1])
+
+    @property
+    def previous_cursor(self):
+        if self._has_previous:
+            return self.paginator.encode_cursor(PREVIOUS, self.object_list[0])
+
+
+class KeysetPaginator:
+    """
+    Paginate ``queryset`` on ``ordering`` (field names, ``-`` for descending).
+
+    The primary key is appended as a tie-breaker, so the keys identify a row
+    uniquely. Ordering fields must not be nullable.
+    """
+
+    def __init__(self, queryset, per_page, ordering, approximate_total=False, total_cap=1000, model=None):
+        self.queryset = queryset
+        self.per_page = int(per_page)
+        self.approximate_total = approximate_total
+        self.total_cap = total_cap
+        meta = (model or queryset.model)._meta
+
+        keys = [(name.lstrip('-'), name.startswith('-')) for name in ordering]
+        if not any(name in ('pk', meta.pk.name) for name, _ in keys):
+            keys.append(('pk', keys[-1][1] if keys else False))
+        self.keys = keys
+        self.fields = [meta.pk if name == 'pk' else meta.get_field(name) for name, _ in keys]
+
+    def ordering(self, reverse=False):
+        return [('-' if descending != reverse else '') + name for name, descending in self.keys]
+
+    def encode_cursor(self, direction, obj):
+        values = [getattr(obj, field.attname) for field in self.fields]
+        values = [value if isinstance(value, (int, float, str)) else str(value) for value in values]
+        return signing.dumps([direction, values], salt=CURSOR_SALT, compress=True)
+
+    def decode_cursor(self, cursor):
+        try:
+            direction, values = signing.loads(cursor, salt=CURSOR_SALT)
+            if direction not in (NEXT, PREVIOUS) or len(values) != len(self.fields):
+                raise ValueError
+            return direction, [field.to_python(value) for field, value in zip(self.fields, values)]
+        except (signing.BadSignature, TypeError, ValueError) as e:
+            raise InvalidCursor('Invalid page cursor.') from e
+
+    def seek(self, values, reverse=False):
+        """Rows strictly after ``values`` in ordering (before it if ``reverse``)."""
+        condition = Q()
+        equal = {}
+        for (name, descending), value in zip(self.keys, values):
+            lookup = 'lt' if descending != reverse else 'gt'
+            condition |= Q(**equal, **{f'{name}__{lookup}': value})
+            equal[name] = value
+        return condition
+
+    def fetch(self, values, reverse, limit):
+        """Up to ``limit`` rows after ``values`` (from the start if None)."""
+        queryset = self.queryset
+        if values is not None:
+            queryset = queryset.filter(self.seek(values, reverse))
+        return list(queryset.order_by(*self.ordering(reverse))[:limit])
+
+    def page(self, cursor=None):
+        """Return the KeysetPage that ``cursor`` points at (the first page if None)."""
+        limit = self.per_page + 1
+        if not cursor:
+            rows = self.fetch(None, False, limit)
+            return KeysetPage(rows[:self.per_page], self, len(rows) == limit, False)
+
+        direction, values = self.decode_cursor(cursor)
+        reverse = direction == PREVIOUS
+        rows = self.fetch(values, reverse, limit)
+        if not rows:
+            # Everything past the cursor is gone; start over
+            return self.page()
+        more = len(rows) == limit
+        rows = rows[:self.per_page]
+        if reverse:
+            rows.reverse()
+            return KeysetPage(rows, self, True, more)
+        return KeysetPage(rows, self, more, True)
+
+    def _estimate(self):
+        if not hasattr(self, '_estimated'):
+            self._estimated = estimate_count(self.queryset, self.total_cap)
+        return self._estimated
+
+    @property
+    def total(self):
+        """Matching rows (at most total_cap), or None without approximate_total."""
+        return self._estimate()[0] if self.approximate_total else None
+
+    @property
+    def total_exact(self):
+        return self._estimate()[1] if self.approximate_total else False
+
+
+class SequenceKeysetPaginator(KeysetPaginator):
+    """
+    Same cursors, over a list already sorted on ``ordering`` (such as a
+    cached result) instead of a queryset. Each page is a linear scan, so
+    keep the list short.
+    """
+
+    def __init__(self, object_list, per_page, ordering, model, **kwargs):
+        super().__init__(object_list, per_page, ordering, model=model, **kwargs)
+
+    def follows(self, obj, values, reverse):
+        for field, (name, descending), value in zip(self.fields, self.keys, values):
+            current = getattr(obj, field.attname)
+            if current != value:
+                return (current < value) if descending != reverse else (current > value)
+        return False
+
+    def fetch(self, values, reverse, limit):
+        rows = reversed(self.queryset) if reverse else self.queryset
+        if values is not None:
+            rows = (obj for obj in rows if self.follows(obj, values, reverse))
+        return list(islice(rows, limit))
+
+    def _estimate(self):
+        return min(len(self.queryset), self.total_cap), len(self.queryset) <= self.total_cap
+
+
+class KeysetPaginationMixin:
+    """
+    ListView mixin that swaps OFFSET pagination for KeysetPaginator.
+
+    Set ``keyset_ordering`` to the list's sort keys; the current position is
+    read from the ``cursor`` query parameter. get_queryset() may also return
+    a list sorted on those keys, with ``model`` set on the view.
+    """
+    keyset_ordering = None
+    cursor_kwarg = 'cursor'
+    approximate_total = False
+
+    def get_keyset_ordering(self, model):
+        return self.keyset_ordering or self.get_ordering() or model._meta.ordering
+
+    def paginate_queryset(self, queryset, page_size):
+        if isinstance(queryset, list):
+            paginator = SequenceKeysetPaginator(
+                queryset, page_size, self.get_keyset_ordering(self.model), self.model,
+                approximate_total=self.approximate_total,
+            )
+        else:
+            paginator = KeysetPaginator(
+                queryset, page_size, self.get_keyset_ordering(queryset.model),
+                approximate_total=self.approximate_total,
+            )
+        try:
+            page = paginator.page(self.request.GET.get(self.cursor_kwarg))
+        except InvalidCursor as e:
+            raise Http404(str(e))
+        return (paginator, page, page.object_list, page.has_other_pages())
+
+
+class EstimatedCountPaginator(Paginator):
+    """
+    Paginator for admin changelists that never counts a whole large table.
+
+    Unfiltered lists use the planner's estimate where there is one
+    (PostgreSQL). Otherwise rows are counted only up to ``cap``, so a bigger
+    result is shown as ``cap`` rows. Pages past an inexact count stay
+    reachable: each one is accepted if a row exists where it starts, and
+    links on to the next if a row exists after it.
+    """
+    cap = 10000
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.exact = True
+        self.reached = 0
+
+    @cached_property
+    def count(self):
+        queryset = self.object_list
+        if not queryset.query.where:
+            estimate = table_row_estimate(queryset.model, queryset.db)
+            if estimate is not None and estimate > self.cap:
+                self.exact = False
+                return estimate
+        count, self.exact = estimate_count(queryset, self.cap)
+        return count
+
+    @property
+    def num_pages(self):
+        return max(super().num_pages, self.reached)
+
+    def has_rows_from(self, offset):
+        return self.object_list[offset:offset + 1].exists()
+
+    def validate_number(self, number):
+        try:
+            number = super().validate_number(number)
+        except EmptyPage:
+            number = int(number)
+            if self.exact or number < 1 or not self.has_rows_from((number - 1) * self.per_page):
+                raise
+        if not self.exact and number >= self.num_pages:
+            self.reached = number + self.has_rows_from(number * self.per_page)
+        return number
+
+    def page(self, number):
+        number = self.validate_number(number)
+        bottom = (number - 1) * self.per_page
+        top = bottom + self.per_page
+        # Paginator.page() ends the last page at count, which is only the
+        # real end of the rows when the count is exact
+        if self.exact and top + self.orphans >= self.count:
+            top = self.count
+        return self._get_page(self.object_list[bottom:top], number, self)
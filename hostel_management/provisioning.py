@@ -0,0 +1,162 @@
+"""
+Bulk student provisioning.
+
+Creating a user the usual way hashes its password (PBKDF2, deliberately
+slow) in the calling thread, then saves the user and, from the post_save
+handler, its StudentProfile: one core and two round trips per student.
+
+``provision_students`` takes a whole intake at once. The passwords are
+hashed in a process pool, one chunk per task, so hashing scales with the
+cores available. The hashed chunks are inserted as they come back, users
+and then profiles with bulk_create (which sends no post_save), while the
+pool keeps hashing the next ones. The counters and targeted-notice
+recipients the signal handlers would have maintained are updated once for
+the whole intake.
+"""
+import os
+import time
+from dataclasses import dataclass, field
+
+from django.contrib.auth.password_validation import validate_password
+from django.core.exceptions import ValidationError
+from django.db import transaction
+
+from .allocation import batched
+from .hashing import hash_chunk, hashing_pool
+from .models import CustomUser, HostelStats, NoticeRecipient, StudentProfile
+from .stats import invalidate_dashboard_stats
+
+CHUNK_SIZE = 100
+USER_FIELDS = ('username', 'email', 'first_name', 'last_name', 'phone')
+PROFILE_FIELDS = (
+    'student_id', 'department', 'faculty', 'academic_level', 'academic_year', 'semester',
+    'emergency_contact', 'emergency_contact_name', 'date_of_enrollment',
+)
+
+
+@dataclass
+class ProvisionResult:
+    """Outcome of a provisioning run."""
+    created: int = 0
+    skipped: list = field(default_factory=list)  # (row number, reason)
+    workers: int = 1
+    seconds: float = 0.0
+
+    @property
+    def rate(self):
+        return self.created / self.seconds if self.seconds else 0.0
+
+    def report_lines(self):
+        lines = [
+            f"{self.created} students created in {self.seconds:.1f}s "
+            f"({self.rate:,.0f}/s with {self.workers} hashing processes)."
+        ]
+        for number, reason in self.skipped:
+            lines.append(f"  row {number}: {reason}")
+        return lines
+
+
+def clean_row(row):
+    """
+    ``row`` with its values converted to the fields' types (e.g. from CSV
+    strings); raises ValidationError naming the first bad field, or the
+    password if AUTH_PASSWORD_VALIDATORS reject it.
+    """
+    cleaned = {'password': row.get('password') or ''}
+    if not cleaned['password']:
+        raise ValidationError('password: This field cannot be blank.')
+    for model, names in ((CustomUser, USER_FIELDS), (StudentProfile, PROFILE_FIELDS)):
+        for name in names:
+            field = model._meta.get_field(name)
+            if name not in row and field.blank:
+                continue
+            try:
+                cleaned[name] = field.clean(row.get(name, ''), None)
+            except ValidationError as e:
+                raise ValidationError(f"{name}: {' '.join(e.messages)}")
+    user = CustomUser(**{name: cleaned[name] for name in USER_FIELDS if name in cleaned})
+    try:
+        validate_password(cleaned['password'], user)
+    except ValidationError as e:
+        raise ValidationError(f"password: {' '.join(e.messages)}")
+    return cleaned
+
+
+def check_rows(rows, result):
+    """
+    The rows, cleaned, that are valid and whose username and student ID are
+    not taken (by the database or an earlier row).
+    """
+    valid = []
+    for number, row in enumerate(rows, start=1):
+        try:
+            valid.append((number, clean_row(row)))
+        except ValidationError as e:
+            result.skipped.append((number, ' '.join(e.messages)))
+    rows = [row for _, row in valid]
+    usernames, student_ids = set(), set()
+    for chunk in batched(rows):
+        usernames.update(CustomUser.objects.filter(
+            username__in=[row['username'] for row in chunk]
+        ).values_list('username', flat=True))
+        student_ids.update(StudentProfile.objects.filter(
+            student_id__in=[row['student_id'] for row in chunk]
+        ).values_list('student_id', flat=True))
+    accepted = []
+    for number, row in valid:
+        if row['username'] in usernames:
+            result.skipped.append((number, f"username {row['username']} is taken"))
+        elif row['student_id'] in student_ids:
+            result.skipped.append((number, f"student ID {row['student_id']} is taken"))
+        else:
+            usernames.add(row['username'])
+            student_ids.add(row['student_id'])
+            accepted.append(row)
+    result.skipped.sort()
+    return accepted
+
+
+def provision_students(rows, workers=None, chunk_size=CHUNK_SIZE):
+    """
+    Create a student user and profile for each of ``rows`` (dicts with a
+    ``password``, the username, any other USER_FIELDS and all of
+    PROFILE_FIELDS). Invalid rows (a password the validators reject
+    included) and rows whose username or student ID is taken are skipped. ``workers`` defaults to the number of CPUs; with 1
+    everything runs in this process. Returns a ProvisionResult.
+    """
+    result = ProvisionResult()
+    started = time.perf_counter()
+    rows = check_rows(list(rows), result)
+    chunks = list(batched(rows, chunk_size))
+    passwords = [[row['password'] for row in chunk] for chunk in chunks]
+
+    result.workers = max(1, min(workers or os.cpu_count() or 1, len(chunks)))
+    pool = hashing_pool(result.workers) if result.workers > 1 else None
+    try:
+        hashed = pool.map(hash_chunk, passwords) if pool else map(hash_chunk, passwords)
+        with transaction.atomic():
+            profile_ids = []
+            for chunk, hashes in zip(chunks, hashed):
+                users = CustomUser.objects.bulk_create([
+                    CustomUser(
+                        user_type='student', password=password,
+                        **{name: row[name] for name in USER_FIELDS if name in row},
+                    )
+                    for row, password in zip(chunk, hashes)
+                ])
+                profiles = StudentProfile.objects.bulk_create([
+                    StudentProfile(user=user, **{name: row[name] for name in PROFILE_FIELDS if name in row})
+                    for row, user in zip(chunk, users)
+                ])
+                profile_ids.extend(profile.pk for profile in profiles)
+            if profile_ids:
+                HostelStats.objects.bump_global(total_students=len(profile_ids))
+                NoticeRecipient.objects.refresh_students(profile_ids)
+                invalidate_dashboard_stats()
+    finally:
+        if pool:
+            pool.shutdown(cancel_futures=True)
+
+    result.created = len(rows)
+    result.seconds = time.perf_counter() - started
+    return result
@@ -0,0 +1,114 @@
+"""
+Priority scoring for room applications.
+
+A scoring policy turns student attributes into a priority score. Policies
+work column-wise: ``score_batch`` receives one list per attribute and
+returns one score per student, so re-scoring every pending application is
+a single pass over the data followed by ``bulk_update``.
+
+The active policy is configured with the HOSTEL_PRIORITY_POLICY setting::
+
+    HOSTEL_PRIORITY_POLICY = {
+        'CLASS': 'hostel_management.scoring.LevelAndYearPolicy',
+        'OPTIONS': {'base': 50, 'year_cap': 20},
+    }
+"""
+from abc import ABC, abstractmethod
+
+from django.conf import settings
+from django.utils.module_loading import import_string
+
+from .allocation import batched
+from .models import RoomApplication
+
+DEFAULT_POLICY = {
+    'CLASS': 'hostel_management.scoring.LevelAndYearPolicy',
+    'OPTIONS': {},
+}
+
+
+class ScoringPolicy(ABC):
+    """Base class for priority scoring policies."""
+
+    # StudentProfile fields the policy reads
+    fields = ()
+
+    @abstractmethod
+    def score_batch(self, columns):
+        """Return a list of scores given ``{field: [values, ...]}``."""
+
+    def score(self, profile):
+        """Score a single StudentProfile."""
+        columns = {name: [getattr(profile, name)] for name in self.fields}
+        return self.score_batch(columns)[0]
+
+
+class LevelAndYearPolicy(ScoringPolicy):
+    """
+    Base score, plus a bonus per academic level, plus one point per academic
+    year after ``year_origin`` (capped at ``year_cap``).
+    """
+
+    fields = ('academic_level', 'academic_year')
+
+    def __init__(self, base=50, level_bonus=None, year_origin=2020, year_cap=20):
+        self.base = base
+        self.level_bonus = level_bonus if level_bonus is not None else {
+            'PhD': 30,
+            'Postgraduate': 20,
+            'Graduate': 10,
+        }
+        self.year_origin = year_origin
+        self.year_cap = year_cap
+
+    def score_batch(self, columns):
+        bonus = self.level_bonus
+        base, origin, cap = self.base, self.year_origin, self.year_cap
+        return [
+            max(0, base + bonus.get(level, 0) + min(year - origin, cap))
+            for level, year in zip(columns['academic_level'], columns['academic_year'])
+        ]
+
+
+def get_policy():
+    """Instantiate the policy configured in settings."""
+    config = getattr(settings, 'HOSTEL_PRIORITY_POLICY', DEFAULT_POLICY)
+    policy_class = import_string(config.get('CLASS', DEFAULT_POLICY['CLASS']))
+    return policy_class(**config.get('OPTIONS', {}))
+
+
+def score_student(profile, policy=None):
+    """Priority score for a single student."""
+    return (policy or get_policy()).score(profile)
+
+
+def rescore_applications(applications=None, policy=None, batch_size=2000):
+    """
+    Recompute priority scores for pending applications.
+
+    Only rows whose score actually changed are written. Returns the number
+    of applications updated.
+    """
+    policy = policy or get_policy()
+    if applications is None:
+        applications = RoomApplication.objects.all()
+    lookups = [f'student__{name}' for name in policy.fields]
+    rows = (
+        applications.filter(status='pending')
+        .order_by()
+        .values_list('pk', 'priority_score', *lookups)
+        .iterator(chunk_size=batch_size)
+    )
+
+    updated = 0
+    for chunk in batched(rows, batch_size):
+        columns = {name: [row[2 + i] for row in chunk] for i, name in enumerate(policy.fields)}
+        scores = policy.score_batch(columns)
+        changed = [
+            RoomApplication(pk=row[0], priority_score=score)
+            for row, score in zip(chunk, scores)
+            if row[1] != score
+        ]
+        if changed:
+            updated += RoomApplication.objects.bulk_update(changed, ['priority_score'])
+    return updated
@@ -0,0 +1,271 @@
+"""
+Indexed search over rooms, complaints and notices.
+
+``room_number__icontains`` can't use an index, so every search read the
+whole room table. Searches are prefix matches instead, served by:
+
+SQLite
+    An FTS5 external-content table over room_number and block, with
+    prefix indexes, kept in sync with the room table by triggers (so rows
+    written with update() or bulk_create() are covered too).
+
+PostgreSQL
+    pg_trgm GIN indexes on UPPER(room_number) and UPPER(block), which
+    serve Django's ``istartswith`` lookups.
+
+Other backends fall back to plain ``istartswith`` lookups. Users are
+searched the same way, by username, first and last name (the admin's
+student and staff pickers); students also by a student_id prefix, which
+is a range over its unique index.
+
+Complaint and notice text is searched by word, ranked by relevance, with
+the same split: an FTS5 table (porter-stemmed) per model on SQLite, a GIN
+index over a weighted ``tsvector`` expression on PostgreSQL (title/subject
+weighted above the body), and ``icontains`` everywhere else. Matches carry
+a ``search_rank`` annotation, higher is better.
+
+The index objects are created by install(), which runs after every
+``migrate`` (see apps.py). It is idempotent, and re-running it after
+migrations matters on SQLite: rebuilding a table during a migration drops
+its triggers. Bulk writes wrapped in reindexing() skip the triggers and
+rebuild each FTS5 table once at the end instead.
+"""
+import re
+from contextlib import contextmanager
+
+from django.db import connection
+from django.db.models import BooleanField, F, FloatField, Q, Value
+from django.db.models.expressions import RawSQL
+
+from .models import Complaint, CustomUser, Notice, Room
+
+ROOM_SEARCH_TABLE = 'hostel_management_room_search'
+COMPLAINT_SEARCH_TABLE = 'hostel_management_complaint_search'
+NOTICE_SEARCH_TABLE = 'hostel_management_notice_search'
+USER_SEARCH_TABLE = 'hostel_management_customuser_search'
+USER_SEARCH_FIELDS = ('username', 'first_name', 'last_name')
+AUTOCOMPLETE_LIMIT = 10
+# Complaint/notice searches show this many best matches, unpaginated
+SEARCH_LIMIT = 50
+# Text search configuration of the PostgreSQL indexes
+PG_TEXT_CONFIG = 'english'
+
+
+def fts5_install(name, search_table, table, columns, options=''):
+    """
+    Statements creating an FTS5 external-content table over ``columns`` of
+    ``table`` and the triggers (``<name>_search_*``) keeping it in sync.
+    """
+    names = ', '.join(columns)
+    new = ', '.join(f'new.{column}' for column in columns)
+    old = ', '.join(f'old.{column}' for column in columns)
+    return [
+        f"""CREATE VIRTUAL TABLE IF NOT EXISTS {search_table} USING fts5(
+            {names},
+            content='{table}', content_rowid='id'{options}
+        )""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_search_insert AFTER INSERT ON {table} BEGIN
+            INSERT INTO {search_table}(rowid, {names}) VALUES (new.id, {new});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_search_delete AFTER DELETE ON {table} BEGIN
+            INSERT INTO {search_table}({search_table}, rowid, {names}) VALUES ('delete', old.id, {old});
+        END""",
+        f"""CREATE TRIGGER IF NOT EXISTS {name}_search_update
+        AFTER UPDATE OF {names} ON {table} BEGIN
+            INSERT INTO {search_table}({search_table}, rowid, {names}) VALUES ('delete', old.id, {old});
+            INSERT INTO {search_table}(rowid, {names}) VALUES (new.id, {new});
+        END""",
+        # Re-index everything, in case rows were written while triggers were missing
+        f"INSERT INTO {search_table}({search_table}) VALUES ('rebuild')",
+    ]
+
+
+def pg_document(model, columns):
+    """Weighted tsvector over ``columns``: the first weighs 'A', the rest 'B'."""
+    table = model._meta.db_table
+    return ' || '.join(
+        f"""setweight(to_tsvector('{PG_TEXT_CONFIG}', COALESCE("{table}"."{column}", '')), '{weight}')"""
+        for column, weight in zip(columns, 'ABBB')
+    )
+
+
+# Model -> (FTS5 table, indexed columns)
+FULL_TEXT = {
+    Complaint: (COMPLAINT_SEARCH_TABLE, ('subject', 'description', 'location')),
+    Notice: (NOTICE_SEARCH_TABLE, ('title', 'content')),
+}
+
+# Trigger name prefixes of the FTS5 tables, see fts5_install()
+SQLITE_INDEXED = ('room', 'customuser', 'complaint', 'notice')
+
+SQLITE_INSTALL = [
+    *fts5_install(
+        'room', ROOM_SEARCH_TABLE, 'hostel_management_room', ('room_number', 'block'),
+        options=", prefix='1 2 3'",
+    ),
+    *fts5_install(
+        'customuser', USER_SEARCH_TABLE, 'hostel_management_customuser', USER_SEARCH_FIELDS,
+        options=", prefix='1 2 3'",
+    ),
+    *fts5_install(
+        'complaint', COMPLAINT_SEARCH_TABLE, 'hostel_management_complaint', FULL_TEXT[Complaint][1],
+        options=", tokenize='porter unicode61'",
+    ),
+    *fts5_install(
+        'notice', NOTICE_SEARCH_TABLE, 'hostel_management_notice', FULL_TEXT[Notice][1],
+        options=", tokenize='porter unicode61'",
+    ),
+]
+
+POSTGRESQL_INSTALL = [
+    "CREATE EXTENSION IF NOT EXISTS pg_trgm",
+    """CREATE INDEX IF NOT EXISTS room_number_trgm_idx ON hostel_management_room
+        USING gin ((UPPER("room_number"::text)) gin_trgm_ops)""",
+    """CREATE INDEX IF NOT EXISTS room_block_trgm_idx ON hostel_management_room
+        USING gin ((UPPER("block"::text)) gin_trgm_ops)""",
+    *(
+        f"""CREATE INDEX IF NOT EXISTS customuser_{column}_trgm_idx ON hostel_management_customuser
+            USING gin ((UPPER("{column}"::text)) gin_trgm_ops)"""
+        for column in USER_SEARCH_FIELDS
+    ),
+    *(
+        f"""CREATE INDEX IF NOT EXISTS {model._meta.model_name}_text_idx ON {model._meta.db_table}
+            USING gin (({pg_document(model, columns)}))"""
+        for model, (_, columns) in FULL_TEXT.items()
+    ),
+]
+
+
+def install(using=connection):
+    """Create the search table/indexes for the current database engine."""
+    statements = {
+        'sqlite': SQLITE_INSTALL,
+        'postgresql': POSTGRESQL_INSTALL,
+    }.get(using.vendor, [])
+    with using.cursor() as cursor:
+        for sql in statements:
+            cursor.execute(sql)
+
+
+@contextmanager
+def reindexing(using=connection):
+    """
+    Run the block without the SQLite sync triggers, then put them back and
+    rebuild every FTS5 table once. For bulk deletes and loads, where the
+    per-row triggers cost more than a rebuild. Use inside a transaction:
+    the dropped triggers come back on rollback.
+    """
+    if using.vendor == 'sqlite':
+        with using.cursor() as cursor:
+            for name in SQLITE_INDEXED:
+                for event in ('insert', 'delete', 'update'):
+                    cursor.execute(f'DROP TRIGGER IF EXISTS {name}_search_{event}')
+    yield
+    install(using)
+
+
+def search_terms(text):
+    """Lower-cased words in ``text``: 'A-10' -> ['a', '10']."""
+    return re.findall(r'\w+', text.lower())
+
+
+def search_rooms(queryset, text):
+    """Filter ``queryset`` to rooms whose number or block starts with ``text``."""
+    text = text.strip()
+    if not text:
+        return queryset
+    if connection.vendor == 'sqlite':
+        terms = search_terms(text)
+        if not terms:
+            return queryset.none()
+        # Every word must prefix-match a word of room_number or block
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {ROOM_SEARCH_TABLE} WHERE {ROOM_SEARCH_TABLE} MATCH %s', [match]
+        ))
+    return queryset.filter(Q(room_number__istartswith=text) | Q(block__istartswith=text))
+
+
+def search_users(queryset, text):
+    """Filter ``queryset`` to users with every word of ``text`` starting one of their names."""
+    text = text.strip()
+    if not text:
+        return queryset
+    terms = search_terms(text)
+    if not terms:
+        return queryset.none()
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"*' for term in terms)
+        return queryset.filter(pk__in=RawSQL(
+            f'SELECT rowid FROM {USER_SEARCH_TABLE} WHERE {USER_SEARCH_TABLE} MATCH %s', [match]
+        ))
+    for term in terms:
+        queryset = queryset.filter(
+            Q.create([(f'{field}__istartswith', term) for field in USER_SEARCH_FIELDS], connector=Q.OR)
+        )
+    return queryset
+
+
+def search_students(queryset, text):
+    """Filter StudentProfiles to a student_id prefix of ``text`` or users matching it."""
+    text = text.strip()
+    if not text:
+        return queryset
+    by_id = Q()
+    for prefix in {text, text.upper()}:
+        by_id |= Q(student_id__gte=prefix, student_id__lt=prefix + '\U0010ffff')
+    users = search_users(CustomUser.objects.all(), text)
+    return queryset.filter(by_id | Q(user__in=users.values('pk')))
+
+
+def autocomplete_rooms(text, limit=AUTOCOMPLETE_LIMIT):
+    """Available rooms matching ``text``, as dicts for the autocomplete endpoint."""
+    rooms = search_rooms(Room.objects.filter(is_available=True), text)
+    return list(
+        rooms.order_by('block', 'floor', 'room_number')
+        .annotate(available_beds=F('capacity') - F('current_occupancy'))
+        .values('id', 'room_number', 'block', 'floor', 'room_type', 'available_beds')[:limit]
+    )
+
+
+def full_text_match(model, text):
+    """
+    ``(condition, rank)`` for ``model`` rows containing every word of
+    ``text``: a Q-compatible filter expression and a relevance expression.
+    """
+    search_table, columns = FULL_TEXT[model]
+    table = model._meta.db_table
+    terms = search_terms(text)
+    if not terms:
+        return Q(pk__in=[]), Value(0.0)
+    if connection.vendor == 'sqlite':
+        match = ' '.join(f'"{term}"' for term in terms)
+        condition = Q(pk__in=RawSQL(
+            f'SELECT rowid FROM {search_table} WHERE {search_table} MATCH %s', [match]
+        ))
+        # bm25() is lower for better matches; weight the first column like 'A' on PostgreSQL
+        weights = ', '.join(['10.0'] + ['1.0'] * (len(columns) - 1))
+        rank = RawSQL(
+            f'SELECT -bm25({search_table}, {weights}) FROM {search_table} '
+            f'WHERE {search_table} MATCH %s AND rowid = "{table}"."id"',
+            [match], output_field=FloatField(),
+        )
+        return condition, rank
+    if connection.vendor == 'postgresql':
+        document = pg_document(model, columns)
+        query = f"plainto_tsquery('{PG_TEXT_CONFIG}', %s)"
+        condition = RawSQL(f'({document}) @@ {query}', [text], output_field=BooleanField())
+        rank = RawSQL(f'ts_rank({document}, {query})', [text], output_field=FloatField())
+        return condition, rank
+    condition = Q()
+    for term in terms:
+        condition &= Q.create([(f'{column}__icontains', term) for column in columns], connector=Q.OR)
+    return condition, Value(0.0)
+
+
+def search_text(queryset, text):
+    """Filter ``queryset`` (complaints or notices) by ``text``, best matches first."""
+    if not text.strip():
+        return queryset
+    condition, rank = full_text_match(queryset.model, text)
+    return queryset.filter(condition).annotate(search_rank=rank).order_by('-search_rank', '-pk')
@@ -1,6 +1,10 @@
-from django.db.models.signals import post_save
+from django.db.models.signals import post_delete, post_migrate, post_save, pre_delete
+from django.db import connections
 from django.dispatch import receiver
-from .models import CustomUser, StudentProfile
+from . import search
+from .notices import invalidate_notice_board
+from .models import Complaint, CustomUser, HostelStats, Notice, NoticeRecipient, Room, RoomAllocation, RoomApplication, StudentProfile
+from .stats import invalidate_dashboard_stats
 from datetime import date
 
 
@@ -30,7 +34,141 @@ def create_student_profile(sender, instance, created, **kwargs):
 @receiver(post_save, sender=CustomUser)
 def save_student_profile(sender, instance, **kwargs):
     """
-    Save the StudentProfile when the user is saved
+    Save the StudentProfile when the user is saved, if it was loaded and
+    edited alongside the user (the save writes only the changed columns, so
+    a login's last_login update leaves the profile alone)
     """
-    if instance.user_type == 'student' and hasattr(instance, 'student_profile'):
+    if instance.user_type == 'student' and CustomUser.student_profile.related.is_cached(instance):
         instance.student_profile.save()
+
+
+@receiver(post_save, sender=StudentProfile)
+def refresh_priority_scores(sender, instance, created, **kwargs):
+    """
+    Keep the priority score of the student's pending applications in line
+    with their (possibly edited) profile
+    """
+    if created:
+        return
+    from .scoring import get_policy, score_student
+
+    policy = get_policy()
+    update_fields = kwargs.get('update_fields')
+    if update_fields is not None and update_fields.isdisjoint(policy.fields):
+        return
+
+    score = score_student(instance, policy)
+    RoomApplication.objects.filter(
+        student=instance, status='pending'
+    ).exclude(priority_score=score).update(priority_score=score)
+
+
+@receiver(pre_delete, sender=Room)
+def remember_deleted_room(sender, instance, **kwargs):
+    """
+    Read the stored counter fields of a room about to be deleted, since the
+    instance may be stale (occupancy is changed with UPDATEs)
+    """
+    instance._deleted_counter_state = Room.objects.filter(pk=instance.pk).values_list(*Room.COUNTER_FIELDS).first()
+
+
+@receiver(post_delete, sender=Room)
+def remove_room_from_stats(sender, instance, **kwargs):
+    """
+    Take a deleted room out of the counters (after the delete, so counters
+    rebuilt from the tables at this point don't count it)
+    """
+    stored = instance.__dict__.get('_deleted_counter_state')
+    if stored is not None:
+        HostelStats.objects.apply_room_changes([(stored, None)])
+
+
+@receiver(post_delete, sender=RoomApplication)
+def remove_application_from_stats(sender, instance, **kwargs):
+    """
+    Drop a deleted pending application from the counters
+    """
+    if instance.status == 'pending':
+        HostelStats.objects.bump(
+            HostelStats.objects.scopes_for_room(instance.room_id), pending_applications=-1
+        )
+
+
+@receiver(post_delete, sender=StudentProfile)
+def remove_student_from_stats(sender, instance, **kwargs):
+    """
+    Drop a deleted student from the counters
+    """
+    HostelStats.objects.bump_global(
+        total_students=-1, allocated_students=-int(instance.is_allocated)
+    )
+
+
+@receiver(post_delete, sender=Complaint)
+def remove_complaint_from_stats(sender, instance, **kwargs):
+    """
+    Drop a deleted open complaint from the counters
+    """
+    HostelStats.objects.apply_complaint_change((instance.status, instance.assigned_to_id), None)
+
+
+@receiver(post_save, sender=Room)
+@receiver(post_delete, sender=Room)
+@receiver(post_save, sender=RoomApplication)
+@receiver(post_delete, sender=RoomApplication)
+@receiver(post_save, sender=RoomAllocation)
+@receiver(post_delete, sender=RoomAllocation)
+@receiver(post_save, sender=Complaint)
+@receiver(post_delete, sender=Complaint)
+@receiver(post_save, sender=StudentProfile)
+@receiver(post_delete, sender=StudentProfile)
+def clear_dashboard_stats(sender, **kwargs):
+    """
+    Drop the cached dashboard numbers when anything they count changes
+    """
+    invalidate_dashboard_stats()
+
+
+@receiver(post_save, sender=Notice)
+@receiver(post_delete, sender=Notice)
+def clear_notice_board(sender, **kwargs):
+    """
+    Drop the cached notice board when any notice changes
+    """
+    invalidate_notice_board()
+
+
+@receiver(post_save, sender=Notice)
+def materialize_notice_recipients(sender, instance, **kwargs):
+    """
+    Rebuild the recipient list of a targeted notice when it is saved
+    """
+    NoticeRecipient.objects.materialize(instance)
+
+
+@receiver(post_save, sender=RoomAllocation)
+@receiver(post_delete, sender=RoomAllocation)
+def refresh_allocation_recipients(sender, instance, **kwargs):
+    """
+    Re-match the student against targeted notices when their rooms change
+    """
+    NoticeRecipient.objects.refresh_students([instance.student_id])
+
+
+@receiver(post_delete, sender=RoomApplication)
+def refresh_application_recipients(sender, instance, **kwargs):
+    """
+    Deleting an approved application can move the student out of a room
+    """
+    if instance.status == 'approved':
+        NoticeRecipient.objects.refresh_students([instance.student_id])
+
+
+@receiver(post_migrate)
+def install_search_indexes(sender, using, **kwargs):
+    """
+    (Re)create the room search index after migrations
+    """
+    connection = connections[using]
+    if sender.name == 'hostel_management' and Room._meta.db_table in connection.introspection.table_names():
+        search.install(connection)
@@ -0,0 +1,80 @@
+"""
+Dashboard statistics.
+
+Hostel-wide numbers are read from the HostelStats counter rows (maintained
+incrementally, see models.HostelStatsManager) and cached per role. The
+cache is cleared (after commit) by the signal handlers in signals.py and by
+bulk code paths that bypass signals via queryset.update(), which only
+reaches the other worker processes through a shared cache backend.
+"""
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import Count, Func, IntegerField, Q, Subquery
+
+from .models import Complaint, HostelStats, RoomApplication
+
+CACHE_TIMEOUT = 300
+CACHE_KEYS = {
+    'student': 'hostel_stats:dashboard:student',
+    'staff': 'hostel_stats:dashboard:staff',
+}
+STAFF_FIELDS = (
+    'total_capacity', 'total_occupied', 'total_students', 'allocated_students',
+    'pending_applications', 'open_complaints',
+)
+
+
+class CountOf(Subquery):
+    """
+    Uncorrelated ``(SELECT COUNT(*) ...)`` that can sit next to real
+    aggregates in ``aggregate()``, so several tables are counted in one query.
+    """
+    contains_aggregate = True
+
+    def __init__(self, queryset):
+        queryset = queryset.order_by().annotate(total=Func('pk', function='COUNT')).values('total')
+        super().__init__(queryset, output_field=IntegerField())
+
+
+def compute_dashboard_stats(role):
+    """Read the shared dashboard numbers for ``role`` ('student' or 'staff')."""
+    counters = HostelStats.objects.get_global()
+    stats = {
+        'total_rooms': counters.total_rooms,
+        'available_rooms': counters.available_rooms,
+    }
+    if role == 'staff':
+        stats.update({name: getattr(counters, name) for name in STAFF_FIELDS})
+        stats['occupancy_rate'] = counters.occupancy_rate
+        stats['block_stats'] = list(
+            HostelStats.objects.filter(scope='block').values(
+                'key', 'total_rooms', 'available_rooms', 'total_capacity',
+                'total_occupied', 'pending_applications',
+            )
+        )
+    return stats
+
+
+def get_dashboard_stats(role):
+    """Cached version of compute_dashboard_stats()."""
+    key = CACHE_KEYS[role]
+    stats = cache.get(key)
+    if stats is None:
+        stats = compute_dashboard_stats(role)
+        cache.set(key, stats, CACHE_TIMEOUT)
+    return stats
+
+
+def get_student_stats(user, profile):
+    """Per-student numbers for the dashboard, in one query."""
+    return RoomApplication.objects.filter(student=profile).aggregate(
+        pending_applications=Count('pk', filter=Q(status='pending')),
+        open_complaints=CountOf(
+            Complaint.objects.filter(submitted_by=user, status__in=Complaint.OPEN_STATUSES)
+        ),
+    )
+
+
+def invalidate_dashboard_stats():
+    """Drop cached dashboard numbers once the current transaction commits."""
+    transaction.on_commit(lambda: cache.delete_many(CACHE_KEYS.values()))
@@ -0,0 +1,418 @@
+"""
+Synthetic hostel data for load testing.
+
+``SyntheticHostel(seed).populate(...)`` fills the database with any number
+of students, rooms, applications, complaints and notices in realistic
+proportions: students spread over faculties, departments, levels and
+academic years, rooms over blocks, floors and room types, OCCUPANCY of the
+beds taken, and applications and complaints in every status. The same seed
+always produces the same data.
+
+Rows are written with chunked bulk_create, which skips save() and the
+post_save handlers, so the work those would do is done here in bulk: one
+password hash per user type, room occupancy and is_allocated worked out
+before anything is written, complaint SLA deadlines and text signatures
+(with their LSH buckets) filled in, recipients materialized for targeted
+notices, and the HostelStats counters rebuilt at the end. bulk_create also
+stamps every row with the same auto_now_add time, so creation and review
+times are spread over the HISTORY_DAYS before now afterwards, with one
+bulk_update per table, and SLA deadlines computed from them.
+"""
+import random
+import time
+from datetime import date, timedelta
+from string import ascii_uppercase
+
+from django.contrib.auth.hashers import make_password
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .allocation import batched
+from .duplicates import band_keys, text_signature
+from .models import (
+    Complaint, ComplaintTextBucket, CustomUser, HostelStats, Notice, NoticeRecipient, Room,
+    RoomAllocation, RoomApplication, StudentProfile,
+)
+from .notices import invalidate_notice_board
+from .scoring import get_policy
+from .stats import invalidate_dashboard_stats
+
+BATCH_SIZE = 2000
+DEFAULT_SEED = 2024
+# Usernames of generated users start with this
+USERNAME_PREFIX = 'load'
+FLOORS = 6
+ROOMS_PER_FLOOR = 20
+# Share of the beds in available rooms that are taken
+OCCUPANCY = 0.8
+# Share of the bed holders that got their bed through an approved application
+APPROVED_SHARE = 0.4
+STUDENTS_PER_STAFF = 500
+# Generated rows were created at some point in this many days before now
+HISTORY_DAYS = 180
+PASSWORDS = {'student': 'student123', 'staff': 'staff123'}
+
+FACULTIES = {
+    'Engineering': ['Computer Science', 'Electrical Engineering', 'Civil Engineering', 'Mechanical Engineering'],
+    'Science': ['Physics', 'Chemistry', 'Mathematics', 'Statistics'],
+    'Life Sciences': ['Biology', 'Biochemistry', 'Microbiology'],
+    'Agriculture': ['Agronomy', 'Horticulture', 'Soil Science', 'Agricultural Economics'],
+    'Arts': ['English', 'History', 'Economics'],
+}
+FIRST_NAMES = [
+    'Ahmed', 'Fatima', 'Rahim', 'Sarah', 'Omar', 'Nusrat', 'Tanvir', 'Ayesha', 'Imran', 'Farhana',
+    'Sakib', 'Mitu', 'Rafiq', 'Sadia', 'Karim', 'Jannat', 'Hasan', 'Tasnim', 'Arif', 'Lamia',
+]
+LAST_NAMES = [
+    'Hassan', 'Khan', 'Uddin', 'Ali', 'Sheikh', 'Rahman', 'Islam', 'Hossain', 'Ahmed', 'Chowdhury',
+    'Akter', 'Sarker', 'Mia', 'Begum', 'Talukder',
+]
+# Weights
+ACADEMIC_LEVELS = {'Undergraduate': 70, 'Graduate': 15, 'Postgraduate': 10, 'PhD': 5}
+ROOM_TYPES = {'single': 30, 'double': 40, 'triple': 20, 'dormitory': 10}
+ROOM_CAPACITY = {'single': 1, 'double': 2, 'triple': 3, 'dormitory': 6}
+APPLICATION_STATUSES = {'pending': 55, 'rejected': 30, 'withdrawn': 15}
+COMPLAINT_STATUSES = {'submitted': 30, 'in_progress': 20, 'resolved': 35, 'closed': 10, 'rejected': 5}
+COMPLAINT_PRIORITIES = {'low': 25, 'medium': 45, 'high': 22, 'urgent': 8}
+NOTICE_CATEGORIES = {'general': 40, 'important': 20, 'urgent': 10, 'academic': 15, 'maintenance': 15}
+NOTICE_PRIORITIES = {'low': 20, 'medium': 50, 'high': 25, 'urgent': 5}
+
+COMPLAINT_TEXT = {
+    'maintenance': [
+        ('Leaking tap in the washroom', 'The tap has been leaking for days and the floor stays wet all the time.'),
+        ('Broken ceiling fan', 'The ceiling fan stopped working and the room gets very hot at night.'),
+        ('No hot water', 'There has been no hot water in the showers since last week.'),
+        ('WiFi not working', 'The WiFi keeps disconnecting and we cannot attend online classes.'),
+    ],
+    'security': [
+        ('Broken door lock', 'The door lock is broken and the room cannot be secured.'),
+        ('Main gate left open at night', 'The main gate is left open after midnight with no guard present.'),
+        ('Outsiders in the hostel', 'People who do not live here are coming into the hostel late at night.'),
+    ],
+    'facilities': [
+        ('Study room hours', 'The study room closes too early during exams, please keep it open until midnight.'),
+        ('Not enough chairs in the reading room', 'The reading room is always full and there are too few chairs.'),
+        ('Water filter empty', 'The drinking water filter on our floor is empty most of the day.'),
+    ],
+    'cleanliness': [
+        ('Washrooms not cleaned', 'The washrooms have not been cleaned for several days and smell bad.'),
+        ('Garbage not collected', 'Garbage is piling up near the stairs because nobody collects it.'),
+        ('Mosquitoes in the corridor', 'Stagnant water near the corridor is breeding mosquitoes.'),
+    ],
+    'noise': [
+        ('Loud music at night', 'Students next door play loud music after midnight every day.'),
+        ('Construction noise during exams', 'Construction work next to the hostel starts early in the morning during exams.'),
+    ],
+    'other': [
+        ('Mess food quality', 'The food served in the mess has been cold and undercooked this week.'),
+        ('Lost key card', 'I lost my key card and need a replacement.'),
+    ],
+}
+COMMON_AREAS = ['Common Study Room', 'Dining Hall', 'Main Gate', 'Reading Room', 'Prayer Room', 'Playground']
+NOTICE_TITLES = [
+    ('Room application deadline', 'Applications for next semester must be submitted through the portal by the deadline.'),
+    ('Water supply interruption', 'Water supply will be interrupted for tank cleaning. Please store water in advance.'),
+    ('Electrical maintenance', 'Power may be interrupted during electrical maintenance. WiFi may be affected.'),
+    ('Exam schedule', 'The final exam schedule has been published. The study room stays open late during exams.'),
+    ('Hostel fee payment', 'Hostel fees for this semester are due. Late payment carries a fine.'),
+    ('Cultural night', 'All residents are invited to the annual cultural night in the dining hall.'),
+]
+
+
+def block_name(index):
+    """'A'..'Z', then 'AA', 'AB', ..."""
+    name = ''
+    index += 1
+    while index:
+        index, rest = divmod(index - 1, 26)
+        name = ascii_uppercase[rest] + name
+    return name
+
+
+def weighted(rng, weights, k):
+    return rng.choices(list(weights), weights=list(weights.values()), k=k)
+
+
+def chunked_create(model, objects):
+    """bulk_create ``objects`` in BATCH_SIZE chunks; returns them with their pks."""
+    return model.objects.bulk_create(objects, batch_size=BATCH_SIZE)
+
+
+class SyntheticHostel:
+    """Seeded generator; ``report`` lists (step, rows, seconds) once populate() has run."""
+
+    def __init__(self, seed=DEFAULT_SEED):
+        self.rng = random.Random(seed)
+        self.now = timezone.now()
+        self.report = []
+
+    def past(self):
+        """A random moment in the HISTORY_DAYS before now."""
+        return self.now - timedelta(seconds=self.rng.uniform(0, HISTORY_DAYS * 86400))
+
+    def later(self, start, days):
+        """A random moment up to ``days`` after ``start``, but not after now."""
+        return min(start + timedelta(seconds=self.rng.uniform(0, days * 86400)), self.now)
+
+    def step(self, label, create, *args):
+        started = time.perf_counter()
+        rows = create(*args)
+        self.report.append((label, rows, time.perf_counter() - started))
+
+    @transaction.atomic
+    def populate(self, students=0, rooms=0, applications=0, complaints=0, notices=0):
+        self.step('Rooms', self.create_rooms, rooms)
+        self.step('Staff', self.create_staff, max(1, students // STUDENTS_PER_STAFF))
+        self.step('Students', self.create_students, students)
+        self.step('Bed holders', self.occupy_beds, applications)
+        self.step('Applications', self.create_applications, applications)
+        self.step('Complaints', self.create_complaints, complaints)
+        self.step('Notices', self.create_notices, notices)
+        self.step('Statistics', HostelStats.objects.recompute)
+        invalidate_dashboard_stats()
+        invalidate_notice_board()
+        return self.report
+
+    def create_rooms(self, count):
+        rng = self.rng
+        per_block = FLOORS * ROOMS_PER_FLOOR
+        room_types = weighted(rng, ROOM_TYPES, count)
+        rooms = []
+        for i, room_type in enumerate(room_types):
+            block = block_name(i // per_block)
+            floor, number = divmod(i % per_block, ROOMS_PER_FLOOR)
+            rooms.append(Room(
+                room_number=f'{block}-{floor + 1}{number + 1:02d}',
+                block=block,
+                floor=floor + 1,
+                room_type=room_type,
+                capacity=ROOM_CAPACITY[room_type],
+                has_attached_bathroom=room_type == 'single' or rng.random() < 0.4,
+                has_ac=rng.random() < (0.5 if room_type == 'single' else 0.15),
+                # A few rooms are closed for repairs
+                is_available=rng.random() >= 0.03,
+            ))
+        # Occupancy is filled in by occupy_beds()
+        self.rooms = chunked_create(Room, rooms)
+        return len(self.rooms)
+
+    def create_staff(self, count):
+        password = make_password(PASSWORDS['staff'])
+        self.staff = chunked_create(CustomUser, [
+            self.user(f'{USERNAME_PREFIX}staff{i:04d}', 'staff', password, is_staff=True)
+            for i in range(1, count + 1)
+        ])
+        return len(self.staff)
+
+    def user(self, username, user_type, password, **fields):
+        return CustomUser(
+            username=username,
+            email=f'{username}@bau.edu.bd',
+            first_name=self.rng.choice(FIRST_NAMES),
+            last_name=self.rng.choice(LAST_NAMES),
+            user_type=user_type,
+            password=password,
+            **fields,
+        )
+
+    def create_students(self, count):
+        rng = self.rng
+        password = make_password(PASSWORDS['student'])
+        users = chunked_create(CustomUser, [
+            self.user(f'{USERNAME_PREFIX}student{i:06d}', 'student', password) for i in range(1, count + 1)
+        ])
+        levels = weighted(rng, ACADEMIC_LEVELS, count)
+        profiles = []
+        for i, (user, level) in enumerate(zip(users, levels), start=1):
+            faculty = rng.choice(list(FACULTIES))
+            department = rng.choice(FACULTIES[faculty])
+            year = rng.randint(2019, self.now.year)
+            profiles.append(StudentProfile(
+                user=user,
+                student_id=f'BAU-{department[:3].upper()}-{year}-{i:06d}',
+                department=department,
+                faculty=faculty,
+                academic_level=level,
+                academic_year=year,
+                semester=rng.randint(1, 8),
+                emergency_contact=f'+880-17{rng.randint(0, 99999999):08d}',
+                emergency_contact_name=f'{rng.choice(FIRST_NAMES)} {user.last_name}',
+                date_of_enrollment=date(year, rng.choice((1, 7)), 1),
+            ))
+        # is_allocated is set by occupy_beds()
+        self.students = chunked_create(StudentProfile, profiles)
+        return len(self.students)
+
+    def occupy_beds(self, applications):
+        """
+        Give OCCUPANCY of the beds in available rooms to random students,
+        some through an approved application (at most ``applications``) and
+        the rest through a direct allocation, then write the rooms'
+        occupancy and is_allocated.
+        """
+        rng = self.rng
+        beds = [room for room in self.rooms if room.is_available for _ in range(room.capacity)]
+        rng.shuffle(beds)
+        taken = min(int(len(beds) * OCCUPANCY), len(self.students))
+        holders = rng.sample(self.students, taken)
+        self.holders = dict(zip((student.pk for student in holders), beds))
+        approved = min(int(taken * APPROVED_SHARE), applications)
+        self.approved = [
+            RoomApplication(
+                student=student, room=room, status='approved', priority_score=0,
+                reviewed_by=rng.choice(self.staff), reviewed_date=self.now,
+            )
+            for student, room in zip(holders[:approved], beds[:approved])
+        ]
+        allocations = chunked_create(RoomAllocation, [
+            RoomAllocation(student=student, room=room, allocated_by=rng.choice(self.staff))
+            for student, room in zip(holders[approved:], beds[approved:taken])
+        ])
+        for allocation in allocations:
+            allocation.allocated_date = allocation.created_at = self.past()
+        RoomAllocation.objects.bulk_update(allocations, ['allocated_date', 'created_at'], batch_size=BATCH_SIZE)
+        for room in beds[:taken]:
+            room.current_occupancy += 1
+        full = [room for room in self.rooms if room.current_occupancy]
+        Room.objects.bulk_update(full, ['current_occupancy'], batch_size=BATCH_SIZE)
+        for student in holders:
+            student.is_allocated = True
+        StudentProfile.objects.bulk_update(holders, ['is_allocated'], batch_size=BATCH_SIZE)
+        return taken
+
+    def create_applications(self, count):
+        """The approved applications of occupy_beds() plus pending and closed ones from other students."""
+        rng = self.rng
+        approved = self.approved
+        wanted = count - len(approved)
+        applicants = [student for student in self.students if student.pk not in self.holders]
+        statuses = weighted(rng, APPLICATION_STATUSES, wanted)
+        policy = get_policy()
+        scores = policy.score_batch({
+            name: [getattr(student, name) for student in applicants] for name in policy.fields
+        }) if applicants else []
+        pairs = {(application.student_id, application.room_id) for application in approved}
+        applications = list(approved)
+        # Bounded: there may be fewer free (student, room) pairs than asked for
+        for _ in range(wanted * 3 if applicants and self.rooms else 0):
+            if len(applications) == count:
+                break
+            index = rng.randrange(len(applicants))
+            student, room = applicants[index], rng.choice(self.rooms)
+            if (student.pk, room.pk) in pairs:
+                continue
+            pairs.add((student.pk, room.pk))
+            status = statuses[len(applications) - len(approved)]
+            applications.append(RoomApplication(
+                student=student, room=room, status=status, priority_score=scores[index],
+                preferences=rng.choice(['', '', 'Prefer a quiet floor', 'Need a lower floor', 'Prefer AC']),
+                reviewed_by=None if status == 'pending' else rng.choice(self.staff),
+                reviewed_date=None if status == 'pending' else self.now,
+            ))
+        applications = chunked_create(RoomApplication, applications)
+        for application in applications:
+            application.application_date = application.created_at = self.past()
+            if application.reviewed_by_id:
+                application.reviewed_date = self.later(application.created_at, 14)
+        RoomApplication.objects.bulk_update(
+            applications, ['application_date', 'created_at', 'reviewed_date'], batch_size=BATCH_SIZE
+        )
+        return len(applications)
+
+    def create_complaints(self, count):
+        rng = self.rng
+        if not count or not self.students:
+            return 0
+        room_of = {student.user_id: room for student, room in self.student_rooms()}
+        signatures = {}
+        complaints = []
+        statuses = weighted(rng, COMPLAINT_STATUSES, count)
+        priorities = weighted(rng, COMPLAINT_PRIORITIES, count)
+        for status, priority in zip(statuses, priorities):
+            user_id = rng.choice(self.students).user_id
+            category = rng.choice(list(COMPLAINT_TEXT))
+            subject, description = rng.choice(COMPLAINT_TEXT[category])
+            room = room_of.get(user_id)
+            location = f'Block {room.block}' if room and rng.random() < 0.7 else rng.choice(COMMON_AREAS)
+            assigned = status != 'submitted' or rng.random() < 0.4
+            complaint = Complaint(
+                submitted_by_id=user_id, category=category, priority=priority,
+                subject=subject, description=description, location=location, status=status,
+                assigned_to=rng.choice(self.staff) if assigned else None,
+                assigned_date=self.now if assigned else None,
+                resolved_date=self.now if status in ('resolved', 'closed') else None,
+                resolution_notes='Fixed by the maintenance team.' if status in ('resolved', 'closed') else '',
+            )
+            # Recomputed from the spread created_at once the rows exist
+            complaint.sla_due_at = complaint.compute_sla_due_at()
+            # The texts come from a small pool: sign each combination once
+            key = (subject, location, description)
+            if key not in signatures:
+                signatures[key] = text_signature(complaint)
+            complaint.text_signature = signatures[key]
+            complaints.append(complaint)
+        complaints = chunked_create(Complaint, complaints)
+        for complaint in complaints:
+            complaint.created_at = self.past()
+            if complaint.assigned_date:
+                complaint.assigned_date = self.later(complaint.created_at, 2)
+            if complaint.resolved_date:
+                complaint.resolved_date = self.later(complaint.assigned_date or complaint.created_at, 10)
+            complaint.sla_due_at = complaint.compute_sla_due_at()
+        Complaint.objects.bulk_update(
+            complaints, ['created_at', 'assigned_date', 'resolved_date', 'sla_due_at'], batch_size=BATCH_SIZE
+        )
+        keys = {key: band_keys(signature) for key, signature in signatures.items()}
+        # 2 * BANDS buckets per complaint: skip building model instances for them
+        quote = connection.ops.quote_name
+        opts = ComplaintTextBucket._meta
+        insert = 'INSERT INTO {} ({}, {}) VALUES (%s, %s)'.format(
+            quote(opts.db_table), quote(opts.get_field('complaint').column), quote(opts.get_field('key').column)
+        )
+        rows = (
+            (complaint.pk, key)
+            for complaint in complaints
+            for key in keys[(complaint.subject, complaint.location, complaint.description)]
+        )
+        with connection.cursor() as cursor:
+            for chunk in batched(rows, BATCH_SIZE * 10):
+                cursor.executemany(insert, chunk)
+        return len(complaints)
+
+    def student_rooms(self):
+        by_pk = {student.pk: student for student in self.students}
+        return [(by_pk[pk], room) for pk, room in self.holders.items()]
+
+    def create_notices(self, count):
+        rng = self.rng
+        if not count:
+            return 0
+        notices = []
+        categories = weighted(rng, NOTICE_CATEGORIES, count)
+        priorities = weighted(rng, NOTICE_PRIORITIES, count)
+        for category, priority in zip(categories, priorities):
+            title, content = rng.choice(NOTICE_TITLES)
+            published = rng.random() < 0.9
+            notice = Notice(
+                title=title, content=content, category=category, priority=priority,
+                created_by=rng.choice(self.staff), is_published=published,
+                published_at=self.now if published else None,
+            )
+            # One in ten goes to a block or a department
+            if rng.random() < 0.1:
+                notice.target_all_students = False
+                if self.rooms and rng.random() < 0.5:
+                    notice.target_block = rng.choice(self.rooms).block
+                else:
+                    notice.target_department = rng.choice(rng.choice(list(FACULTIES.values())))
+            notices.append(notice)
+        notices = chunked_create(Notice, notices)
+        for notice in notices:
+            notice.created_at = self.past()
+            if notice.published_at:
+                notice.published_at = notice.created_at
+        Notice.objects.bulk_update(notices, ['created_at', 'published_at'], batch_size=BATCH_SIZE)
+        for notice in notices:
+            if notice.is_targeted and notice.is_published:
+                NoticeRecipient.objects.materialize(notice)
+        return len(notices)
@@ -1,3 +1,1469 @@
-from django.test import TestCase
+import asyncio
+import os
+import tempfile
+from collections import Counter
+from datetime import timedelta
+from io import StringIO
+from unittest import mock
 
-# Create your tests here.
+from django.contrib import admin
+from django.contrib.admin.models import LogEntry
+from django.core.cache import cache, caches
+from django.core.management import call_command
+from django.db import connection
+from django.db.models import F
+from django.test import SimpleTestCase, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from . import allocation, assignment, auto_allocation, duplicates, live, provisioning, scoring, search, stats
+from .facets import facet_counts
+from .notices import get_notice_board, mark_all_read, mark_read, next_boundary, unread_count, user_notice_board
+from .search import search_rooms
+from .pagination import EstimatedCountPaginator
+from .views import RoomEventsView
+from .models import AllocationError, Complaint, ComplaintRoute, Notice, NoticeReadState, NoticeRecipient, CustomUser, HostelStats, Room, RoomAllocation, RoomApplication, StudentProfile
+
+
+def make_student(username):
+    """Create a student user; the post_save signal creates the profile."""
+    user = CustomUser.objects.create_user(username=username, user_type='student')
+    return user.student_profile
+
+
+def worker_cache():
+    """
+    The cache client a separate worker process would have: its own
+    connection and, with a process-local backend, its own store.
+    """
+    with mock.patch.dict('django.core.cache.backends.locmem._caches', clear=True):
+        return caches.create_connection('default')
+
+
+def app_queries(queries):
+    """Captured queries, without the cache backend's own (and its savepoints)."""
+    return [
+        query for query in queries
+        if 'hostel_cache' not in query['sql'] and 'SAVEPOINT' not in query['sql']
+    ]
+
+
+def make_room(room_number, capacity=1, **kwargs):
+    kwargs.setdefault('block', 'A')
+    kwargs.setdefault('floor', 1)
+    kwargs.setdefault('room_type', 'single' if capacity == 1 else 'double')
+    return Room.objects.create(room_number=room_number, capacity=capacity, **kwargs)
+
+
+class BedClaimTests(TestCase):
+
+    def setUp(self):
+        self.staff = CustomUser.objects.create_user(username='staff', user_type='staff')
+        self.room = make_room('101', capacity=1)
+
+    def test_claim_bed_stops_at_capacity(self):
+        self.assertTrue(Room.objects.claim_bed(self.room.pk))
+        self.assertFalse(Room.objects.claim_bed(self.room.pk))
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 1)
+
+    def test_release_bed_never_goes_negative(self):
+        self.assertFalse(Room.objects.release_bed(self.room.pk))
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 0)
+
+    def test_approving_application_claims_bed_and_allocates_student(self):
+        student = make_student('s1')
+        application = RoomApplication.objects.create(student=student, room=self.room)
+        application = RoomApplication.objects.get(pk=application.pk)
+        application.status = 'approved'
+        application.save()
+
+        self.room.refresh_from_db()
+        student.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 1)
+        self.assertTrue(student.is_allocated)
+
+        application.status = 'rejected'
+        application.save()
+        self.room.refresh_from_db()
+        student.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 0)
+        self.assertFalse(student.is_allocated)
+
+    def test_approving_into_full_room_fails_cleanly(self):
+        first = RoomApplication.objects.create(student=make_student('s1'), room=self.room)
+        second = RoomApplication.objects.create(student=make_student('s2'), room=self.room)
+        first.status = 'approved'
+        first.save()
+
+        second.status = 'approved'
+        with self.assertRaises(AllocationError):
+            second.save()
+        self.assertEqual(RoomApplication.objects.get(pk=second.pk).status, 'pending')
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 1)
+
+    def test_stale_copy_cannot_approve_twice(self):
+        self.room.capacity = 2
+        self.room.save()
+        application = RoomApplication.objects.create(student=make_student('s1'), room=self.room)
+        copy_a = RoomApplication.objects.get(pk=application.pk)
+        copy_b = RoomApplication.objects.get(pk=application.pk)
+        copy_a.status = 'approved'
+        copy_a.save()
+
+        copy_b.status = 'approved'
+        with self.assertRaises(AllocationError):
+            copy_b.save()
+        self.room.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 1)
+
+    def test_approval_keeps_concurrent_edits_to_other_fields(self):
+        application = RoomApplication.objects.create(student=make_student('s1'), room=self.room)
+        notes = RoomApplication.objects.get(pk=application.pk)
+        approval = RoomApplication.objects.get(pk=application.pk)
+        notes.admin_notes = 'Needs a ground floor room'
+        notes.save()
+
+        approval.status = 'approved'
+        approval.save()
+        application.refresh_from_db()
+        self.assertEqual((application.status, application.admin_notes), ('approved', 'Needs a ground floor room'))
+
+    def test_allocation_lifecycle_updates_occupancy(self):
+        student = make_student('s1')
+        allocation = RoomAllocation.objects.create(student=student, room=self.room, allocated_by=self.staff)
+        with self.assertRaises(AllocationError):
+            RoomAllocation.objects.create(student=make_student('s2'), room=self.room, allocated_by=self.staff)
+
+        allocation.is_active = False
+        allocation.save()
+        self.room.refresh_from_db()
+        student.refresh_from_db()
+        self.assertEqual(self.room.current_occupancy, 0)
+        self.assertFalse(student.is_allocated)
+
+
+class BulkDecisionTests(TestCase):
+
+    def setUp(self):
+        self.double = make_room('201', capacity=2)
+        self.single = make_room('202', capacity=1)
+
+    def test_approve_respects_priority_capacity_and_one_bed_per_student(self):
+        students = [make_student(f's{i}') for i in range(4)]
+        low = RoomApplication.objects.create(student=students[0], room=self.double, priority_score=10)
+        high = RoomApplication.objects.create(student=students[1], room=self.double, priority_score=90)
+        mid = RoomApplication.objects.create(student=students[2], room=self.double, priority_score=50)
+        single = RoomApplication.objects.create(student=students[3], room=self.single, priority_score=70)
+        duplicate = RoomApplication.objects.create(student=students[3], room=self.double, priority_score=60)
+
+        result = allocation.approve_applications(RoomApplication.objects.all())
+
+        self.assertEqual(result.updated, [high.pk, single.pk, mid.pk])
+        self.assertEqual(result.already_allocated, [duplicate.pk])
+        self.assertEqual(result.room_full, [low.pk])
+        self.double.refresh_from_db()
+        self.single.refresh_from_db()
+        self.assertEqual(self.double.current_occupancy, 2)
+        self.assertEqual(self.single.current_occupancy, 1)
+        self.assertEqual(
+            StudentProfile.objects.filter(is_allocated=True).count(), 3
+        )
+
+    def test_approve_runs_a_constant_number_of_queries(self):
+        rooms = [make_room(f'3{i:02d}', capacity=2) for i in range(10)]
+        for i in range(20):
+            RoomApplication.objects.create(student=make_student(f's{i}'), room=rooms[i % 10])
+
+        # Reads of applications, rooms and students, one UPDATE each for
+        # applications, rooms and students, counter upkeep, the check for
+        # targeted notices and savepoints; none of it grows with the number
+        # of applications
+        with self.assertNumQueries(15):
+            result = allocation.approve_applications(RoomApplication.objects.all())
+        self.assertEqual(len(result.updated), 20)
+
+    def test_reject_releases_beds_of_approved_applications(self):
+        student = make_student('s1')
+        application = RoomApplication.objects.create(student=student, room=self.double)
+        allocation.approve_applications(RoomApplication.objects.all())
+
+        result = allocation.reject_applications(RoomApplication.objects.all())
+
+        self.assertEqual(result.updated, [application.pk])
+        self.double.refresh_from_db()
+        student.refresh_from_db()
+        self.assertEqual(self.double.current_occupancy, 0)
+        self.assertFalse(student.is_allocated)
+
+
+class AutoAllocationTests(TestCase):
+
+    def setUp(self):
+        self.room_a = make_room('401', capacity=1)
+        self.room_b = make_room('402', capacity=1)
+
+    def test_matching_moves_placed_student_to_fit_another(self):
+        flexible = make_student('flexible')
+        picky = make_student('picky')
+        # The higher-priority student applied to both rooms, A first
+        RoomApplication.objects.create(student=flexible, room=self.room_a, priority_score=90)
+        RoomApplication.objects.create(student=flexible, room=self.room_b, priority_score=90)
+        RoomApplication.objects.create(student=picky, room=self.room_a, priority_score=50)
+
+        greedy = auto_allocation.auto_allocate(strategy='greedy', dry_run=True)
+        self.assertEqual(greedy.placed, 1)
+
+        plan = auto_allocation.auto_allocate(strategy='matching')
+        self.assertEqual(plan.placed, 2)
+        self.assertTrue(RoomApplication.objects.get(student=picky).status == 'approved')
+        self.assertEqual(
+            RoomApplication.objects.get(student=flexible, status='approved').room, self.room_b
+        )
+        self.assertEqual(StudentProfile.objects.filter(is_allocated=True).count(), 2)
+
+    def test_dry_run_writes_nothing(self):
+        RoomApplication.objects.create(student=make_student('s1'), room=self.room_a)
+
+        plan = auto_allocation.auto_allocate(dry_run=True)
+
+        self.assertEqual(plan.placed, 1)
+        self.assertFalse(plan.committed)
+        self.assertFalse(RoomApplication.objects.filter(status='approved').exists())
+        self.room_a.refresh_from_db()
+        self.assertEqual(self.room_a.current_occupancy, 0)
+
+
+class ScoringTests(TestCase):
+
+    def test_default_policy_matches_level_and_year_rules(self):
+        policy = scoring.LevelAndYearPolicy()
+        scores = policy.score_batch({
+            'academic_level': ['PhD', 'Postgraduate', 'Graduate', 'Undergraduate'],
+            'academic_year': [2022, 2021, 2050, 2010],
+        })
+        self.assertEqual(scores, [82, 71, 80, 40])
+
+    def test_policies_must_implement_score_batch(self):
+        class Incomplete(scoring.ScoringPolicy):
+            fields = ('academic_year',)
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    def test_rescore_updates_only_changed_pending_applications(self):
+        room = make_room('501', capacity=2)
+        phd = make_student('phd')
+        StudentProfile.objects.filter(pk=phd.pk).update(academic_level='PhD', academic_year=2024)
+        pending = RoomApplication.objects.create(student=phd, room=room, priority_score=0)
+        settled = RoomApplication.objects.create(
+            student=make_student('s2'), room=make_room('502'), priority_score=0, status='rejected'
+        )
+
+        self.assertEqual(scoring.rescore_applications(), 1)
+        self.assertEqual(scoring.rescore_applications(), 0)
+        pending.refresh_from_db()
+        settled.refresh_from_db()
+        self.assertEqual(pending.priority_score, 84)
+        self.assertEqual(settled.priority_score, 0)
+
+    def test_profile_edit_refreshes_pending_score(self):
+        student = make_student('s1')
+        application = RoomApplication.objects.create(student=student, room=make_room('503'))
+        student.academic_level = 'Postgraduate'
+        student.academic_year = 2025
+        student.save()
+        application.refresh_from_db()
+        self.assertEqual(application.priority_score, 75)
+
+
+class DashboardStatsTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.staff = CustomUser.objects.create_user(username='staff', user_type='staff')
+        make_room('601', capacity=2, current_occupancy=1)
+        make_room('602', capacity=1, current_occupancy=1)
+        self.client.force_login(self.staff)
+
+    def test_staff_dashboard_numbers(self):
+        response = self.client.get(reverse('hostel_management:dashboard'))
+        self.assertEqual(response.context['total_rooms'], 2)
+        self.assertEqual(response.context['available_rooms'], 1)
+        self.assertEqual(response.context['total_capacity'], 3)
+        self.assertEqual(response.context['total_occupied'], 2)
+        self.assertEqual(response.context['occupancy_rate'], 66.7)
+
+    def test_stats_are_cached_until_something_changes(self):
+        url = reverse('hostel_management:dashboard')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertFalse([q for q in queries if 'hostel_management_room' in q['sql']])
+        self.assertEqual(response.context['total_students'], 0)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            make_student('s1')
+        response = self.client.get(url)
+        self.assertEqual(response.context['total_students'], 1)
+
+    def test_changes_reach_every_worker(self):
+        first, second = worker_cache(), worker_cache()
+        with mock.patch('hostel_management.stats.cache', first):
+            self.assertEqual(stats.get_dashboard_stats('staff')['total_rooms'], 2)
+        with mock.patch('hostel_management.stats.cache', second), self.captureOnCommitCallbacks(execute=True):
+            make_room('603')
+        with mock.patch('hostel_management.stats.cache', first):
+            self.assertEqual(stats.get_dashboard_stats('staff')['total_rooms'], 3)
+
+
+class HostelStatsTests(TestCase):
+
+    def setUp(self):
+        self.staff = CustomUser.objects.create_user(username='staff', user_type='staff')
+
+    def snapshot(self):
+        # Incremental updates leave emptied scopes behind as all-zero rows
+        rows = HostelStats.objects.order_by('scope', 'key').values_list(
+            'scope', 'key', 'total_rooms', 'available_rooms', 'total_capacity',
+            'total_occupied', 'pending_applications', 'total_students',
+            'allocated_students', 'open_complaints',
+        )
+        return [row for row in rows if any(row[2:])]
+
+    def test_incremental_counters_match_recompute(self):
+        rooms = [make_room('701', capacity=1), make_room('702', capacity=2, block='B')]
+        students = [make_student(f's{i}') for i in range(4)]
+        applications = [
+            RoomApplication.objects.create(student=student, room=rooms[i % 2], priority_score=i)
+            for i, student in enumerate(students)
+        ]
+        allocation.approve_applications(RoomApplication.objects.all(), self.staff)
+        allocation.reject_applications(RoomApplication.objects.filter(pk=applications[3].pk))
+        applications[0].refresh_from_db()
+        applications[0].status = 'withdrawn'
+        applications[0].save()
+        rooms[0].delete()
+        complaint = Complaint.objects.create(
+            submitted_by=students[1].user, subject='Leak', description='Water',
+            category='maintenance',
+        )
+        complaint.status = 'resolved'
+        complaint.save()
+        Complaint.objects.create(
+            submitted_by=students[2].user, subject='Fan', description='Broken',
+            category='facilities',
+        )
+
+        incremental = self.snapshot()
+        HostelStats.objects.recompute()
+        self.assertEqual(incremental, self.snapshot())
+        self.assertEqual(HostelStats.objects.get_global().open_complaints, 1)
+
+    def test_counters_are_built_before_the_first_delta(self):
+        # Rows written before the counters existed (e.g. before migration 0016)
+        HostelStats.objects.all().delete()
+        Room.objects.bulk_create([
+            Room(room_number=f'80{i}', block='A', floor=1, room_type='single', capacity=1) for i in range(5)
+        ])
+        self.assertFalse(HostelStats.objects.exists())
+        room = Room.objects.get(room_number='800')
+        room.capacity = 2
+        room.save()
+        self.assertEqual(HostelStats.objects.get_global().total_capacity, 6)
+        self.assertEqual(HostelStats.objects.get_global().total_rooms, 5)
+
+        HostelStats.objects.all().delete()
+        room.delete()
+        self.assertEqual(HostelStats.objects.get_global().total_rooms, 4)
+        self.assertEqual(HostelStats.objects.get(scope='block', key='A').total_capacity, 4)
+
+
+class QueryPlanTests(TestCase):
+
+    def test_hot_queries_use_indexes(self):
+        out = StringIO()
+        call_command('explain_hot_queries', '--fail-on-scan', stdout=out)
+        self.assertIn('No full table scans.', out.getvalue())
+
+
+class KeysetPaginationTests(TestCase):
+
+    def setUp(self):
+        self.student = make_student('reader')
+        self.client.force_login(self.student.user)
+        for block in 'AB':
+            for floor in (1, 2):
+                for number in range(7):
+                    make_room(f'{block}-{floor}{number:02d}', block=block, floor=floor)
+        self.url = reverse('hostel_management:room_list')
+
+    def test_walks_every_room_forwards_and_back(self):
+        expected = list(Room.objects.order_by('block', 'floor', 'room_number', 'pk'))
+        pages, params = [], {}
+        while True:
+            response = self.client.get(self.url, params)
+            page = response.context['page_obj']
+            pages.append(list(page))
+            if not page.has_next():
+                break
+            params = {'cursor': page.next_cursor}
+        self.assertEqual([room for rooms in pages for room in rooms], expected)
+        self.assertEqual(len(pages), 3)
+        self.assertEqual(response.context['paginator'].total, 28)
+
+        response = self.client.get(self.url, {'cursor': page.previous_cursor})
+        self.assertEqual(list(response.context['page_obj']), pages[1])
+
+    def test_deep_pages_do_not_count_or_offset(self):
+        response = self.client.get(self.url)
+        cursor = response.context['page_obj'].next_cursor
+        with CaptureQueriesContext(connection) as queries:
+            self.client.get(self.url, {'cursor': cursor})
+        room_queries = [q['sql'] for q in queries if 'FROM "hostel_management_room"' in q['sql']]
+        self.assertFalse([sql for sql in room_queries if 'OFFSET' in sql])
+
+    def test_tampered_cursor_is_404(self):
+        response = self.client.get(self.url, {'cursor': 'not-a-cursor'})
+        self.assertEqual(response.status_code, 404)
+
+
+class RoomSearchTests(TestCase):
+
+    def setUp(self):
+        self.student = make_student('searcher')
+        self.client.force_login(self.student.user)
+        make_room('A-101', block='A')
+        make_room('A-102', block='A', is_available=False)
+        make_room('B-101', block='B')
+        self.renamed = make_room('C-201', block='C')
+
+    def search(self, text):
+        return sorted(search_rooms(Room.objects.all(), text).values_list('room_number', flat=True))
+
+    def test_prefix_matches_room_number_or_block(self):
+        self.assertEqual(self.search('A-10'), ['A-101', 'A-102'])
+        self.assertEqual(self.search('101'), ['A-101', 'B-101'])
+        self.assertEqual(self.search('b'), ['B-101'])
+        self.assertEqual(self.search('xyz'), [])
+
+    def test_index_follows_saves_updates_and_deletes(self):
+        self.renamed.room_number = 'C-301'
+        self.renamed.save()
+        Room.objects.filter(room_number='B-101').update(room_number='B-501')
+        Room.objects.filter(room_number='A-101').delete()
+        self.assertEqual(self.search('301'), ['C-301'])
+        self.assertEqual(self.search('501'), ['B-501'])
+        self.assertEqual(self.search('101'), [])
+
+    def test_autocomplete_lists_available_rooms(self):
+        response = self.client.get(reverse('hostel_management:room_autocomplete'), {'q': 'a-1'})
+        results = response.json()['results']
+        self.assertEqual([room['room_number'] for room in results], ['A-101'])
+        self.assertEqual(results[0]['available_beds'], 1)
+
+
+class RoomFacetTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        make_room('A-101', block='A', floor=1, has_ac=True)
+        make_room('A-201', block='A', floor=2)
+        make_room('A-202', block='A', floor=2, current_occupancy=1)  # full
+        make_room('B-101', block='B', floor=1, capacity=2, has_ac=True)
+
+    def counts(self, facets):
+        return {
+            facet['name']: {option['value']: option['count'] for option in facet['options']}
+            for facet in facets
+        }
+
+    def test_counts_rooms_with_free_beds_per_facet(self):
+        with CaptureQueriesContext(connection) as queries:
+            counts = self.counts(facet_counts())
+        self.assertEqual(len(app_queries(queries)), 1)
+        self.assertEqual(counts['block'], {'A': 2, 'B': 1})
+        self.assertEqual(counts['floor'], {1: 2, 2: 1})
+        self.assertEqual(counts['has_ac'], {False: 1, True: 2})
+
+    def test_each_facet_ignores_its_own_filter(self):
+        counts = self.counts(facet_counts(filters={'block': 'A', 'has_ac': True}))
+        self.assertEqual(counts['block'], {'A': 1, 'B': 1})
+        self.assertEqual(counts['has_ac'], {False: 1, True: 1})
+        self.assertEqual(counts['floor'], {1: 1})
+
+    def test_grouped_rows_are_cached_per_search(self):
+        facet_counts('A')
+        with CaptureQueriesContext(connection) as queries:
+            counts = self.counts(facet_counts('A', {'floor': 2}))
+        self.assertEqual(app_queries(queries), [])
+        self.assertEqual(counts['block'], {'A': 1})
+
+
+class RoomApiTests(TestCase):
+
+    def setUp(self):
+        self.room = make_room('A-101', capacity=2)
+        make_room('A-102', is_available=False)
+        self.url = reverse('hostel_management:api_room_list')
+        self.client.force_login(CustomUser.objects.create_user(username='student', user_type='student'))
+
+    def test_login_required(self):
+        self.client.logout()
+        self.assertEqual(self.client.get(self.url).status_code, 401)
+        response = self.client.get(reverse('hostel_management:api_room_detail', args=[self.room.pk]))
+        self.assertEqual(response.status_code, 401)
+
+    def test_list_and_detail(self):
+        response = self.client.get(self.url)
+        self.assertEqual([room['room_number'] for room in response.json()['results']], ['A-101'])
+        self.assertIn('private', response['Cache-Control'])
+        self.assertIn('ETag', response)
+
+        response = self.client.get(reverse('hostel_management:api_room_detail', args=[self.room.pk]))
+        self.assertEqual(response.json()['available_beds'], 2)
+        response = self.client.get(reverse('hostel_management:api_room_detail', args=[0]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get_skips_room_rows_until_a_room_changes(self):
+        etag = self.client.get(self.url)['ETag']
+        # Session and user, then the version key
+        with self.assertNumQueries(3):
+            response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+        self.assertIn('max-age', response['Cache-Control'])
+
+        Room.objects.claim_bed(self.room.pk)
+        response = self.client.get(self.url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['results'][0]['available_beds'], 1)
+
+
+class RecordingBroker(live.Broker):
+    active = True
+
+    def __init__(self):
+        self.events = []
+
+    def publish(self, event):
+        self.events.append(event)
+
+    async def listen(self):
+        return
+        yield
+
+
+class LiveEventTests(SimpleTestCase):
+
+    async def receive(self, queue):
+        return await asyncio.wait_for(queue.get(), 2)
+
+    async def test_hub_delivers_events_published_from_other_threads(self):
+        hub = live.Hub(live.LocalBroker())
+        async with hub.subscribe() as first, hub.subscribe() as second:
+            await asyncio.sleep(0)  # let the pump start listening
+            await asyncio.to_thread(hub.publish, {'type': 'room', 'id': 1})
+            self.assertEqual(await self.receive(first), {'type': 'room', 'id': 1})
+            self.assertEqual(await self.receive(second), {'type': 'room', 'id': 1})
+        self.assertFalse(hub.broker.active)
+
+    async def test_file_broker_shares_events_between_hubs(self):
+        with tempfile.NamedTemporaryFile() as spool:
+            publisher = live.Hub(live.FileBroker(spool.name, poll_interval=0.01))
+            subscriber = live.Hub(live.FileBroker(spool.name, poll_interval=0.01))
+            async with subscriber.subscribe() as queue:
+                await asyncio.sleep(0.05)
+                publisher.publish({'type': 'room', 'id': 2})
+                self.assertEqual(await self.receive(queue), {'type': 'room', 'id': 2})
+
+    async def test_file_broker_rotates_its_spool(self):
+        with tempfile.TemporaryDirectory() as directory:
+            path = f'{directory}/events'
+            publisher = live.FileBroker(path, poll_interval=0.01, max_bytes=100)
+            subscriber = live.Hub(live.FileBroker(path, poll_interval=0.01))
+            self.assertFalse(publisher.active)
+            async with subscriber.subscribe() as queue:
+                await asyncio.sleep(0.05)
+                self.assertTrue(publisher.active)
+                for i in range(20):
+                    publisher.publish({'type': 'room', 'id': i})
+                    self.assertEqual(await self.receive(queue), {'type': 'room', 'id': i})
+            self.assertLess(os.path.getsize(f'{path}.1'), 200)
+
+    def test_file_broker_follows_a_rotation_with_nothing_published_since(self):
+        with tempfile.TemporaryDirectory() as directory:
+            broker = live.FileBroker(f'{directory}/events')
+            spool = broker._open(at_end=True)
+            broker.publish({'type': 'room', 'id': 1})
+            os.replace(broker.path, f'{broker.path}.1')
+            spool, events = broker._read(spool)
+            self.assertEqual(events, [{'type': 'room', 'id': 1}])
+            broker.publish({'type': 'room', 'id': 2})
+            spool, events = broker._read(spool)
+            spool.close()
+            self.assertEqual(events, [{'type': 'room', 'id': 2}])
+
+    def test_brokers_must_implement_the_interface(self):
+        class Incomplete(live.Broker):
+            def publish(self, event):
+                pass
+
+        with self.assertRaises(TypeError):
+            Incomplete()
+
+    async def test_event_stream_format(self):
+        hub = live.Hub(live.LocalBroker())
+        original, live._hub = live._hub, hub
+        try:
+            stream = RoomEventsView().stream()
+            self.assertEqual(await anext(stream), 'retry: 5000\n\n')
+            next_chunk = asyncio.ensure_future(anext(stream))
+            await asyncio.sleep(0.01)
+            hub.publish({'type': 'room', 'id': 3})
+            chunk = await asyncio.wait_for(next_chunk, 2)
+            self.assertEqual(chunk, 'event: room\ndata: {"type": "room", "id": 3}\n\n')
+            await stream.aclose()
+            self.assertFalse(hub.subscribers)
+        finally:
+            live._hub = original
+
+
+class RoomEventPublishingTests(TestCase):
+
+    def setUp(self):
+        self.broker = RecordingBroker()
+        self.original, live._hub = live._hub, live.Hub(self.broker)
+        self.room = make_room('A-101', capacity=1)
+
+    def tearDown(self):
+        live._hub = self.original
+
+    def test_occupancy_changes_are_published_after_commit(self):
+        with self.captureOnCommitCallbacks() as callbacks:
+            Room.objects.claim_bed(self.room.pk)
+        self.assertEqual(self.broker.events, [])
+        for callback in callbacks:
+            callback()
+        self.assertEqual(self.broker.events, [{
+            'type': 'room', 'id': self.room.pk, 'current_occupancy': 1,
+            'capacity': 1, 'available_beds': 0, 'is_available': True,
+        }])
+
+    def test_events_endpoint_requires_login(self):
+        response = self.client.get(reverse('hostel_management:room_events'))
+        self.assertEqual(response.status_code, 401)
+
+    def test_no_event_stream_under_wsgi(self):
+        self.client.force_login(CustomUser.objects.create_user(username='student', user_type='student'))
+        response = self.client.get(reverse('hostel_management:room_list'))
+        self.assertNotContains(response, 'new EventSource(')
+        response = self.client.get(reverse('hostel_management:room_events'))
+        self.assertEqual(response.status_code, 204)
+
+    async def test_room_list_opens_the_stream_under_asgi(self):
+        user = await CustomUser.objects.acreate(username='student', user_type='student')
+        await self.async_client.aforce_login(user)
+        response = await self.async_client.get(reverse('hostel_management:room_list'))
+        self.assertContains(response, 'new EventSource(')
+
+
+class NoticeBoardTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.staff = CustomUser.objects.create_user(username='staff', user_type='staff')
+        self.now = timezone.now()
+        self.expiring = self.notice('Water cut', expires_at=self.now + timedelta(minutes=5))
+        self.notice('Welcome')
+        self.notice('Draft', is_published=False)
+        self.notice('Scheduled', published_at=self.now + timedelta(hours=2))
+
+    def notice(self, title, **kwargs):
+        kwargs.setdefault('is_published', True)
+        return Notice.objects.create(title=title, content='...', created_by=self.staff, **kwargs)
+
+    def titles(self):
+        return sorted(notice.title for notice in get_notice_board())
+
+    def test_board_is_cached_until_the_next_expiry(self):
+        self.assertEqual(self.titles(), ['Water cut', 'Welcome'])
+        with CaptureQueriesContext(connection) as queries:
+            board = get_notice_board()
+            self.assertEqual(board[0].created_by, self.staff)
+        self.assertEqual(app_queries(queries), [])
+        # ...and kept until the first notice expires (or one gets published)
+        self.assertEqual(next_boundary(timezone.now()), self.expiring.expires_at)
+        self.assertEqual(next_boundary(self.expiring.expires_at), self.now + timedelta(hours=2))
+
+    def test_saving_a_notice_refreshes_the_board(self):
+        self.titles()
+        with self.captureOnCommitCallbacks(execute=True):
+            self.notice('Fire drill')
+        self.assertEqual(self.titles(), ['Fire drill', 'Water cut', 'Welcome'])
+
+    def test_saving_a_notice_refreshes_the_board_in_every_worker(self):
+        first, second = worker_cache(), worker_cache()
+        with mock.patch('hostel_management.notices.cache', first):
+            self.titles()
+        with mock.patch('hostel_management.notices.cache', second), self.captureOnCommitCallbacks(execute=True):
+            self.notice('Fire drill')
+        with mock.patch('hostel_management.notices.cache', first):
+            self.assertEqual(self.titles(), ['Fire drill', 'Water cut', 'Welcome'])
+
+    def test_notice_list_hit_does_not_touch_notices(self):
+        self.client.force_login(self.staff)
+        url = reverse('hostel_management:notice_list')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertEqual(len(response.context['notices']), 2)
+        self.assertFalse([q for q in queries if '"hostel_management_notice"' in q['sql']])
+
+
+class NoticeReadTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.staff = CustomUser.objects.create_user(username='staff', user_type='staff')
+        self.student = CustomUser.objects.create_user(username='reader', user_type='student')
+        self.first = self.notice('Welcome')
+        self.second = self.notice('Water cut')
+
+    def notice(self, title, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notice.objects.create(
+                title=title, content='...', created_by=self.staff, is_published=True, **kwargs
+            )
+
+    def unread(self):
+        # Fresh user, as on the next request
+        return unread_count(CustomUser.objects.get(pk=self.student.pk))
+
+    def test_opening_notices_marks_them_read(self):
+        self.assertEqual(self.unread(), 2)
+        mark_read(self.student, self.first)
+        self.assertEqual(self.unread(), 1)
+        self.assertEqual(NoticeReadState.objects.get(user=self.student).read_ids, [self.first.pk])
+        # Reading the last one folds the exceptions into the mark
+        mark_read(self.student, self.second)
+        state = NoticeReadState.objects.get(user=self.student)
+        self.assertEqual((state.read_ids, self.unread()), ([], 0))
+        self.notice('Fire drill')
+        self.assertEqual(self.unread(), 1)
+
+    def test_mark_all_read_is_one_write(self):
+        with self.assertNumQueries(1):
+            mark_all_read(self.student)
+        self.assertEqual(self.unread(), 0)
+        # Publishing an old draft later still counts as new
+        draft = Notice.objects.create(title='Draft', content='...', created_by=self.staff)
+        with self.captureOnCommitCallbacks(execute=True):
+            draft.is_published = True
+            draft.save()
+        self.assertEqual(self.unread(), 1)
+
+    def test_badge_costs_one_lookup(self):
+        self.client.force_login(self.student)
+        url = reverse('hostel_management:notice_list')
+        self.client.get(url)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        self.assertContains(response, '<span class="badge bg-danger ms-1">2</span>', html=True)
+        self.assertEqual(len([q for q in queries if 'noticereadstate' in q['sql']]), 1)
+
+        self.client.post(reverse('hostel_management:notice_mark_all_read'))
+        response = self.client.get(reverse('hostel_management:notice_detail', args=[self.first.pk]))
+        self.assertEqual(str(response.context['unread_notice_count']), '0')
+
+
+class NoticeAudienceTests(TestCase):
+
+    def setUp(self):
+        cache.clear()
+        self.staff = CustomUser.objects.create_user(username='staff', user_type='staff')
+        self.alice = make_student('alice')
+        self.bob = make_student('bob')
+        StudentProfile.objects.filter(pk=self.alice.pk).update(faculty='Engineering')
+        self.room = make_room('A-201', capacity=2, block='A', floor=2)
+
+    def notice(self, **rules):
+        with self.captureOnCommitCallbacks(execute=True):
+            return Notice.objects.create(
+                title='Notice', content='...', created_by=self.staff, is_published=True,
+                target_all_students=False, **rules
+            )
+
+    def recipients(self, notice):
+        return set(NoticeRecipient.objects.filter(notice=notice).values_list('user__username', flat=True))
+
+    def test_recipients_follow_profiles_and_allocations(self):
+        faculty = self.notice(target_faculty='engineering')
+        floor = self.notice(target_block='a', target_floor=2)
+        self.assertEqual(self.recipients(faculty), {'alice'})
+        self.assertEqual(self.recipients(floor), set())
+
+        bob = StudentProfile.objects.get(pk=self.bob.pk)
+        bob.faculty = 'Engineering'
+        bob.save()
+        allocation = RoomAllocation.objects.create(student=bob, room=self.room, allocated_by=self.staff)
+        self.assertEqual(self.recipients(faculty), {'alice', 'bob'})
+        self.assertEqual(self.recipients(floor), {'bob'})
+
+        allocation.is_active = False
+        allocation.save()
+        self.assertEqual(self.recipients(floor), set())
+
+    def test_bulk_approvals_refresh_recipients(self):
+        notice = self.notice(target_allocation='allocated')
+        application = RoomApplication.objects.create(student=self.alice, room=self.room)
+        allocation.approve_applications(RoomApplication.objects.filter(pk=application.pk))
+        self.assertEqual(self.recipients(notice), {'alice'})
+        allocation.reject_applications(RoomApplication.objects.filter(pk=application.pk))
+        self.assertEqual(self.recipients(notice), set())
+
+    def test_students_only_see_notices_addressed_to_them(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            Notice.objects.create(title='Everyone', content='...', created_by=self.staff, is_published=True)
+        self.notice(target_faculty='Engineering')
+        bob = CustomUser.objects.get(username='bob')
+        alice = CustomUser.objects.get(username='alice')
+        get_notice_board()
+        with CaptureQueriesContext(connection) as queries:
+            self.assertEqual(len(user_notice_board(bob)), 1)
+        self.assertEqual(len(app_queries(queries)), 1)
+        self.assertEqual(len(user_notice_board(alice)), 2)
+        self.assertEqual(len(user_notice_board(self.staff)), 2)
+
+    def test_students_only_open_notices_on_their_board(self):
+        targeted = self.notice(target_faculty='Engineering')
+        draft = Notice.objects.create(title='Draft', content='...', created_by=self.staff, is_published=False)
+        scheduled = Notice.objects.create(
+            title='Later', content='...', created_by=self.staff, is_published=True,
+            published_at=timezone.now() + timedelta(days=1)
+        )
+        self.client.force_login(self.bob.user)
+        for notice in (targeted, draft, scheduled):
+            response = self.client.get(reverse('hostel_management:notice_detail', args=[notice.pk]))
+            self.assertEqual(response.status_code, 404)
+        self.client.force_login(self.alice.user)
+        self.assertEqual(self.client.get(reverse('hostel_management:notice_detail', args=[targeted.pk])).status_code, 200)
+        self.client.force_login(self.staff)
+        for notice in (targeted, draft, scheduled):
+            response = self.client.get(reverse('hostel_management:notice_detail', args=[notice.pk]))
+            self.assertEqual(response.status_code, 200)
+
+
+class ComplaintQueueTests(TestCase):
+
+    def setUp(self):
+        self.student = CustomUser.objects.create_user(username='student', user_type='student')
+        self.staff = CustomUser.objects.create_user(username='staff', user_type='staff')
+        self.other = CustomUser.objects.create_user(username='other', user_type='staff')
+
+    def complaint(self, subject, priority):
+        return Complaint.objects.create(
+            submitted_by=self.student, category='maintenance', priority=priority,
+            subject=subject, description='...'
+        )
+
+    def test_deadline_follows_priority(self):
+        complaint = self.complaint('Leak', 'low')
+        self.assertAlmostEqual(complaint.sla_due_at, complaint.created_at + timedelta(hours=168),
+                               delta=timedelta(seconds=1))
+        complaint.priority = 'urgent'
+        complaint.save(update_fields=['priority'])
+        complaint.refresh_from_db()
+        self.assertEqual(complaint.sla_due_at, complaint.created_at + timedelta(hours=4))
+
+    def test_claims_take_the_earliest_deadline_once(self):
+        self.complaint('Noisy fan', 'low')
+        self.complaint('Broken lock', 'urgent')
+        self.complaint('No water', 'high')
+
+        first = Complaint.objects.claim_next(self.staff)
+        second = Complaint.objects.claim_next(self.other)
+        self.assertEqual((first.subject, first.assigned_to, first.status), ('Broken lock', self.staff, 'in_progress'))
+        self.assertEqual(second.subject, 'No water')
+        self.assertEqual(Complaint.objects.claim_next(self.staff).subject, 'Noisy fan')
+        self.assertIsNone(Complaint.objects.claim_next(self.staff))
+        # Claiming keeps complaints open
+        self.assertEqual(HostelStats.objects.get_global().open_complaints, 3)
+
+    def test_queue_is_for_staff(self):
+        self.complaint('Leak', 'medium')
+        self.client.force_login(self.student)
+        self.assertRedirects(self.client.get(reverse('hostel_management:complaint_queue')),
+                             reverse('hostel_management:dashboard'))
+        self.client.force_login(self.staff)
+        response = self.client.get(reverse('hostel_management:complaint_queue'))
+        self.assertEqual([c.subject for c in response.context['complaints']], ['Leak'])
+        response = self.client.post(reverse('hostel_management:complaint_claim'))
+        self.assertEqual(Complaint.objects.get().assigned_to, self.staff)
+
+
+class ComplaintAssignmentTests(TestCase):
+
+    def setUp(self):
+        self.ann = CustomUser.objects.create_user(username='ann', user_type='staff')
+        self.ben = CustomUser.objects.create_user(username='ben', user_type='staff')
+        self.student = make_student('student')
+        RoomAllocation.objects.create(
+            student=self.student, room=make_room('B-101', block='B'), allocated_by=self.ann
+        )
+
+    def submit(self, category='maintenance'):
+        self.client.force_login(self.student.user)
+        self.client.post(reverse('hostel_management:complaint_create'), {
+            'category': category, 'priority': 'medium', 'subject': 'Leak', 'description': '...',
+            # File each one as new rather than joining the previous leak
+            'duplicate_of': '',
+        })
+        return Complaint.objects.latest('pk')
+
+    def test_new_complaints_go_to_the_least_loaded_staff_member(self):
+        self.assertEqual(self.submit().assigned_to, self.ann)
+        self.assertEqual(self.submit().assigned_to, self.ben)
+        complaint = self.submit()
+        self.assertEqual(complaint.assigned_to, self.ann)
+        complaint.status = 'resolved'
+        complaint.save()
+        self.assertEqual(self.submit().assigned_to, self.ann)
+
+        loads = dict(HostelStats.objects.filter(scope='staff').values_list('key', 'open_complaints'))
+        HostelStats.objects.recompute()
+        self.assertEqual(loads, dict(HostelStats.objects.filter(scope='staff').values_list('key', 'open_complaints')))
+
+    def test_routes_pick_eligible_staff(self):
+        ComplaintRoute.objects.create(staff=self.ann, category='security')
+        ComplaintRoute.objects.create(staff=self.ben, block='b')
+        self.assertEqual(self.submit('security').assigned_to, self.ann)
+        self.assertEqual(self.submit('security').assigned_to, self.ben)
+        self.assertEqual(self.submit('noise').assigned_to, self.ben)
+        ComplaintRoute.objects.filter(staff=self.ben).delete()
+        self.assertIsNone(self.submit('noise').assigned_to)
+
+    def test_assigned_complaints_can_be_claimed_from_the_queue(self):
+        complaint = self.submit()
+        self.client.force_login(self.ben)
+        self.assertFalse(self.client.get(reverse('hostel_management:complaint_queue')).context['complaints'])
+        self.client.post(reverse('hostel_management:complaint_claim'))
+        self.client.force_login(self.ann)
+        response = self.client.get(reverse('hostel_management:complaint_queue'))
+        self.assertEqual(list(response.context['complaints']), [complaint])
+        response = self.client.post(reverse('hostel_management:complaint_claim'))
+        self.assertRedirects(response, reverse('hostel_management:complaint_detail', args=[complaint.pk]))
+        complaint.refresh_from_db()
+        self.assertEqual((complaint.assigned_to, complaint.status), (self.ann, 'in_progress'))
+        self.assertEqual(HostelStats.objects.get(scope='staff', key=str(self.ann.pk)).open_complaints, 1)
+
+    def test_rebalance_spreads_the_backlog(self):
+        for i in range(4):
+            Complaint.objects.create(
+                submitted_by=self.student.user, category='other', subject=f'Backlog {i}',
+                description='...', assigned_to=self.ann if i < 3 else None,
+            )
+        plan = assignment.rebalance_complaints(dry_run=True)
+        self.assertEqual(len(plan.moves), 1)
+        self.assertEqual(Complaint.objects.filter(assigned_to__isnull=True).count(), 1)
+
+        assignment.rebalance_complaints(reassign_unstarted=True)
+        self.assertEqual(
+            sorted(Complaint.objects.values_list('assigned_to', flat=True)),
+            [self.ann.pk, self.ann.pk, self.ben.pk, self.ben.pk],
+        )
+        self.assertEqual(HostelStats.objects.get(scope='staff', key=str(self.ben.pk)).open_complaints, 2)
+
+
+class TextSearchTests(TestCase):
+
+    def setUp(self):
+        self.student = CustomUser.objects.create_user(username='student', user_type='student')
+        self.admin = CustomUser.objects.create_superuser(username='root', password='x')
+
+    def complaint(self, subject, description, submitted_by=None):
+        return Complaint.objects.create(
+            submitted_by=submitted_by or self.student, category='maintenance', priority='medium',
+            subject=subject, description=description
+        )
+
+    def test_stemmed_ranked_matches(self):
+        body = self.complaint('Broken window', 'The tap in the bathroom is leaking.')
+        subject = self.complaint('Leaking tap', 'Water everywhere.')
+        self.complaint('Noisy fan', 'Fan rattles at night.')
+        results = search.search_text(Complaint.objects.all(), 'leaks')
+        self.assertEqual(list(results), [subject, body])
+        self.assertEqual(list(search.search_text(Complaint.objects.all(), 'tap window')), [body])
+        Complaint.objects.filter(pk=body.pk).update(description='Cracked pane')
+        self.assertEqual(list(search.search_text(Complaint.objects.all(), 'leaking')), [subject])
+
+    def test_students_search_their_own_complaints(self):
+        mine = self.complaint('Leaking tap', '...')
+        self.complaint('Leaking roof', '...', submitted_by=self.admin)
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('hostel_management:complaint_list'), {'search': 'leak'})
+        self.assertEqual(list(response.context['complaints']), [mine])
+
+    def test_notice_board_search(self):
+        exams = Notice.objects.create(title='Exam schedule', content='Finals start Monday.',
+                                      created_by=self.admin, is_published=True)
+        Notice.objects.create(title='Water outage', content='No water on Monday.',
+                              created_by=self.admin, is_published=True)
+        Notice.objects.create(title='Draft exams', content='...', created_by=self.admin, is_published=False)
+        self.client.force_login(self.student)
+        response = self.client.get(reverse('hostel_management:notice_list'), {'search': 'exams'})
+        self.assertEqual(list(response.context['notices']), [exams])
+
+    def test_admin_changelist_ranks_matches(self):
+        body = self.complaint('Broken window', 'The tap is leaking.')
+        subject = self.complaint('Leaking tap', '...')
+        self.client.force_login(self.admin)
+        response = self.client.get(reverse('admin:hostel_management_complaint_changelist'), {'q': 'leak'})
+        self.assertEqual(list(response.context['cl'].result_list), [subject, body])
+        response = self.client.get(reverse('admin:hostel_management_complaint_changelist'), {'q': 'student'})
+        self.assertEqual(response.context['cl'].result_count, 2)
+
+
+class DuplicateComplaintTests(TestCase):
+
+    def setUp(self):
+        self.staff = CustomUser.objects.create_user(username='staff', user_type='staff')
+        self.student = CustomUser.objects.create_user(username='student', user_type='student')
+        self.original = Complaint.objects.create(
+            submitted_by=self.staff, category='facilities', subject='WiFi slow in Block A',
+            description='The wifi is very slow since morning.',
+        )
+        Complaint.objects.create(
+            submitted_by=self.staff, category='maintenance', subject='Broken door lock',
+            description='The lock of room 204 is broken.', location='Room 204',
+        )
+
+    def submit(self, **extra):
+        self.client.force_login(self.student)
+        return self.client.post(reverse('hostel_management:complaint_create'), {
+            'category': 'facilities', 'priority': 'medium', 'subject': 'Wifi is slow, Block A',
+            'description': 'Internet keeps dropping every few minutes.', **extra,
+        })
+
+    def test_similar_open_complaints_are_offered(self):
+        response = self.submit()
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['duplicates'], [self.original])
+        self.assertEqual(Complaint.objects.count(), 2)
+
+        self.original.status = 'resolved'
+        self.original.save()
+        self.assertRedirects(self.submit(), reverse('hostel_management:complaint_list'))
+
+    def test_joined_complaints_follow_the_original(self):
+        self.original.assigned_to = self.staff
+        self.original.save()
+        self.submit(duplicate_of=self.original.pk)
+        joined = Complaint.objects.latest('pk')
+        self.assertEqual((joined.duplicate_of, joined.assigned_to), (self.original, None))
+        self.assertNotIn(joined, Complaint.objects.queue())
+
+        self.original.status = 'resolved'
+        self.original.save()
+        joined.refresh_from_db()
+        self.assertEqual(joined.status, 'resolved')
+        self.assertEqual(HostelStats.objects.get_global().open_complaints, 1)
+
+    def test_index_follows_text_changes(self):
+        self.original.subject = 'Laundry machine broken'
+        self.original.description = 'Machine 3 does not spin.'
+        self.original.save()
+        probe = Complaint(category='facilities', subject='WiFi slow in Block A', location='', description='Wifi very slow.')
+        self.assertEqual(duplicates.find_duplicates(probe), [])
+        probe.subject = 'Laundry machine broken'
+        self.assertEqual(duplicates.find_duplicates(probe), [self.original])
+        probe.category = 'maintenance'
+        self.assertEqual(duplicates.find_duplicates(probe), [])
+
+    def test_private_categories_are_not_offered(self):
+        Complaint.objects.filter(pk=self.original.pk).update(category='security')
+        self.assertEqual(self.submit(category='security').status_code, 302)
+        self.assertIsNone(Complaint.objects.latest('pk').duplicate_of)
+
+    def test_admin_merges_duplicates(self):
+        later = Complaint.objects.create(
+            submitted_by=self.student, category='facilities', subject='Slow WiFi Block A',
+            description='...', assigned_to=self.staff,
+        )
+        admin = CustomUser.objects.create_superuser(username='root', password='x')
+        self.client.force_login(admin)
+        changelist = reverse('admin:hostel_management_complaint_changelist')
+        self.client.post(changelist, {
+            'action': 'merge_duplicates', '_selected_action': [self.original.pk, later.pk],
+        })
+        later.refresh_from_db()
+        self.assertEqual((later.duplicate_of, later.assigned_to), (self.original, None))
+        self.assertEqual(HostelStats.objects.get(scope='staff', key=str(self.staff.pk)).open_complaints, 0)
+        response = self.client.get(changelist, {'duplicates': 'grouped'})
+        self.assertEqual([(c, c.duplicate_count) for c in response.context['cl'].result_list], [(self.original, 1)])
+        response = self.client.get(reverse('admin:hostel_management_complaint_change', args=[self.original.pk]))
+        self.assertContains(response, 'Slow WiFi Block A')
+
+
+class AdminChangelistQueryTests(TestCase):
+    """Changelist pages cost the same number of queries however many rows they show."""
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(username='root', password='x')
+        self.client.force_login(self.admin)
+        self.rows = 0
+
+    def add_rows(self, count):
+        for _ in range(count):
+            self.rows += 1
+            student = make_student(f'student{self.rows}')
+            student.student_id = f'S{self.rows:04}'
+            student.save()
+            room = make_room(f'A-{self.rows:03}', capacity=2)
+            RoomApplication.objects.create(student=student, room=room, reviewed_by=self.admin)
+            RoomAllocation.objects.create(student=student, room=room, allocated_by=self.admin)
+            Complaint.objects.create(
+                submitted_by=student.user, assigned_to=self.admin, category='other',
+                subject=f'Complaint {self.rows}', description='...',
+            )
+
+    def queries(self, model):
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.get(reverse(f'admin:hostel_management_{model}_changelist'))
+        self.assertEqual(response.status_code, 200)
+        return len(context)
+
+    def test_query_count_is_flat(self):
+        models = ['studentprofile', 'roomapplication', 'roomallocation', 'complaint']
+        self.add_rows(2)
+        few = {model: self.queries(model) for model in models}
+        self.add_rows(10)
+        self.assertEqual({model: self.queries(model) for model in models}, few)
+        # Session, user, capped count, page, plus one per distinct-values filter
+        self.assertEqual(few, {'studentprofile': 7, 'roomapplication': 5, 'roomallocation': 5, 'complaint': 5})
+
+    def test_estimated_count_stops_at_cap(self):
+        self.add_rows(3)
+        paginator = EstimatedCountPaginator(Room.objects.order_by('pk'), 1)
+        paginator.cap = 2
+        self.assertEqual((paginator.count, paginator.num_pages), (2, 2))
+
+    def test_pages_past_the_cap_stay_reachable(self):
+        self.add_rows(4)
+        changelist = reverse('admin:hostel_management_roomapplication_changelist')
+        model_admin = admin.site._registry[RoomApplication]
+        with mock.patch.object(EstimatedCountPaginator, 'cap', 2), \
+                mock.patch.object(model_admin, 'list_per_page', 1):
+            response = self.client.get(changelist, {'p': 3})
+            self.assertEqual(response.status_code, 200)
+            cl = response.context['cl']
+            self.assertEqual((cl.page_num, len(cl.result_list), cl.paginator.num_pages), (3, 1, 4))
+            self.assertEqual(self.client.get(changelist, {'p': 4}).context['cl'].paginator.num_pages, 4)
+            self.assertRedirects(self.client.get(changelist, {'p': 5}), f'{changelist}?e=1')
+
+
+class AdminAutocompleteTests(TestCase):
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(username='root', password='x', user_type='admin')
+        self.client.force_login(self.admin)
+        self.ann = make_student('ann')
+        self.ann.user.first_name, self.ann.user.last_name = 'Ann', 'Rahman'
+        self.ann.user.save()
+        self.ann.student_id = 'BAU-2021-007'
+        self.ann.save()
+        self.free = make_room('A-101', capacity=2)
+        make_room('A-102', capacity=1, current_occupancy=1)
+
+    def autocomplete(self, model, field, term=''):
+        response = self.client.get(reverse('admin:autocomplete'), {
+            'app_label': 'hostel_management', 'model_name': model, 'field_name': field, 'term': term,
+        })
+        return [result['text'] for result in response.json()['results']]
+
+    def test_students_by_id_prefix_or_name(self):
+        make_student('bob')
+        self.assertEqual(self.autocomplete('roomallocation', 'student', 'bau-2021'), ['BAU-2021-007 - Ann Rahman'])
+        self.assertEqual(self.autocomplete('roomallocation', 'student', 'rahm'), ['BAU-2021-007 - Ann Rahman'])
+
+    def test_rooms_with_free_beds_only(self):
+        self.assertEqual(self.autocomplete('roomallocation', 'room', 'a-1'), [str(self.free)])
+
+    def test_staff_pickers_list_staff(self):
+        CustomUser.objects.create_user(username='sam', user_type='staff')
+        self.assertEqual(self.autocomplete('roomallocation', 'allocated_by'), ['root (System Admin)', 'sam (Hostel Staff)'])
+        self.assertIn('ann (Student)', self.autocomplete('studentprofile', 'user'))
+
+    def test_changelists_keep_their_own_search(self):
+        self.ann.user.email = 'ann@bau.edu'
+        self.ann.user.save()
+        response = self.client.get(reverse('admin:hostel_management_customuser_changelist'), {'q': 'ann@bau'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.ann.user])
+        response = self.client.get(reverse('admin:hostel_management_studentprofile_changelist'), {'q': '2021-007'})
+        self.assertEqual(list(response.context['cl'].result_list), [self.ann])
+
+    def test_add_form_cost_does_not_grow(self):
+        def queries():
+            with CaptureQueriesContext(connection) as context:
+                self.client.get(reverse('admin:hostel_management_roomallocation_add'))
+            return len(context)
+        queries()  # warm up the session
+        few = queries()
+        for i in range(10):
+            make_student(f'student{i}')
+            make_room(f'B-{i}')
+        self.assertEqual(queries(), few)
+
+
+class BulkEditTests(TestCase):
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(username='root', password='x', user_type='admin')
+        self.staff = CustomUser.objects.create_user(username='staff', user_type='staff')
+        self.client.force_login(self.admin)
+        self.client.get(reverse('admin:index'))
+
+    def post_edits(self, model, rows):
+        """Post ``rows`` ({pk: {field: value}}) the way the changelist does: edited rows only."""
+        data = {
+            'form-TOTAL_FORMS': len(rows), 'form-INITIAL_FORMS': len(rows),
+            'form-MIN_NUM_FORMS': 0, 'form-MAX_NUM_FORMS': 1000, '_save': 'Save',
+        }
+        for i, (pk, fields) in enumerate(rows.items()):
+            data[f'form-{i}-id'] = pk
+            data.update({f'form-{i}-{name}': value for name, value in fields.items()})
+        with CaptureQueriesContext(connection) as context:
+            response = self.client.post(reverse(f'admin:hostel_management_{model}_changelist'), data)
+        self.assertEqual(response.status_code, 302)
+        return len(context)
+
+    def test_complaint_edits_are_grouped(self):
+        student = CustomUser.objects.create_user(username='student', user_type='student')
+        complaints = [
+            Complaint.objects.create(submitted_by=student, category='other', subject=f'Issue {i}', description='...')
+            for i in range(20)
+        ]
+        queries = self.post_edits('complaint', {
+            complaint.pk: {'status': 'in_progress', 'assigned_to': self.staff.pk} for complaint in complaints
+        })
+        self.assertLess(queries, 20)
+        self.assertEqual(Complaint.objects.filter(status='in_progress', assigned_to=self.staff).count(), 20)
+        self.assertEqual(HostelStats.objects.get(scope='staff', key=str(self.staff.pk)).open_complaints, 20)
+        self.assertEqual(LogEntry.objects.count(), 20)
+
+    def test_closing_complaints_records_when(self):
+        student = CustomUser.objects.create_user(username='student', user_type='student')
+        first, second = [
+            Complaint.objects.create(submitted_by=student, category='other', subject=f'Issue {i}', description='...')
+            for i in range(2)
+        ]
+        self.post_edits('complaint', {
+            first.pk: {'status': 'resolved', 'assigned_to': ''},
+            second.pk: {'status': 'closed', 'assigned_to': ''},
+        })
+        self.assertTrue(all(Complaint.objects.values_list('resolved_date', flat=True)))
+        self.post_edits('complaint', {first.pk: {'status': 'in_progress', 'assigned_to': ''}})
+        first.refresh_from_db()
+        self.assertIsNone(first.resolved_date)
+        self.assertEqual(HostelStats.objects.get_global().open_complaints, 1)
+
+    def test_application_edits_keep_occupancy(self):
+        room = make_room('A-101', capacity=1)
+        applications = [
+            RoomApplication.objects.create(student=make_student(f'student{i}'), room=room) for i in range(3)
+        ]
+        self.post_edits('roomapplication', {
+            applications[0].pk: {'status': 'approved', 'priority_score': 0},
+            applications[1].pk: {'status': 'pending', 'priority_score': 90},
+            applications[2].pk: {'status': 'approved', 'priority_score': 50},
+        })
+        room.refresh_from_db()
+        self.assertEqual(room.current_occupancy, 1)
+        self.assertEqual(
+            list(RoomApplication.objects.order_by('pk').values_list('status', 'priority_score', 'student__is_allocated')),
+            # New scores apply before the approvals: the higher one gets the bed
+            [('pending', 0, False), ('pending', 90, False), ('approved', 50, True)],
+        )
+
+
+class AdminAllocationFormTests(TestCase):
+
+    def setUp(self):
+        self.admin = CustomUser.objects.create_superuser(username='root', password='x', user_type='admin')
+        self.client.force_login(self.admin)
+        self.room = make_room('A-101', capacity=1)
+        RoomAllocation.objects.create(student=make_student('first'), room=self.room, allocated_by=self.admin)
+        self.application = RoomApplication.objects.create(student=make_student('second'), room=self.room)
+        self.url = reverse('admin:hostel_management_roomapplication_change', args=[self.application.pk])
+
+    def approve(self):
+        return self.client.post(self.url, {
+            'student': self.application.student_id, 'room': self.room.pk, 'preferences': '',
+            'priority_score': 0, 'status': 'approved', 'reviewed_by': '', 'reviewed_date_0': '',
+            'reviewed_date_1': '', 'admin_notes': '',
+        }, follow=True)
+
+    def messages(self, response):
+        return [str(message) for message in response.context['messages']]
+
+    def test_full_room_is_a_form_error(self):
+        response = self.approve()
+        self.assertContains(response, 'Room A-101 is already full.')
+        self.assertEqual(self.messages(response), [])
+        self.assertEqual(RoomApplication.objects.get(pk=self.application.pk).status, 'pending')
+
+    def test_failed_save_is_not_reported_as_success(self):
+        # The room fills up between validation and save
+        with mock.patch.object(Room, 'is_full', False):
+            response = self.approve()
+        self.assertEqual(self.messages(response), ['Room is already full.'])
+        self.assertEqual(response.redirect_chain, [(self.url, 302)])
+        self.assertEqual(RoomApplication.objects.get(pk=self.application.pk).status, 'pending')
+
+
+class ChangeTrackingTests(TestCase):
+
+    def setUp(self):
+        self.user = CustomUser.objects.create_user(username='student', password='x', user_type='student')
+
+    def updates(self, context):
+        return [
+            query['sql'] for query in context.captured_queries
+            if query['sql'].startswith('UPDATE "hostel_management_')
+        ]
+
+    def test_login_writes_last_login_only(self):
+        with CaptureQueriesContext(connection) as context:
+            self.assertTrue(self.client.login(username='student', password='x'))
+        updates = self.updates(context)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"last_login"', updates[0])
+        self.assertNotIn('"email"', updates[0])
+
+    def test_profile_save_writes_changed_columns(self):
+        profile = StudentProfile.objects.get(user=self.user)
+        with self.assertNumQueries(0):
+            profile.save()
+        profile.department = 'Physics'
+        with CaptureQueriesContext(connection) as context:
+            profile.save()
+        updates = self.updates(context)
+        self.assertEqual(len(updates), 1)
+        self.assertIn('"department"', updates[0])
+        self.assertIn('"updated_at"', updates[0])
+        self.assertNotIn('"student_id"', updates[0])
+
+    def test_stale_instance_keeps_concurrent_changes(self):
+        profile = StudentProfile.objects.get(user=self.user)
+        StudentProfile.objects.set_allocated([profile.pk])
+        profile.department = 'Physics'
+        profile.save()
+        profile.refresh_from_db()
+        self.assertTrue(profile.is_allocated)
+
+
+class SeedDataScaleTests(TestCase):
+
+    def seed(self, **counts):
+        call_command('seed_data', stdout=StringIO(), **counts)
+
+    def test_generated_data_is_consistent(self):
+        self.seed(students=60, rooms=20, applications=40, complaints=30, notices=10)
+        self.assertEqual(StudentProfile.objects.count(), 60)
+        self.assertEqual(RoomApplication.objects.count(), 40)
+        self.assertTrue(Room.objects.filter(room_number='A-101', block='A', floor=1).exists())
+        held = Counter(
+            list(RoomAllocation.objects.filter(is_active=True).values_list('room', flat=True))
+            + list(RoomApplication.objects.filter(status='approved').values_list('room', flat=True))
+        )
+        for room in Room.objects.all():
+            self.assertEqual(room.current_occupancy, held[room.pk])
+            self.assertLessEqual(room.current_occupancy, room.capacity)
+        self.assertEqual(
+            StudentProfile.objects.filter(is_allocated=True).count(), sum(held.values())
+        )
+        counters = HostelStats.objects.get(scope='global')
+        self.assertEqual(counters.total_occupied, sum(held.values()))
+        self.assertEqual(counters.open_complaints, Complaint.objects.filter(status__in=Complaint.OPEN_STATUSES).count())
+        complaint = Complaint.objects.filter(duplicate_of__isnull=True).first()
+        self.assertEqual(len(complaint.text_signature), 2 * duplicates.HALF)
+        self.assertTrue(complaint.text_buckets.exists())
+        self.assertEqual(complaint.sla_due_at, complaint.compute_sla_due_at())
+        for model in (RoomApplication, Complaint, Notice):
+            self.assertGreater(model.objects.values('created_at').distinct().count(), 1)
+        self.assertFalse(RoomApplication.objects.filter(reviewed_date__lt=F('created_at')).exists())
+        twin = Complaint(
+            submitted_by=complaint.submitted_by, category=complaint.category, subject=complaint.subject,
+            location=complaint.location, description=complaint.description,
+        )
+        self.assertTrue(duplicates.find_duplicates(twin))
+
+    def test_same_seed_same_data(self):
+        def names():
+            return list(
+                CustomUser.objects.filter(username__startswith='load').order_by('username')
+                .values_list('username', 'first_name', 'student_profile__department')
+            )
+
+        self.seed(students=20, rooms=5, seed=7)
+        first = names()
+        call_command('seed_data', clear=True, students=20, rooms=5, seed=7, stdout=StringIO())
+        self.assertEqual(names(), first)
+
+
+    def test_clear_empties_every_table_in_one_pass(self):
+        self.seed(students=20, rooms=5, applications=10, complaints=10, notices=5)
+        LogEntry.objects.log_actions(CustomUser.objects.first().pk, Room.objects.all(), 2, '[]')
+        with CaptureQueriesContext(connection) as queries:
+            call_command('seed_data', clear=True, students=0, users_only=True, stdout=StringIO())
+        self.assertLess(len(queries), 200)
+        self.assertFalse(LogEntry.objects.exists())
+        self.assertFalse(CustomUser.objects.filter(username__startswith='load').exists())
+        for model in (Room, RoomApplication, Complaint, Notice, NoticeRecipient):
+            self.assertFalse(model.objects.exists())
+        self.assertEqual(HostelStats.objects.get_global().total_students, StudentProfile.objects.count())
+        # The search indexes match the tables again, and their triggers are back
+        with connection.cursor() as cursor:
+            for table in (search.ROOM_SEARCH_TABLE, search.COMPLAINT_SEARCH_TABLE, search.USER_SEARCH_TABLE):
+                cursor.execute(f"INSERT INTO {table}({table}) VALUES ('integrity-check')")
+        make_room('A-101')
+        self.assertEqual(len(search_rooms(Room.objects.all(), 'A-1')), 1)
+
+class ProvisioningTests(TestCase):
+
+    def row(self, i, **fields):
+        return {
+            'username': f'new{i}', 'password': f'secret-{i}', 'student_id': f'NEW-{i}',
+            'department': 'Physics', 'faculty': 'Science', 'academic_level': 'Undergraduate',
+            'academic_year': '2025', 'semester': '1', 'emergency_contact': '+880',
+            'emergency_contact_name': 'Parent', 'date_of_enrollment': '2025-01-15', **fields,
+        }
+
+    def test_students_are_created_in_worker_processes(self):
+        Notice.objects.create(
+            title='Physics', content='...', created_by=CustomUser.objects.create_user(username='staff', user_type='staff'),
+            is_published=True, target_all_students=False, target_department='physics',
+        )
+        result = provisioning.provision_students([self.row(i) for i in range(3)], workers=2, chunk_size=1)
+        self.assertEqual((result.created, result.workers), (3, 2))
+        user = CustomUser.objects.get(username='new1')
+        self.assertTrue(user.check_password('secret-1'))
+        self.assertEqual(user.student_profile.student_id, 'NEW-1')
+        self.assertEqual(user.student_profile.academic_year, 2025)
+        self.assertEqual(HostelStats.objects.get(scope='global').total_students, 3)
+        self.assertEqual(NoticeRecipient.objects.count(), 3)
+
+    def test_invalid_and_taken_rows_are_skipped(self):
+        make_student('new0')
+        result = provisioning.provision_students([
+            self.row(0), self.row(1), self.row(2, student_id='NEW-1'), self.row(3, semester='first'),
+            self.row(4, password='12345678'), self.row(5, username='provisioned5', password='provisioned5!'),
+        ], workers=1)
+        self.assertEqual(result.created, 1)
+        self.assertEqual([number for number, _ in result.skipped], [1, 3, 4, 5, 6])
+        self.assertIn('semester', result.skipped[2][1])
+        self.assertIn('password: This password is too common.', result.skipped[3][1])
+        self.assertIn('too similar to the username', result.skipped[4][1])
+        self.assertTrue(CustomUser.objects.filter(username='new1').exists())
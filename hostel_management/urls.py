@@ -1,6 +1,6 @@
 from django.urls import path
 from django.contrib.auth import views as auth_views
-from . import views
+from . import api, views
 
 app_name = 'hostel_management'
 
@@ -16,20 +16,29 @@ urlpatterns = [
     
     # Room Management URLs
     path('rooms/', views.RoomListView.as_view(), name='room_list'),
+    path('rooms/autocomplete/', views.RoomAutocompleteView.as_view(), name='room_autocomplete'),
+    path('rooms/events/', views.RoomEventsView.as_view(), name='room_events'),
     path('rooms/<int:pk>/', views.RoomDetailView.as_view(), name='room_detail'),
     path('rooms/apply/<int:room_id>/', views.RoomApplicationView.as_view(), name='room_apply'),
     path('my-applications/', views.MyApplicationsView.as_view(), name='my_applications'),
     
     # Notice Board URLs
     path('notices/', views.NoticeListView.as_view(), name='notice_list'),
+    path('notices/mark-all-read/', views.NoticeMarkAllReadView.as_view(), name='notice_mark_all_read'),
     path('notices/<int:pk>/', views.NoticeDetailView.as_view(), name='notice_detail'),
     
     # Complaint Management URLs
     path('complaints/', views.ComplaintListView.as_view(), name='complaint_list'),
     path('complaints/create/', views.ComplaintCreateView.as_view(), name='complaint_create'),
+    path('complaints/queue/', views.ComplaintQueueView.as_view(), name='complaint_queue'),
+    path('complaints/queue/claim/', views.ComplaintClaimView.as_view(), name='complaint_claim'),
     path('complaints/<int:pk>/', views.ComplaintDetailView.as_view(), name='complaint_detail'),
     
     # Profile URLs
     path('profile/', views.ProfileView.as_view(), name='profile'),
     path('profile/edit/', views.ProfileEditView.as_view(), name='profile_edit'),
+    
+    # JSON API
+    path('api/v1/rooms/', api.room_list, name='api_room_list'),
+    path('api/v1/rooms/<int:pk>/', api.room_detail, name='api_room_detail'),
 ]
\ No newline at end of file
@@ -6,11 +6,22 @@ from django.contrib import messages
 from django.views import View
 from django.urls import reverse_lazy
 from django.db.models import Q, F, Sum
-from django.db import models
-from django.http import Http404
+from django.db import models, transaction
+from django.http import Http404, HttpResponse, JsonResponse, StreamingHttpResponse
 from .models import CustomUser, StudentProfile, Room, RoomApplication, RoomAllocation, Notice, Complaint
 from .forms import CustomUserCreationForm, StudentProfileForm, RoomApplicationForm, ComplaintForm
+from .assignment import assign_complaint
+from .duplicates import join_complaint, joinable_duplicates
+from .facets import facet_counts, parse_filters
+from .live import get_hub, live_events_enabled
+from .notices import mark_all_read, mark_read, unread_notices, user_notice_board, user_visible_notices
+from .pagination import KeysetPaginationMixin
+from .scoring import score_student
+from .search import SEARCH_LIMIT, autocomplete_rooms, search_rooms, search_text
+from .stats import get_dashboard_stats, get_student_stats
 from datetime import date
+import asyncio
+import json
 
 class RegisterView(CreateView):
     """User registration view"""
@@ -33,9 +44,10 @@ class DashboardView(LoginRequiredMixin, TemplateView):
         context = super().get_context_data(**kwargs)
         user = self.request.user
         
-        # Common context for all users
-        context['total_rooms'] = Room.objects.count()
-        context['available_rooms'] = Room.objects.filter(is_available=True, current_occupancy__lt=F('capacity')).count()
+        # Hostel-wide numbers, cached per role; staff also get students,
+        # applications, complaints and occupancy
+        role = 'staff' if user.user_type in ['staff', 'provost', 'admin'] else 'student'
+        context.update(get_dashboard_stats(role))
         
         if user.user_type == 'student':
             if hasattr(user, 'student_profile'):
@@ -46,88 +58,83 @@ class DashboardView(LoginRequiredMixin, TemplateView):
                 # Get current room allocation
                 current_allocation = RoomAllocation.objects.filter(
                     student=profile, is_active=True
-                ).first()
+                ).select_related('room').first()
                 context['current_allocation'] = current_allocation
                 
-                # Get pending applications
-                pending_applications = RoomApplication.objects.filter(
-                    student=profile, status='pending'
-                ).count()
-                context['pending_applications'] = pending_applications
-                
-                # Get recent complaints
-                recent_complaints = Complaint.objects.filter(
-                    submitted_by=user, status__in=['submitted', 'in_progress']
-                ).count()
-                context['open_complaints'] = recent_complaints
-        
-        elif user.user_type in ['staff', 'provost', 'admin']:
-            # Add staff-specific dashboard data
-            context['total_students'] = StudentProfile.objects.count()
-            context['allocated_students'] = StudentProfile.objects.filter(is_allocated=True).count()
-            
-            # Pending applications requiring attention
-            context['pending_applications'] = RoomApplication.objects.filter(status='pending').count()
-            
-            # Open complaints requiring attention
-            context['open_complaints'] = Complaint.objects.filter(
-                status__in=['submitted', 'in_progress']
-            ).count()
-            
-            # Occupancy rate
-            total_capacity = Room.objects.aggregate(
-                total=models.Sum('capacity')
-            )['total'] or 0
-            total_occupied = Room.objects.aggregate(
-                occupied=models.Sum('current_occupancy')
-            )['occupied'] or 0
-            
-            context['total_capacity'] = total_capacity
-            context['total_occupied'] = total_occupied
-            context['occupancy_rate'] = round(
-                (total_occupied / total_capacity * 100) if total_capacity > 0 else 0, 1
-            )
+                # Pending applications and open complaints
+                context.update(get_student_stats(user, profile))
         
         return context
 
-class RoomListView(LoginRequiredMixin, ListView):
+class RoomListView(LoginRequiredMixin, KeysetPaginationMixin, ListView):
     """List all available rooms"""
     model = Room
     template_name = 'hostel_management/rooms/room_list.html'
     context_object_name = 'rooms'
     paginate_by = 12
+    keyset_ordering = ('block', 'floor', 'room_number')
+    approximate_total = True
     
     def get_queryset(self):
         queryset = Room.objects.filter(is_available=True)
         
-        # Add filtering
+        # Add filtering (block, floor, room_type, has_ac, has_attached_bathroom)
         search = self.request.GET.get('search')
-        room_type = self.request.GET.get('room_type')
-        block = self.request.GET.get('block')
         
         if search:
-            queryset = queryset.filter(
-                Q(room_number__icontains=search) | 
-                Q(block__icontains=search)
-            )
+            queryset = search_rooms(queryset, search)
         
-        if room_type:
-            queryset = queryset.filter(room_type=room_type)
-            
-        if block:
-            queryset = queryset.filter(block=block)
+        queryset = queryset.filter(**parse_filters(self.request.GET))
         
         return queryset.order_by('block', 'floor', 'room_number')
     
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
-        context['room_types'] = Room.ROOM_TYPE_CHOICES
-        context['blocks'] = Room.objects.values_list('block', flat=True).distinct()
-        context['search'] = self.request.GET.get('search', '')
-        context['selected_room_type'] = self.request.GET.get('room_type', '')
-        context['selected_block'] = self.request.GET.get('block', '')
+        search = self.request.GET.get('search', '')
+        # Rooms with free beds per filter value, for the current search/filters
+        context['facets'] = facet_counts(search, parse_filters(self.request.GET))
+        context['search'] = search
+        context['live_events'] = live_events_enabled(self.request)
         return context
 
+class RoomAutocompleteView(LoginRequiredMixin, View):
+    """JSON list of available rooms whose number or block starts with ?q="""
+    
+    def get(self, request, *args, **kwargs):
+        query = request.GET.get('q', '')
+        results = autocomplete_rooms(query) if query.strip() else []
+        return JsonResponse({'results': results})
+
+class RoomEventsView(View):
+    """
+    Server-Sent Events stream of room occupancy changes (see live.py).
+    Needs an ASGI server; one long-lived connection per client. Under WSGI
+    it answers 204, which tells EventSource not to reconnect.
+    """
+    heartbeat = 25
+    
+    async def get(self, request, *args, **kwargs):
+        user = await request.auser()
+        if not user.is_authenticated:
+            return HttpResponse(status=401)
+        if not live_events_enabled(request):
+            return HttpResponse(status=204)
+        response = StreamingHttpResponse(self.stream(), content_type='text/event-stream')
+        response['Cache-Control'] = 'no-cache'
+        response['X-Accel-Buffering'] = 'no'  # don't let nginx buffer the stream
+        return response
+    
+    async def stream(self):
+        async with get_hub().subscribe() as queue:
+            yield 'retry: 5000\n\n'
+            while True:
+                try:
+                    event = await asyncio.wait_for(queue.get(), self.heartbeat)
+                except asyncio.TimeoutError:
+                    yield ': keep-alive\n\n'
+                    continue
+                yield f"event: {event['type']}\ndata: {json.dumps(event)}\n\n"
+
 class RoomDetailView(LoginRequiredMixin, DetailView):
     """Room detail view"""
     model = Room
@@ -177,17 +184,8 @@ class RoomApplicationView(LoginRequiredMixin, CreateView):
         form.instance.student = student_profile
         form.instance.room = room
         
-        # Calculate priority score based on academic year and level
-        priority_score = 50  # Base score
-        if student_profile.academic_level == 'PhD':
-            priority_score += 30
-        elif student_profile.academic_level == 'Postgraduate':
-            priority_score += 20
-        elif student_profile.academic_level == 'Graduate':
-            priority_score += 10
-        
-        # Add points for higher academic years
-        priority_score += min(student_profile.academic_year - 2020, 20)
+        # Calculate priority score with the configured scoring policy
+        priority_score = score_student(student_profile)
         
         form.instance.priority_score = priority_score
         
@@ -212,35 +210,83 @@ class MyApplicationsView(LoginRequiredMixin, ListView):
     def get_queryset(self):
         return RoomApplication.objects.filter(student=self.request.user.student_profile)
 
-class NoticeListView(LoginRequiredMixin, ListView):
+class TextSearchMixin:
+    """?search= on a list view: the best SEARCH_LIMIT matches, on one page"""
+    
+    def get_search(self):
+        return self.request.GET.get('search', '').strip()
+    
+    def get_paginate_by(self, queryset):
+        if self.get_search():
+            return None
+        return super().get_paginate_by(queryset)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['search'] = self.get_search()
+        return context
+
+class NoticeListView(LoginRequiredMixin, TextSearchMixin, KeysetPaginationMixin, ListView):
     """List all notices"""
+    model = Notice
     template_name = 'hostel_management/notices/notice_list.html'
     context_object_name = 'notices'
     paginate_by = 10
+    keyset_ordering = ('-priority', '-created_at')
     
     def get_queryset(self):
-        from django.utils import timezone
-        return Notice.objects.filter(
-            is_published=True,
-            is_active=True
-        ).filter(
-            Q(expires_at__isnull=True) | Q(expires_at__gt=timezone.now())
-        )
+        # Cached list of visible notices, see notices.py
+        board = user_notice_board(self.request.user)
+        search = self.get_search()
+        if search:
+            by_pk = {notice.pk: notice for notice in board}
+            ranked = search_text(Notice.objects.filter(pk__in=by_pk), search).values_list('pk', flat=True)
+            return [by_pk[pk] for pk in ranked[:SEARCH_LIMIT]]
+        return board
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['unread_notice_ids'] = {notice.pk for notice in unread_notices(self.request.user)}
+        return context
 
 class NoticeDetailView(LoginRequiredMixin, DetailView):
     """Notice detail view"""
     model = Notice
     template_name = 'hostel_management/notices/notice_detail.html'
     context_object_name = 'notice'
+    
+    def get_queryset(self):
+        # Staff may open drafts and scheduled notices; students only what
+        # their board shows
+        if self.request.user.user_type in ['staff', 'provost', 'admin']:
+            return Notice.objects.all()
+        return user_visible_notices(self.request.user)
+    
+    def get_object(self, queryset=None):
+        notice = super().get_object(queryset)
+        mark_read(self.request.user, notice)
+        return notice
+
+class NoticeMarkAllReadView(LoginRequiredMixin, View):
+    """Mark every notice on the board as read"""
+    
+    def post(self, request):
+        mark_all_read(request.user)
+        return redirect('hostel_management:notice_list')
 
-class ComplaintListView(LoginRequiredMixin, ListView):
+class ComplaintListView(LoginRequiredMixin, TextSearchMixin, KeysetPaginationMixin, ListView):
     """List user's complaints"""
     template_name = 'hostel_management/complaints/complaint_list.html'
     context_object_name = 'complaints'
     paginate_by = 10
+    keyset_ordering = ('-created_at',)
     
     def get_queryset(self):
-        return Complaint.objects.filter(submitted_by=self.request.user)
+        complaints = Complaint.objects.filter(submitted_by=self.request.user)
+        search = self.get_search()
+        if search:
+            return search_text(complaints, search)[:SEARCH_LIMIT]
+        return complaints
 
 class ComplaintCreateView(LoginRequiredMixin, CreateView):
     """Create new complaint"""
@@ -249,9 +295,63 @@ class ComplaintCreateView(LoginRequiredMixin, CreateView):
     success_url = reverse_lazy('hostel_management:complaint_list')
     
     def form_valid(self, form):
-        form.instance.submitted_by = self.request.user
-        messages.success(self.request, 'Your complaint has been submitted successfully.')
-        return super().form_valid(form)
+        complaint = form.instance
+        complaint.submitted_by = self.request.user
+        # See duplicates.py; the form posts "duplicate_of" once matches were offered
+        matches = joinable_duplicates(complaint)
+        choice = self.request.POST.get('duplicate_of')
+        if matches and choice is None:
+            return self.render_to_response(self.get_context_data(form=form, duplicates=matches))
+        original = next((match for match in matches if str(match.pk) == choice), None)
+        with transaction.atomic():
+            if original is not None:
+                join_complaint(complaint, original)
+            else:
+                # Route it to the least busy eligible staff member, see assignment.py
+                assign_complaint(complaint)
+            response = super().form_valid(form)
+        if original is not None:
+            messages.success(self.request, f'Your complaint has been added to "{original.subject}".')
+        else:
+            messages.success(self.request, 'Your complaint has been submitted successfully.')
+        return response
+
+class StaffRequiredMixin:
+    """Send anyone but staff, provosts and admins back to the dashboard"""
+    
+    def dispatch(self, request, *args, **kwargs):
+        if request.user.is_authenticated and request.user.user_type not in ['staff', 'provost', 'admin']:
+            messages.error(request, 'Access denied.')
+            return redirect('hostel_management:dashboard')
+        return super().dispatch(request, *args, **kwargs)
+
+class ComplaintQueueView(LoginRequiredMixin, StaffRequiredMixin, KeysetPaginationMixin, ListView):
+    """Staff work queue: unclaimed and my unstarted complaints by SLA deadline"""
+    template_name = 'hostel_management/complaints/complaint_queue.html'
+    context_object_name = 'complaints'
+    paginate_by = 25
+    keyset_ordering = ('sla_due_at',)
+    
+    def get_queryset(self):
+        return Complaint.objects.queue(self.request.user).select_related('submitted_by')
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['my_complaints'] = Complaint.objects.filter(
+            status='in_progress', assigned_to=self.request.user
+        ).order_by('sla_due_at')
+        return context
+
+class ComplaintClaimView(LoginRequiredMixin, StaffRequiredMixin, View):
+    """Take the most urgent complaint off the queue"""
+    
+    def post(self, request):
+        complaint = Complaint.objects.claim_next(request.user)
+        if complaint is None:
+            messages.info(request, 'The complaint queue is empty.')
+            return redirect('hostel_management:complaint_queue')
+        messages.success(request, f'"{complaint.subject}" is now assigned to you.')
+        return redirect('hostel_management:complaint_detail', pk=complaint.pk)
 
 class ComplaintDetailView(LoginRequiredMixin, DetailView):
     """Complaint detail view"""
@@ -264,6 +364,11 @@ class ComplaintDetailView(LoginRequiredMixin, DetailView):
         if self.request.user.user_type in ['staff', 'provost', 'admin']:
             return Complaint.objects.all()
         return Complaint.objects.filter(submitted_by=self.request.user)
+    
+    def get_context_data(self, **kwargs):
+        context = super().get_context_data(**kwargs)
+        context['is_staff_user'] = self.request.user.user_type in ['staff', 'provost', 'admin']
+        return context
 
 class ProfileView(LoginRequiredMixin, TemplateView):
     """User profile view"""